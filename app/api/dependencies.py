@@ -1,35 +1,70 @@
+from bson import ObjectId
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.security import decode_access_token
 from app.core.database import get_database
+from app.core.cache import user_cache
+from app.core.revocation import revocation_list
+from app.models.user import CurrentUser
 
 security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db = Depends(get_database)
-):
-    token = credentials.credentials
+) -> CurrentUser:
+    return await authenticate_token(credentials.credentials, db)
+
+async def authenticate_token(token: str, db) -> CurrentUser:
+    """Resolve an access token to its user; also used where no Authorization header exists (WebSockets)"""
     payload = decode_access_token(token)
-    
+
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
-    
+
     username: str = payload.get("sub")
-    if username is None:
+    if username is None or payload.get("type") == "refresh":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
     
-    user = await db.users.find_one({"username": username})
+    # Bloom filter check; only a filter hit costs a database lookup
+    if await revocation_list.is_revoked(db, (payload.get("jti"), payload.get("fam"))):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+
+    # Tokens issued before "uid" was added only carry the username
+    user_id = payload.get("uid")
+    user = user_cache.get(user_id) if user_id else None
+
     if user is None:
+        if user_id and ObjectId.is_valid(user_id):
+            user = await db.users.find_one({"_id": ObjectId(user_id)})
+        else:
+            user = await db.users.find_one({"username": username})
+
+        if user is not None:
+            user_cache.set(str(user["_id"]), user)
+
+    if user is None or user["username"] != username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
-    return username
\ No newline at end of file
+
+    return CurrentUser(id=user["_id"], username=user["username"], document=user, claims=payload)
+
+async def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if current_user.document.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+
+    return current_user
@@ -0,0 +1,167 @@
+import asyncio
+import random
+import time
+from typing import Optional
+from bson import ObjectId
+from fastapi import HTTPException
+from app.config import settings
+from app.api.dependencies import authenticate_token, require_admin
+from app.core.database import get_database
+from app.core.metrics import registry, BYTES_BUCKETS
+from app.core.mongo_monitoring import RequestDbStats, request_db_stats, observe_request, UNMATCHED
+from app.core.profiler import SamplingProfiler
+from app.models.user import CurrentUser
+from app.services.profile_service import ProfileService
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last body byte",
+    ("method", "route", "status")
+)
+RESPONSE_BYTES = registry.histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), BYTES_BUCKETS
+)
+IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests being handled by this worker", ("method",)
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Plain ASGI middleware (not BaseHTTPMiddleware) so streamed bodies, such as
+    exports, are still inside the request when their database work runs and
+    are included in its latency and size.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        response = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        stats = RequestDbStats(scope)
+        token = request_db_stats.set(stats)
+        IN_FLIGHT.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec((method,))
+            request_db_stats.reset(token)
+
+            labels = stats.labels
+            REQUEST_SECONDS.observe(elapsed, labels + (str(response["status"]),))
+            RESPONSE_BYTES.observe(response["bytes"], labels)
+            observe_request(stats)
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+async def _profiling_admin(scope) -> Optional[CurrentUser]:
+    """The admin behind the request's bearer token, or None; only checked when X-Profile is sent"""
+    authorization = _header(scope, b"authorization") or b""
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return await require_admin(await authenticate_token(token, get_database()))
+    except HTTPException:
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Runs a request under SamplingProfiler when an admin sends "X-Profile: 1",
+    or for one in profiling_sample_rate requests, and stores the profile with
+    the route, timing and the request's Mongo summary. The response carries
+    X-Profile-Id. Other requests only pay for a header lookup.
+
+    Added before RequestMetricsMiddleware so it runs inside it and can read
+    the request's database stats.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rate = settings.profiling_sample_rate
+        trigger = "sampled" if rate > 0 and random.randrange(rate) == 0 else None
+        user = None
+        if trigger is None and _header(scope, b"x-profile") == b"1":
+            user = await _profiling_admin(scope)
+            trigger = "header" if user is not None else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = ObjectId()
+        response = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", str(profile_id).encode())]
+            await send(message)
+
+        # RequestMetricsMiddleware collects the request's Mongo stats; without it, collect them here
+        stats = request_db_stats.get()
+        token = request_db_stats.set(RequestDbStats(scope)) if stats is None else None
+
+        interval = settings.profiling_interval_ms / 1000
+        profiler = SamplingProfiler(asyncio.current_task(), interval)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await profiler.stop()
+            duration = time.perf_counter() - started
+            stats = request_db_stats.get()
+            if token is not None:
+                request_db_stats.reset(token)
+            await self._save({
+                "_id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", UNMATCHED),
+                "status": response["status"],
+                "duration_ms": round(duration * 1000, 3),
+                "trigger": trigger,
+                "user_id": user.id if user is not None else None,
+                "samples": profiler.samples,
+                "interval_ms": settings.profiling_interval_ms,
+                "db": stats.summary() if stats is not None else None,
+                "folded": profiler.folded()
+            })
+
+    @staticmethod
+    async def _save(profile: dict) -> None:
+        # Keep the write out of the profiled request's Mongo stats; a lost profile is not fatal
+        token = request_db_stats.set(None)
+        try:
+            await ProfileService(get_database()).save(profile)
+        except Exception as e:
+            print(f"Failed to store request profile: {str(e)}")
+        finally:
+            request_db_stats.reset(token)
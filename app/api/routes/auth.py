@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends
-from app.schemas.auth import SignupRequest, LoginRequest, Token
+from app.schemas.auth import SignupRequest, LoginRequest, RefreshRequest, Token
 from app.services.auth_service import AuthService
+from app.api.dependencies import get_current_user
+from app.models.user import CurrentUser
 from app.core.database import get_database
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -13,4 +15,19 @@ async def signup(signup_data: SignupRequest, db = Depends(get_database)):
 @router.post("/login", response_model=Token)
 async def login(login_data: LoginRequest, db = Depends(get_database)):
     auth_service = AuthService(db)
-    return await auth_service.login(login_data)
\ No newline at end of file
+    return await auth_service.login(login_data)
+
+@router.post("/refresh", response_model=Token)
+async def refresh(refresh_data: RefreshRequest, db = Depends(get_database)):
+    """Exchange a refresh token for a new access/refresh pair (the old one is spent)"""
+    auth_service = AuthService(db)
+    return await auth_service.refresh(refresh_data.refresh_token)
+
+@router.post("/logout")
+async def logout(
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Revoke the current session's access and refresh tokens"""
+    auth_service = AuthService(db)
+    return await auth_service.logout(current_user)
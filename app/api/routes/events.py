@@ -1,17 +1,88 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.schemas.issue import IssueResponse
-from app.services.issue_service import IssueService
+from app.services.issue_service import IssueService, ISSUE_FIELDSET
+from app.services.issue_feed import issue_feed
+from app.services.location_service import LocationService
+from app.api.streaming import SSE_HEADERS, sse_events, pump_websocket
 from app.core.database import get_database
+from app.config import settings
+from app.core.responses import dumps
+from app.core.conditional import make_etag, cache_headers, is_not_modified, not_modified
+from app.core.response_cache import VersionedPayloadCache
+from app.core.versions import ISSUES
 
 router = APIRouter(prefix="/api/events", tags=["Events"])
 
+# Rendered landing-page payloads, rebuilt when the issues version moves
+events_cache = VersionedPayloadCache(
+    ISSUES,
+    maxsize=settings.events_cache_max_entries,
+    version_ttl=settings.events_cache_version_ttl_seconds,
+    max_stale=settings.events_cache_max_stale_seconds
+)
+
 @router.get("", response_model=List[IssueResponse])
 async def get_all_events(
+    request: Request,
     limit: int = Query(50, ge=1, le=500),
     skip: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return (id is always included)"),
     db = Depends(get_database)
 ):
     """Public endpoint - Get all events/issues for landing page"""
-    issue_service = IssueService(db)
-    return await issue_service.get_all_issues(limit=limit, skip=skip)
\ No newline at end of file
+    selected = ISSUE_FIELDSET.parse(fields)
+    
+    async def render() -> bytes:
+        issues = await IssueService(db).get_all_issues(limit=limit, skip=skip, fields=selected)
+        return dumps(issues)
+    
+    # A client that already has the current version is answered before any page is rendered
+    version = await events_cache.version(db)
+    etag = make_etag(ISSUES, version.version, limit, skip, *(selected or ()))
+    if is_not_modified(request, etag, version.updated_at):
+        return not_modified(etag, version.updated_at)
+    
+    payload = await events_cache.get(db, (limit, skip, selected), render)
+    
+    # The ETag follows the version the served body was built from, even when it is stale
+    etag = make_etag(ISSUES, payload.version, limit, skip, *(selected or ()))
+    if payload.version != version.version and is_not_modified(request, etag, payload.last_modified):
+        return not_modified(etag, payload.last_modified)
+    
+    return Response(payload.body, media_type="application/json", headers=cache_headers(etag, payload.last_modified))
+
+def _parse_bbox(bbox: Optional[str]):
+    try:
+        return LocationService.parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid bbox: {str(e)}")
+
+@router.get("/stream")
+async def stream_issue_changes(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="minLng,minLat,maxLng,maxLat")
+):
+    """Public Server-Sent Events feed of issue changes, batched and optionally limited to a bbox"""
+    parsed_bbox = _parse_bbox(bbox)
+    return StreamingResponse(
+        sse_events(request, lambda: issue_feed.subscribe(parsed_bbox)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@router.websocket("/ws")
+async def issue_changes_websocket(
+    websocket: WebSocket,
+    bbox: Optional[str] = Query(None)
+):
+    """Public WebSocket feed of issue changes, batched and optionally limited to a bbox"""
+    try:
+        parsed_bbox = LocationService.parse_bbox(bbox)
+    except ValueError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=f"Invalid bbox: {str(e)}")
+        return
+
+    subscription = issue_feed.subscribe(parsed_bbox)
+    await pump_websocket(websocket, subscription)
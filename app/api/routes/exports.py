@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.api.dependencies import require_admin
+from app.core.database import get_database
+from app.models.user import CurrentUser
+from app.services.export_service import ExportService, ISSUE_FIELDS, VOLUNTEER_FIELDS, PLEDGE_FIELDS
+from app.services.location_service import LocationService
+
+router = APIRouter(prefix="/api/exports", tags=["Exports"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _stream(service: ExportService, rows, fields, file_format: str, name: str) -> StreamingResponse:
+    body = service.as_csv(rows, fields) if file_format == "csv" else service.as_ndjson(rows)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{file_format}"'}
+    )
+
+
+def _parse_bbox(bbox: Optional[str]):
+    try:
+        return LocationService.parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {str(e)}")
+
+
+@router.get("/issues")
+async def export_issues(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="Created at or after"),
+    date_to: Optional[datetime] = Query(None, description="Created before"),
+    bbox: Optional[str] = Query(None, description="minLng,minLat,maxLng,maxLat"),
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """Stream all matching issues (admin only)"""
+    service = ExportService(db)
+    rows = service.issue_rows(status, date_from, date_to, _parse_bbox(bbox))
+    return _stream(service, rows, ISSUE_FIELDS, format, "issues")
+
+
+@router.get("/volunteers")
+async def export_volunteers(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="Volunteered at or after"),
+    date_to: Optional[datetime] = Query(None, description="Volunteered before"),
+    bbox: Optional[str] = Query(None, description="Issue location: minLng,minLat,maxLng,maxLat"),
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """Stream all matching volunteer records (admin only)"""
+    service = ExportService(db)
+    rows = service.volunteer_rows(status, date_from, date_to, _parse_bbox(bbox))
+    return _stream(service, rows, VOLUNTEER_FIELDS, format, "volunteers")
+
+
+@router.get("/pledges")
+async def export_pledges(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="Pledged at or after"),
+    date_to: Optional[datetime] = Query(None, description="Pledged before"),
+    bbox: Optional[str] = Query(None, description="Issue location: minLng,minLat,maxLng,maxLat"),
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """Stream all matching pledges (admin only)"""
+    service = ExportService(db)
+    rows = service.pledge_rows(status, date_from, date_to, _parse_bbox(bbox))
+    return _stream(service, rows, PLEDGE_FIELDS, format, "pledges")
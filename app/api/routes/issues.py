@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, Query, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, File, UploadFile, Form, Query, HTTPException, Request, UploadFile, File, Form
 from typing import List, Optional
-from app.schemas.issue import IssueCreate, IssueUpdate, IssueResponse, CommentCreate
-from app.services.issue_service import IssueService
-from app.api.dependencies import get_current_user
+from app.schemas.issue import IssueCreate, IssueUpdate, IssueResponse, CommentCreate, BulkImportResult
+from app.services.issue_service import IssueService, ISSUE_FIELDSET
+from app.services.import_service import IssueImportService
+from app.api.dependencies import get_current_user, require_admin
+from app.models.user import CurrentUser
 from app.core.database import get_database
+from app.core.responses import FastJSONResponse
+from app.core.conditional import make_etag, cache_headers, is_not_modified, not_modified
 
 router = APIRouter(prefix="/api/issues", tags=["Issues"])
 
@@ -12,10 +16,12 @@ async def get_all_issues(
     status: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
     skip: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return (id is always included)"),
     db = Depends(get_database)
 ):
     issue_service = IssueService(db)
-    return await issue_service.get_all_issues(status=status, limit=limit, skip=skip)
+    selected = ISSUE_FIELDSET.parse(fields)
+    return FastJSONResponse(await issue_service.get_all_issues(status=status, limit=limit, skip=skip, fields=selected))
 
 @router.post("", response_model=IssueResponse)
 async def create_issue(
@@ -26,7 +32,7 @@ async def create_issue(
     priority: str = Form("medium"),
     difficulty: str = Form("medium"),
     picture: Optional[UploadFile] = File(None),
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     
@@ -63,19 +69,63 @@ async def create_issue(
     issue_service = IssueService(db)
     return await issue_service.create_issue(issue_data, current_user, picture)
 
+IMPORT_FORMATS_BY_EXTENSION = {
+    "csv": "csv",
+    "geojson": "geojson",
+    "json": "geojson",
+    "geojsonl": "geojsonl",
+    "ndjson": "geojsonl",
+    "jsonl": "geojsonl",
+}
+
+@router.post("/import", response_model=BulkImportResult)
+async def import_issues(
+    file: UploadFile = File(..., description="CSV or GeoJSON file of issue reports"),
+    format: Optional[str] = Query(None, pattern="^(csv|geojson|geojsonl)$"),
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """
+    Bulk import issue reports (admin only)
+    
+    - **CSV** columns: title, description, latitude, longitude, and optionally
+      priority, difficulty, reporter (username), picture_url, reward_listing
+    - **GeoJSON**: a FeatureCollection of Point features (or one feature per line
+      for geojsonl) with the same names as properties
+    
+    The format is taken from the file extension unless given explicitly. Rows are
+    validated individually; failures are reported by row number and do not stop
+    the import.
+    """
+    file_format = format or IMPORT_FORMATS_BY_EXTENSION.get((file.filename or "").rsplit(".", 1)[-1].lower())
+    if not file_format:
+        raise HTTPException(status_code=400, detail="Could not determine file format; pass ?format=csv|geojson|geojsonl")
+    
+    import_service = IssueImportService(db)
+    return await import_service.import_issues(file, file_format, current_user)
+
 @router.get("/{issue_id}", response_model=IssueResponse)
 async def get_issue(
     issue_id: str,
+    request: Request,
     db = Depends(get_database)
 ):
     issue_service = IssueService(db)
-    return await issue_service.get_issue_by_id(issue_id)
+    issue = await issue_service.get_issue_document(issue_id)
+    
+    # Every write to an issue sets updated_at, so it identifies the representation
+    updated_at = issue["updated_at"]
+    etag = make_etag(issue_id, int(updated_at.timestamp() * 1000))
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    
+    return FastJSONResponse(issue_service.to_response(issue), headers=cache_headers(etag, updated_at))
 
 @router.put("/{issue_id}", response_model=IssueResponse)
 async def update_issue(
     issue_id: str,
     update_data: IssueUpdate,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     issue_service = IssueService(db)
@@ -85,7 +135,7 @@ async def update_issue(
 async def resolve_issue(
     issue_id: str,
     resolution_picture: UploadFile = File(..., description="Picture taken at the resolved location with GPS data"),
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """
@@ -107,7 +157,7 @@ async def resolve_issue(
     
     return await issue_service.resolve_issue(
         issue_id=issue_id,
-        username=current_user,
+        current_user=current_user,
         resolution_picture=resolution_picture
     )
 
@@ -136,7 +186,7 @@ async def resolve_issue(
 async def add_comment(
     issue_id: str,
     comment_data: CommentCreate,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     issue_service = IssueService(db)
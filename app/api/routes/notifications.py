@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List
+from app.schemas.notification import NotificationResponse
+from app.services.notification_service import NotificationService
+from app.api.dependencies import get_current_user
+from app.models.user import CurrentUser
+from app.core.database import get_database
+from app.core.responses import FastJSONResponse
+
+router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
+
+@router.get("", response_model=List[NotificationResponse])
+async def get_notifications(
+    unread_only: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Get the current user's in-app notifications, most recent first"""
+    service = NotificationService(db)
+    return FastJSONResponse(await service.get_inbox(current_user, unread_only, limit))
+
+@router.post("/read-all")
+async def mark_all_notifications_read(
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Mark every notification as read"""
+    service = NotificationService(db)
+    return await service.mark_all_read(current_user)
+
+@router.post("/{notification_id}/read")
+async def mark_notification_read(
+    notification_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Mark one notification as read"""
+    service = NotificationService(db)
+    return await service.mark_read(notification_id, current_user)
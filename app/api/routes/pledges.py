@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
 from app.schemas.pledge import PledgeCreate, PledgeResponse
-from app.services.pledge_service import PledgeService
+from app.services.pledge_service import PledgeService, PLEDGE_FIELDSET
 from app.api.dependencies import get_current_user
+from app.models.user import CurrentUser
 from app.core.database import get_database
+from app.core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/issues", tags=["Pledges"])
 
@@ -11,7 +13,7 @@ router = APIRouter(prefix="/api/issues", tags=["Pledges"])
 async def create_pledge(
     issue_id: str,
     pledge_data: PledgeCreate,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Pledge a reward for an issue"""
@@ -21,8 +23,9 @@ async def create_pledge(
 @router.get("/{issue_id}/pledges", response_model=List[PledgeResponse])
 async def get_pledges(
     issue_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return (id is always included)"),
     db = Depends(get_database)
 ):
     """Get all pledges for an issue"""
     service = PledgeService(db)
-    return await service.get_pledges_for_issue(issue_id)
\ No newline at end of file
+    return FastJSONResponse(await service.get_pledges_for_issue(issue_id, PLEDGE_FIELDSET.parse(fields)))
\ No newline at end of file
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional
+from app.schemas.profile import ProfileSummary, ProfileResponse
+from app.services.profile_service import ProfileService
+from app.api.dependencies import require_admin
+from app.models.user import CurrentUser
+from app.core.database import get_database
+from app.core.responses import FastJSONResponse
+
+router = APIRouter(prefix="/api/admin/profiles", tags=["Profiles"])
+
+@router.get("", response_model=List[ProfileSummary])
+async def list_profiles(
+    route: Optional[str] = Query(None, description="Route template, e.g. /api/issues/{issue_id}"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """Most recent request profiles (admin only)"""
+    service = ProfileService(db)
+    return FastJSONResponse(await service.list_profiles(route, limit))
+
+@router.get("/{profile_id}", response_model=ProfileResponse)
+async def get_profile(
+    profile_id: str,
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """One profile with its folded stacks (admin only)"""
+    service = ProfileService(db)
+    return FastJSONResponse(await service.get_profile(profile_id))
+
+@router.get("/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(
+    profile_id: str,
+    current_user: CurrentUser = Depends(require_admin),
+    db = Depends(get_database)
+):
+    """Folded stacks only; pipe into flamegraph.pl or open in speedscope (admin only)"""
+    service = ProfileService(db)
+    profile = await service.get_profile(profile_id)
+    return PlainTextResponse(profile.folded)
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from typing import List
-from app.core.database import get_database 
-from app.api.dependencies import get_current_user 
+from app.core.database import get_database, insert_and_return
+from app.api.dependencies import get_current_user
+from app.models.user import CurrentUser
+from app.core.cache import invalidate_user
+from app.core.conditional import make_etag, cache_headers, is_not_modified, not_modified
+from app.core.responses import FastJSONResponse
+from app.core.versions import bump_version, REWARDS
+from app.services.reward_catalog import reward_catalog
 from app.schemas.reward import RewardCreate, RewardResponse 
 from bson import ObjectId 
 from datetime import datetime 
@@ -15,25 +21,29 @@ router = APIRouter(prefix="/api/rewards", tags=["Rewards"])
 
 @router.get("", response_model=List[RewardResponse]) # Added List[RewardResponse] for clarity
 async def get_all_rewards(
+    request: Request,
     limit: int = Query(100, ge=1, le=500),
     skip: int = Query(0, ge=0),
     db = Depends(get_database)
 ):
-    """Get all available rewards"""
-    rewards = await db.rewards.find({"available": True}).skip(skip).limit(limit).to_list(limit)
+    """Get all available rewards, cheapest first"""
+    catalog = await reward_catalog.snapshot(db)
+    etag = make_etag(REWARDS, catalog.version, limit, skip)
+    if is_not_modified(request, etag, catalog.last_modified):
+        return not_modified(etag, catalog.last_modified)
     
-    # Helper function to format the reward response (recommended, but inline for this example)
-    def format_reward(reward):
-        return {
-            "id": str(reward["_id"]),
-            "name": reward["name"],
-            "description": reward["description"],
-            "points_required": reward["points_required"],
-            "image_url": reward.get("image_url"),
-            "available": reward["available"] if "available" in reward else True
-        }
+    rewards = catalog.body.rewards[skip:skip + limit]
+    return FastJSONResponse(list(rewards), headers=cache_headers(etag, catalog.last_modified))
 
-    return [format_reward(reward) for reward in rewards]
+@router.get("/affordable", response_model=List[RewardResponse])
+async def get_affordable_rewards(
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Available rewards the current user has enough points for, cheapest first"""
+    catalog = await reward_catalog.snapshot(db)
+    balance = current_user.document.get("points", 0)
+    return FastJSONResponse(list(catalog.body.affordable(balance)))
 
 @router.get("/leaderboard")
 async def get_leaderboard(
@@ -63,7 +73,7 @@ async def get_leaderboard(
 @router.post("", response_model=RewardResponse, status_code=201)
 async def create_reward(
     reward_data: RewardCreate,
-    current_user: str = Depends(get_current_user), 
+    current_user: CurrentUser = Depends(get_current_user), 
     db = Depends(get_database)
 ):
     """
@@ -72,8 +82,7 @@ async def create_reward(
     """
     # 1. (Optional but RECOMMENDED): Authorization Check
     # In a real application, you would check the user's role here:
-    # user_data = await db.users.find_one({"username": current_user})
-    # if user_data.get("role") != "admin":
+    # if current_user.document.get("role") != "admin":
     #     raise HTTPException(status_code=403, detail="Not authorized to create rewards")
 
     # 2. Prepare the data
@@ -86,11 +95,9 @@ async def create_reward(
         "created_at": datetime.utcnow() # datetime imported from second code block
     }
 
-    # 3. Insert into the collection
-    result = await db.rewards.insert_one(reward_dict)
-    
-    # 4. Fetch the created record and format the response
-    new_reward = await db.rewards.find_one({"_id": result.inserted_id})
+    # 3. Insert into the collection (the inserted document is the response)
+    new_reward = await insert_and_return(db.rewards, reward_dict)
+    await bump_version(db, REWARDS)
     
     # Inline formatting for RewardResponse
     return {
@@ -105,7 +112,7 @@ async def create_reward(
 @router.post("/{reward_id}/redeem", status_code=200)
 async def redeem_reward(
     reward_id: str,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Allows a user to redeem an available reward using their points."""
@@ -114,14 +121,12 @@ async def redeem_reward(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid reward ID format")
 
-    # 1. Look up the reward and the user
-    reward = await db.rewards.find_one({"_id": reward_obj_id, "available": True})
+    # 1. Look up the reward (from the in-memory catalog) and the user
+    reward = await reward_catalog.find_available(db, reward_id)
     if not reward:
         raise HTTPException(status_code=404, detail="Reward not found or unavailable")
     
-    user = await db.users.find_one({"username": current_user})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = current_user.document
         
     points_required = reward["points_required"]
     
@@ -134,6 +139,7 @@ async def redeem_reward(
         {"_id": user["_id"], "points": {"$gte": points_required}}, 
         {"$inc": {"points": -points_required}} 
     )
+    invalidate_user(user["_id"])
 
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to deduct points. Check point balance.")
@@ -141,7 +147,7 @@ async def redeem_reward(
     # 4. Record the redemption
     redemption_record = {
         "user_id": user["_id"],
-        "username": current_user,
+        "username": current_user.username,
         "reward_id": reward_obj_id,
         "reward_name": reward["name"],
         "points_deducted": points_required,
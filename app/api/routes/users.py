@@ -3,6 +3,7 @@ from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.dashboard import DashboardStats
 from app.services.user_service import UserService
 from app.api.dependencies import get_current_user
+from app.models.user import CurrentUser
 from app.core.database import get_database
 from app.services.storage_service import StorageService
 
@@ -10,16 +11,16 @@ router = APIRouter(prefix="/api/users", tags=["Users"])
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     user_service = UserService(db)
-    return await user_service.get_user_by_username(current_user)
+    return user_service.get_profile(current_user)
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
     update_data: UserUpdate,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Update user profile (username, display_name, etc.)"""
@@ -30,7 +31,7 @@ async def update_current_user(
 @router.put("/me/avatar", response_model=UserResponse)
 async def upload_avatar(
     file: UploadFile = File(...),
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Upload and update user avatar"""
@@ -52,16 +53,16 @@ async def upload_avatar(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Get current user profile"""
     user_service = UserService(db)
-    return await user_service.get_user_by_username(current_user)
+    return user_service.get_profile(current_user)
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_user_dashboard(
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     user_service = UserService(db)
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.schemas.volunteer import (
     VolunteerCreate, 
     VolunteerResponse, 
     DiscussionMessageCreate,
-    DiscussionMessageResponse
+    DiscussionMessageResponse,
+    DiscussionPage
 )
-from app.services.volunteer_service import VolunteerService
-from app.api.dependencies import get_current_user
+from app.services.volunteer_service import VolunteerService, discussion_topic
+from app.api.dependencies import get_current_user, authenticate_token
+from app.api.streaming import SSE_HEADERS, sse_events, pump_websocket
+from app.core.pubsub import hub
+from app.models.user import CurrentUser
 from app.core.database import get_database
+from app.core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/issues", tags=["Volunteers"])
 
@@ -20,7 +26,7 @@ router = APIRouter(prefix="/api/issues", tags=["Volunteers"])
 async def volunteer_for_issue(
     issue_id: str,
     volunteer_data: VolunteerCreate,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Volunteer to solve an issue"""
@@ -30,7 +36,7 @@ async def volunteer_for_issue(
 @router.delete("/{issue_id}/volunteer")
 async def withdraw_volunteer(
     issue_id: str,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Withdraw from volunteering"""
@@ -44,7 +50,7 @@ async def get_volunteers(
 ):
     """Get all volunteers for an issue"""
     service = VolunteerService(db)
-    return await service.get_volunteers_for_issue(issue_id)
+    return FastJSONResponse(await service.get_volunteers_for_issue(issue_id))
 
 # ------------------------------------------------------------------
 # DISCUSSION ENDPOINTS
@@ -54,19 +60,66 @@ async def get_volunteers(
 async def post_discussion_message(
     issue_id: str,
     message_data: DiscussionMessageCreate,
-    current_user: str = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Post a message in volunteer discussion (volunteers only)"""
     service = VolunteerService(db)
     return await service.post_discussion_message(issue_id, current_user, message_data)
 
-@router.get("/{issue_id}/discussion", response_model=List[DiscussionMessageResponse])
+@router.get("/{issue_id}/discussion", response_model=DiscussionPage)
 async def get_discussion_messages(
     issue_id: str,
-    current_user: str = Depends(get_current_user),
+    before: Optional[str] = Query(None, description="Cursor: return messages older than this"),
+    after: Optional[str] = Query(None, description="Cursor: return messages newer than this"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_database)
 ):
-    """Get all discussion messages (volunteers only)"""
+    """Get a page of discussion messages (volunteers only)"""
     service = VolunteerService(db)
-    return await service.get_discussion_messages(issue_id, current_user)
\ No newline at end of file
+    return FastJSONResponse(await service.get_discussion_messages(issue_id, current_user, before, after, limit))
+
+# ------------------------------------------------------------------
+# REAL-TIME DISCUSSION
+# ------------------------------------------------------------------
+
+@router.get("/{issue_id}/discussion/stream")
+async def stream_discussion(
+    issue_id: str,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Server-Sent Events feed of new discussion messages (volunteers only)"""
+    service = VolunteerService(db)
+    await service.ensure_active_volunteer(issue_id, current_user, "Only volunteers can view discussion")
+
+    return StreamingResponse(
+        sse_events(request, lambda: hub.subscribe(discussion_topic(issue_id))),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@router.websocket("/{issue_id}/discussion/ws")
+async def discussion_websocket(
+    websocket: WebSocket,
+    issue_id: str,
+    token: str = Query(...),
+    db = Depends(get_database)
+):
+    """
+    WebSocket feed of new discussion messages (volunteers only).
+    Browsers cannot set headers on WebSockets, so the access token is passed as ?token=.
+    Membership is checked once here; messages are posted through the REST endpoint.
+    """
+    try:
+        current_user = await authenticate_token(token, db)
+        await VolunteerService(db).ensure_active_volunteer(issue_id, current_user, "Only volunteers can view discussion")
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    # Subscribe before accepting so nothing published after the handshake is missed
+    subscription = hub.subscribe(discussion_topic(issue_id))
+    await pump_websocket(websocket, subscription)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Query
-from typing import List
+from typing import List, Optional
 from app.schemas.user import WarriorResponse
-from app.services.warrior_service import WarriorService
+from app.services.warrior_service import WarriorService, WARRIOR_FIELDSET
 from app.core.database import get_database
+from app.core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/warriors", tags=["Clean Up Warriors"])
 
@@ -10,11 +11,13 @@ router = APIRouter(prefix="/api/warriors", tags=["Clean Up Warriors"])
 async def get_all_warriors(
     limit: int = Query(100, ge=1, le=1000),
     skip: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return (id is always included)"),
     db = Depends(get_database)
 ):
     """Get all cleanup warriors sorted by points"""
     warrior_service = WarriorService(db)
-    return await warrior_service.get_all_warriors(limit=limit, skip=skip)
+    selected = WARRIOR_FIELDSET.parse(fields)
+    return FastJSONResponse(await warrior_service.get_all_warriors(limit=limit, skip=skip, fields=selected))
 
 @router.get("/{user_id}", response_model=WarriorResponse)
 async def get_warrior_by_id(
@@ -23,4 +26,4 @@ async def get_warrior_by_id(
 ):
     """Get specific warrior details"""
     warrior_service = WarriorService(db)
-    return await warrior_service.get_warrior_by_id(user_id)
\ No newline at end of file
+    return FastJSONResponse(await warrior_service.get_warrior_by_id(user_id))
\ No newline at end of file
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable
+from fastapi import Request, WebSocket, WebSocketDisconnect
+from app.core.pubsub import OVERFLOW, Subscription
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Comment line sent on idle SSE streams so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = 15
+# WebSocket close code for "try again later" (client fell behind)
+WS_TRY_AGAIN_LATER = 1013
+
+
+async def sse_events(request: Request, subscribe: Callable[[], Subscription]) -> AsyncIterator[str]:
+    """
+    Relay a subscription as Server-Sent Events until the client leaves or falls behind.
+    The subscription is opened here, once the body starts, so a client that disconnects
+    before the response begins never leaves one registered.
+    """
+    subscription = subscribe()
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+
+            if message is OVERFLOW:
+                yield "event: overflow\ndata: {}\n\n"
+                break
+            yield f"data: {json.dumps(message)}\n\n"
+    finally:
+        subscription.close()
+
+
+async def pump_websocket(websocket: WebSocket, subscription: Subscription) -> None:
+    """
+    Accept the WebSocket and relay a subscription to it until either side goes away.
+    Subscribe before calling, so nothing published after the handshake is missed;
+    the subscription is closed here even if the handshake fails.
+    """
+    try:
+        await websocket.accept()
+    except Exception:
+        subscription.close()
+        raise
+
+    async def send():
+        while True:
+            message = await subscription.get()
+            if message is OVERFLOW:
+                await websocket.close(code=WS_TRY_AGAIN_LATER)
+                return
+            await websocket.send_json(message)
+
+    async def receive():
+        # Inbound frames are ignored; this only notices the disconnect
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        subscription.close()
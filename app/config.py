@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 
@@ -6,17 +7,99 @@ class Settings(BaseSettings):
     # MongoDB
     mongodb_uri: str
     database_name: str
+    # Multi-document transactions need a replica set (Atlas, or mongod --replSet); on a standalone
+    # mongod they are turned off at connect whatever this says
+    mongodb_transactions: bool = True
+    # Build missing indexes at startup; turn off when scripts/apply_indexes.py runs before deploys
+    index_build_on_startup: bool = True
+    index_build_lease_seconds: int = 600
+
+    # Metrics (/metrics, Prometheus text format, per worker) and Mongo command monitoring. Off by
+    # default: the output lists every route and its traffic. With metrics_token set, scrapers must
+    # send "Authorization: Bearer <metrics_token>"
+    metrics_enabled: bool = False
+    metrics_token: str = ""
+    # BSON-encodes each command and reply to count bytes; turn off to save the CPU
+    mongo_metrics_bytes: bool = True
+    mongo_slow_command_ms: float = 100.0
+    # Event-loop lag monitor; the blocking stack is logged when the loop stalls past the threshold
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_seconds: float = 0.1
+    loop_block_threshold_ms: float = 100.0
+
+    # Request profiling: an admin sends "X-Profile: 1", or one in profiling_sample_rate requests
+    # is profiled automatically (0 = never); profiles are kept profile_retention_days
+    profiling_enabled: bool = True
+    profiling_sample_rate: int = 0
+    profiling_interval_ms: float = 5.0
+    profile_retention_days: int = 7
 
     # Security
     jwt_secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 30
+
+    # Token revocation (Bloom filter in front of the revoked_tokens collection)
+    revocation_bloom_capacity: int = 100000
+    revocation_bloom_error_rate: float = 0.001
+    revocation_sync_seconds: int = 30
+
+    # Password hashing (bcrypt runs on a dedicated thread pool)
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+
+    # Authenticated user cache (per worker)
+    user_cache_ttl_seconds: int = 30
+    user_cache_max_size: int = 2048
 
     # File Upload
     upload_dir: str = "./uploads"
     max_file_size: int = 5242880
     allowed_extensions: List[str] = ["jpg", "jpeg", "png", "webp"]
 
+    # Bulk issue import
+    bulk_import_batch_size: int = 1000
+    bulk_import_max_errors: int = 1000
+
+    # Streaming exports
+    export_batch_size: int = 1000
+
+    # Volunteer discussion history
+    discussion_page_size: int = 50
+    discussion_page_max: int = 200
+    membership_cache_ttl_seconds: int = 30
+    membership_cache_max_size: int = 4096
+
+    # Rendered /api/events payloads (per worker)
+    events_cache_max_entries: int = 64
+    events_cache_version_ttl_seconds: float = 1.0
+    events_cache_max_stale_seconds: float = 30.0
+
+    # In-memory rewards catalog (per worker)
+    rewards_catalog_version_ttl_seconds: float = 1.0
+    rewards_catalog_max_stale_seconds: float = 0.0
+
+    # Real-time pub/sub ("local" = single process, "mongo" = capped collection shared by workers)
+    pubsub_broker: str = "local"
+    pubsub_queue_size: int = 100
+    pubsub_capped_size_bytes: int = 16 * 1024 * 1024
+
+    # Live issue feed ("bus" = services publish over pub/sub, "change_stream" = watch the issues
+    # collection, needs a replica set, "local" = this process only)
+    issue_feed_source: str = "bus"
+    issue_feed_coalesce_seconds: float = 1.0
+    issue_feed_max_pending: int = 500
+
+    # Notifications (outbox drained by a background dispatcher)
+    notification_channels: List[str] = ["in_app"]
+    notification_batch_size: int = 100
+    notification_poll_seconds: float = 2.0
+    notification_lease_seconds: int = 60
+    notification_max_attempts: int = 5
+    notification_collapse_seconds: int = 300
+
     # Storage Provider (local or cloudinary)
     use_cloudinary: bool = True
     
@@ -39,4 +122,24 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+class LazySettings:
+    """
+    Stands in for the Settings instance: the environment and .env are read on
+    the first attribute access, not when app.config is imported, so importing
+    a module (or a script setting the environment first) costs nothing.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+
+settings = LazySettings()
@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from app.config import settings
+
+
+class TTLCache:
+    """Small in-process cache with per-entry expiry and LRU eviction"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# User documents keyed by str(user _id), filled by get_current_user
+user_cache = TTLCache(maxsize=settings.user_cache_max_size, ttl=settings.user_cache_ttl_seconds)
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a cached user document after a profile or points write"""
+    user_cache.invalidate(str(user_id))
+
+
+# Active volunteer memberships keyed by (issue_id, user_id); only positive results are cached
+membership_cache = TTLCache(maxsize=settings.membership_cache_max_size, ttl=settings.membership_cache_ttl_seconds)
+
+
+def invalidate_membership(issue_id, user_id) -> None:
+    """Drop a cached membership after volunteering or withdrawing"""
+    membership_cache.invalidate((str(issue_id), str(user_id)))
@@ -1,36 +1,77 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, GEOSPHERE, DESCENDING
+from pymongo import ReturnDocument
 from app.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.mongo_monitoring import command_monitor
+
+MEMORY_URI = "memory://"
 
 
 class Database:
     client: AsyncIOMotorClient = None
+    # Resolved at connect: MONGODB_TRANSACTIONS and a deployment that supports them
+    transactions: bool = False
 
 db = Database()
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.mongodb_uri)
-
-    # Creating Indexes
-    database = db.client[settings.database_name]
-    await database.users.create_index([("username", ASCENDING)], unique=True)
-    await database.users.create_index([("email", ASCENDING)], unique=True)
-    await database.issues.create_index([("location", GEOSPHERE)])
-    await database.issues.create_index([("status", ASCENDING)])
-    await database.volunteers.create_index([("issue_id", ASCENDING), ("user_id", ASCENDING)], unique=True, partialFilterExpression={"status": "active"})
-    await database.volunteers.create_index([("issue_id", ASCENDING), ("status", ASCENDING), ("volunteered_at", DESCENDING)])
-    await database.pledges.create_index([("issue_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)])
-    await database.pledges.create_index([("pledger_id", ASCENDING)])
-    await database.rewards.create_index([("available", DESCENDING), ("points_required", ASCENDING)])
-    await database.rewards.create_index([("name", ASCENDING)])
-    await database.redemptions.create_index([("user_id", ASCENDING), ("redeemed_at", DESCENDING)])
-    await database.redemptions.create_index([("reward_id", ASCENDING)])
+    if settings.mongodb_uri.startswith(MEMORY_URI):
+        # In-process stand-in (mongomock-motor) for load tests and offline runs; no transactions,
+        # geo queries or change streams, and nothing survives the process
+        from mongomock_motor import AsyncMongoMockClient
+        db.client = AsyncMongoMockClient()
+        db.transactions = False
+    else:
+        # The command monitor feeds the per-request Mongo metrics, profile summaries and the slow-command log
+        listeners = [command_monitor] if settings.metrics_enabled or settings.profiling_enabled else []
+        db.client = AsyncIOMotorClient(settings.mongodb_uri, event_listeners=listeners)
+        db.transactions = settings.mongodb_transactions and await supports_transactions(db.client)
+
+    # Indexes come from the registry in app.core.indexes; skipped when already applied
+    if settings.index_build_on_startup:
+        await ensure_indexes(db.client[settings.database_name])
 
     print("Connected to MongoDB")
 
+async def supports_transactions(client) -> bool:
+    """Transactions need a replica set member or a mongos; a standalone mongod rejects them"""
+    hello = await client.admin.command("hello")
+    if "setName" in hello or hello.get("msg") == "isdbgrid":
+        return True
+    print("MongoDB is a standalone server; writes run without transactions")
+    return False
+
 async def close_mongo_connection():
     db.client.close()
     print("Closed Mongo Connection")
 
+async def run_in_transaction(callback):
+    """
+    Run callback(session) in a transaction, retrying on transient errors.
+    When transactions are disabled, or the server is a standalone mongod, the
+    callback runs once with session=None.
+    """
+    if not db.transactions:
+        return await callback(None)
+
+    async with await db.client.start_session() as session:
+        return await session.with_transaction(callback)
+
+async def insert_and_return(collection, document: dict, session=None) -> dict:
+    """Insert document and return it with its new _id instead of reading it back"""
+    result = await collection.insert_one(document, session=session)
+    document["_id"] = result.inserted_id
+    return document
+
+async def update_and_return(collection, filter: dict, update, projection=None, session=None):
+    """Apply update and return the updated document from the same round trip (None if unmatched)"""
+    return await collection.find_one_and_update(
+        filter,
+        update,
+        projection=projection,
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+
 def get_database():
     return db.client[settings.database_name]
\ No newline at end of file
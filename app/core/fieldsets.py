@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, create_model
+
+
+@lru_cache(maxsize=256)
+def _reduced_model(model: Type[BaseModel], selected: FrozenSet[str]) -> Type[BaseModel]:
+    fields = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in selected
+    }
+    return create_model(f"{model.__name__}Sparse", **fields)
+
+
+class Fieldset:
+    """
+    Sparse fieldsets for a response model: turns ?fields=a,b into a Mongo
+    projection and a reduced response model carrying only those fields.
+
+    sources maps response fields to the document fields they are built from,
+    where the names differ (e.g. latitude -> location); "id" is always returned.
+    """
+
+    def __init__(self, model: Type[BaseModel], sources: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.model = model
+        self.sources = {"id": ("_id",), **(sources or {})}
+
+    def parse(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Validate a fields parameter; None means the full representation"""
+        if not fields:
+            return None
+
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(self.model.model_fields))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        return tuple(dict.fromkeys(["id", *requested]))
+
+    def projection(self, selected: Optional[Tuple[str, ...]]) -> Optional[dict]:
+        if selected is None:
+            return None
+        return {source: 1 for name in selected for source in self.sources.get(name, (name,))}
+
+    def apply(self, items: Iterable[BaseModel], selected: Optional[Tuple[str, ...]]) -> List[BaseModel]:
+        """Copy the selected fields of formatted responses into the reduced model"""
+        if selected is None:
+            return list(items)
+
+        model = _reduced_model(self.model, frozenset(selected))
+        return [model.model_construct(**{name: item.__dict__.get(name) for name in selected}) for item in items]
@@ -0,0 +1,202 @@
+"""
+Declarative index registry.
+
+Every index the app relies on is listed in index_registry(). Its
+fingerprint is stored in schema_migrations once all of them are built, so
+a worker whose registry matches skips index creation entirely; otherwise
+the builds for all collections run concurrently under a lease so that
+workers starting together do not race each other.
+
+Add, change or remove an index here (never in connect_to_mongo); the
+fingerprint changes with it and the next startup, or scripts/apply_indexes.py
+ahead of a deploy, reconciles each collection against list_indexes():
+missing indexes are built, a changed TTL is applied in place with collMod,
+an index whose other options changed is dropped and rebuilt, and indexes
+no longer in the registry are dropped (_id_ is left alone).
+"""
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+
+
+def index_registry() -> Dict[str, List[IndexModel]]:
+    """
+    Built on call, not at import. Options must be constants: a value taken
+    from settings would change the index (and force a rebuild) whenever the
+    setting changes; store a per-document expires_at instead.
+    """
+    return {
+        "users": [
+            IndexModel([("username", ASCENDING)], unique=True),
+            IndexModel([("email", ASCENDING)], unique=True),
+            # Warriors list and leaderboard
+            IndexModel([("points", DESCENDING)]),
+        ],
+        "issues": [
+            IndexModel([("location", GEOSPHERE)]),
+            # Newest-first listings: all issues, by status, and a reporter's issues (dashboard)
+            IndexModel([("created_at", DESCENDING)]),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        ],
+        "volunteers": [
+            IndexModel([("issue_id", ASCENDING), ("user_id", ASCENDING)], unique=True, partialFilterExpression={"status": "active"}),
+            IndexModel([("issue_id", ASCENDING), ("status", ASCENDING), ("volunteered_at", DESCENDING)]),
+        ],
+        "pledges": [
+            IndexModel([("issue_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("pledger_id", ASCENDING)]),
+        ],
+        "rewards": [
+            IndexModel([("available", DESCENDING), ("points_required", ASCENDING)]),
+            IndexModel([("name", ASCENDING)]),
+        ],
+        "redemptions": [
+            IndexModel([("user_id", ASCENDING), ("redeemed_at", DESCENDING)]),
+            IndexModel([("reward_id", ASCENDING)]),
+        ],
+        "revoked_tokens": [
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ],
+        # Used refresh jtis (rotation); looked up only by _id from /api/auth/refresh
+        "spent_refresh_tokens": [
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ],
+        "volunteer_discussions": [
+            IndexModel([("issue_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+        ],
+        "notification_outbox": [
+            IndexModel([("status", ASCENDING), ("available_at", ASCENDING)]),
+            IndexModel([("claimed_by", ASCENDING)], sparse=True),
+            IndexModel([("processed_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+        ],
+        "request_profiles": [
+            IndexModel([("created_at", DESCENDING)]),
+            IndexModel([("route", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ],
+        "notifications": [
+            IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("read", ASCENDING), ("updated_at", DESCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("issue_id", ASCENDING), ("read", ASCENDING), ("updated_at", DESCENDING)]),
+        ],
+    }
+
+
+VERSION_ID = "indexes"
+LOCK_ID = "indexes_lock"
+
+# Fields the server adds to an index description that are not options we set
+_SERVER_INDEX_FIELDS = {"v", "ns", "name", "2dsphereIndexVersion", "textIndexVersion"}
+
+
+def registry_version() -> str:
+    """Fingerprint of the registry; changes whenever an index or its options change"""
+    spec = {
+        collection: sorted(json.dumps(model.document, sort_keys=True, default=str) for model in models)
+        for collection, models in index_registry().items()
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+async def applied_version(database) -> str:
+    doc = await database.schema_migrations.find_one({"_id": VERSION_ID})
+    return doc["version"] if doc else None
+
+
+async def ensure_indexes(database, force: bool = False) -> bool:
+    """
+    Reconcile every collection with the registry unless the stored version
+    already matches. Returns True when this call applied it, False when it was
+    current or another process holds the build lease (it will record the version).
+    """
+    version = registry_version()
+    if not force and await applied_version(database) == version:
+        return False
+
+    owner = uuid.uuid4().hex
+    if not await _acquire_lease(database, owner):
+        print("Index build already running in another process; skipping")
+        return False
+
+    try:
+        await asyncio.gather(*(
+            _reconcile(database[collection], models)
+            for collection, models in index_registry().items()
+        ))
+        await database.schema_migrations.update_one(
+            {"_id": VERSION_ID},
+            {"$set": {"version": version, "applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        print(f"Indexes built (version {version})")
+        return True
+    finally:
+        await database.schema_migrations.delete_one({"_id": LOCK_ID, "owner": owner})
+
+
+def _index_spec(description) -> dict:
+    """Key and options of an index, comparable between an IndexModel and list_indexes()"""
+    spec = {field: value for field, value in description.items() if field not in _SERVER_INDEX_FIELDS}
+    spec["key"] = [
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in description["key"].items()
+    ]
+    return spec
+
+
+async def _reconcile(collection, models: List[IndexModel]) -> None:
+    existing = {
+        index["name"]: index for index in await collection.list_indexes().to_list(None)
+        if index["name"] != "_id_"
+    }
+    wanted = {model.document["name"]: model for model in models}
+
+    # Dropped first, so a replacement under a new name does not collide on the same key
+    for name in existing.keys() - wanted.keys():
+        await collection.drop_index(name)
+        print(f"Dropped index {collection.name}.{name} (no longer in the registry)")
+
+    to_create = []
+    for name, model in wanted.items():
+        if name not in existing:
+            to_create.append(model)
+            continue
+
+        want, have = _index_spec(model.document), _index_spec(existing[name])
+        changed = {field for field in want.keys() | have.keys() if want.get(field) != have.get(field)}
+        if not changed:
+            continue
+        if changed == {"expireAfterSeconds"} and "expireAfterSeconds" in want and "expireAfterSeconds" in have:
+            await collection.database.command({
+                "collMod": collection.name,
+                "index": {"name": name, "expireAfterSeconds": want["expireAfterSeconds"]}
+            })
+            print(f"Changed TTL of {collection.name}.{name} to {want['expireAfterSeconds']}s")
+        else:
+            await collection.drop_index(name)
+            to_create.append(model)
+            print(f"Rebuilding index {collection.name}.{name} ({', '.join(sorted(changed))} changed)")
+
+    if to_create:
+        await collection.create_indexes(to_create)
+
+
+async def _acquire_lease(database, owner: str) -> bool:
+    now = datetime.utcnow()
+    try:
+        # Matches only an expired lease; otherwise the upsert collides on _id
+        await database.schema_migrations.update_one(
+            {"_id": LOCK_ID, "expires_at": {"$lt": now}},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=settings.index_build_lease_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from app.config import settings
+from app.core.metrics import registry
+
+LAG_SECONDS = registry.histogram(
+    "event_loop_lag_seconds", "How late the loop monitor's tick ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+BLOCKED = registry.counter(
+    "event_loop_blocked_total", "Times the event loop was blocked beyond loop_block_threshold_ms, by blocking function",
+    ("function",)
+)
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_STACK_LIMIT = 25
+
+
+def _blocking_function(frame) -> str:
+    """The innermost frame in our own code (app/...), else the innermost frame; as module.function"""
+    innermost = frame
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_APP_ROOT):
+            break
+        frame = frame.f_back
+    frame = frame or innermost
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag with a tick coroutine and, from a watchdog
+    thread, captures the loop thread's stack when a tick is overdue by more
+    than loop_block_threshold_ms. Synchronous work on the loop (image
+    compression, an SDK upload, a hash) is then logged by name with the
+    task it ran in, instead of showing up only as tail latency.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._last_tick = 0.0
+        self._tick_count = 0
+        self._reported_tick = -1
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _tick(self) -> None:
+        interval = settings.loop_monitor_interval_seconds
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            LAG_SECONDS.observe(max(0.0, now - expected))
+            self._last_tick = now
+            self._tick_count += 1
+
+    def _watch(self) -> None:
+        threshold = settings.loop_block_threshold_ms / 1000
+        interval = settings.loop_monitor_interval_seconds
+        while not self._stopping.wait(threshold / 2):
+            overdue = time.monotonic() - self._last_tick - interval
+            # One report per stall: the tick count only moves once the loop is free again
+            if overdue >= threshold and self._reported_tick != self._tick_count:
+                self._reported_tick = self._tick_count
+                self._report(overdue)
+
+    def _report(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+
+        function = _blocking_function(frame)
+        BLOCKED.inc((function,))
+
+        task = asyncio.current_task(self._loop)
+        task_name = task.get_name() if task is not None else "-"
+        coro = getattr(task.get_coro(), "__qualname__", "?") if task is not None else "-"
+        stack = "".join(traceback.format_stack(frame, limit=_STACK_LIMIT))
+        print(
+            f"Event loop blocked for {overdue * 1000:.0f}ms+ in {function} "
+            f"(task {task_name}, {coro}):\n{stack}"
+        )
+
+
+loop_monitor = LoopMonitor()
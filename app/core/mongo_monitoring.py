@@ -0,0 +1,162 @@
+import json
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+import bson
+from pymongo import monitoring
+from app.config import settings
+from app.core.metrics import registry, COUNT_BUCKETS, BYTES_BUCKETS
+
+# Commands issued outside a request (dispatcher, feeds, startup) are labelled with this route
+BACKGROUND = "background"
+UNMATCHED = "unmatched"
+
+# Session and cluster bookkeeping that says nothing about the query
+_IGNORED_FIELDS = {
+    "lsid", "$clusterTime", "$db", "txnNumber", "autocommit", "startTransaction",
+    "$readPreference", "readConcern", "writeConcern", "apiVersion", "comment",
+}
+# Values kept as-is in a command shape; everything else is replaced by "?"
+_LITERAL_FIELDS = {"sort", "projection", "hint", "limit", "batchSize", "ordered", "upsert", "multi", "new"}
+_SHAPE_MAX_CHARS = 1000
+
+COMMANDS = registry.counter(
+    "mongo_commands_total", "MongoDB commands sent, by route and command", ("method", "route", "command")
+)
+COMMAND_SECONDS = registry.histogram(
+    "mongo_command_seconds", "Server round-trip time of each MongoDB command", ("command",)
+)
+SLOW_COMMANDS = registry.counter(
+    "mongo_slow_commands_total", "MongoDB commands slower than mongo_slow_command_ms", ("command",)
+)
+REQUEST_COMMANDS = registry.histogram(
+    "mongo_request_commands", "MongoDB commands per HTTP request", ("method", "route"), COUNT_BUCKETS
+)
+REQUEST_SECONDS = registry.histogram(
+    "mongo_request_seconds", "Total MongoDB round-trip time per HTTP request", ("method", "route")
+)
+REQUEST_BYTES = registry.histogram(
+    "mongo_request_bytes", "BSON bytes exchanged with MongoDB per HTTP request", ("method", "route", "direction"), BYTES_BUCKETS
+)
+
+
+class RequestDbStats:
+    """Database work done on behalf of one HTTP request"""
+
+    __slots__ = ("scope", "commands", "seconds", "sent_bytes", "received_bytes", "_lock")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.commands = 0
+        self.seconds = 0.0
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        # Commands from one request can run concurrently on Motor's executor threads
+        self._lock = threading.Lock()
+
+    @property
+    def labels(self) -> Tuple[str, str]:
+        # The router stores the matched route in the scope before the endpoint runs
+        route = self.scope.get("route")
+        return self.scope.get("method", ""), getattr(route, "path", UNMATCHED)
+
+    def record(self, seconds: float, sent: int, received: int) -> None:
+        with self._lock:
+            self.commands += 1
+            self.seconds += seconds
+            self.sent_bytes += sent
+            self.received_bytes += received
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "commands": self.commands,
+            "seconds": round(self.seconds, 6),
+            "sent_bytes": self.sent_bytes,
+            "received_bytes": self.received_bytes,
+        }
+
+
+# Set by RequestMetricsMiddleware; Motor copies the context onto its executor threads,
+# so the listener callbacks see the request that issued the command
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def observe_request(stats: RequestDbStats) -> None:
+    """Record a finished request's totals in the per-route histograms"""
+    labels = stats.labels
+    REQUEST_COMMANDS.observe(stats.commands, labels)
+    REQUEST_SECONDS.observe(stats.seconds, labels)
+    if settings.mongo_metrics_bytes:
+        REQUEST_BYTES.observe(stats.sent_bytes, labels + ("sent",))
+        REQUEST_BYTES.observe(stats.received_bytes, labels + ("received",))
+
+
+def _shape(value: Any, literal: bool = False) -> Any:
+    if isinstance(value, dict):
+        return {key: _shape(item, literal or key in _LITERAL_FIELDS) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return []
+        shaped = [_shape(value[0], literal)]
+        if len(value) > 1:
+            shaped.append(f"... {len(value)} items")
+        return shaped
+    if literal and isinstance(value, (int, float, str, bool)):
+        return value
+    return "?"
+
+
+def command_shape(command_name: str, command: dict) -> str:
+    """The command with its values blanked out, e.g. {"find": "issues", "filter": {"status": "?"}, ...}"""
+    shape = {}
+    for key, value in command.items():
+        if key in _IGNORED_FIELDS:
+            continue
+        shape[key] = value if key == command_name else _shape(value, key in _LITERAL_FIELDS)
+    text = json.dumps(shape, default=str)
+    return text if len(text) <= _SHAPE_MAX_CHARS else text[:_SHAPE_MAX_CHARS] + "..."
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Counts every command the driver sends, attributes it to the current
+    request (via request_db_stats) and logs the shape of slow commands.
+    """
+
+    def __init__(self):
+        # (connection, request id) -> command, held until the reply arrives
+        self._inflight: Dict[Tuple[Any, int], dict] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._inflight[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, event.reply)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, None)
+
+    def _finish(self, event, reply: Optional[dict]) -> None:
+        command = self._inflight.pop((event.connection_id, event.request_id), None)
+        seconds = event.duration_micros / 1_000_000
+        stats = request_db_stats.get()
+        method, route = stats.labels if stats is not None else ("", BACKGROUND)
+
+        sent = received = 0
+        if settings.mongo_metrics_bytes:
+            sent = len(bson.encode(command)) if command else 0
+            received = len(bson.encode(reply)) if reply else 0
+
+        COMMANDS.inc((method, route, event.command_name))
+        COMMAND_SECONDS.observe(seconds, (event.command_name,))
+        if stats is not None:
+            stats.record(seconds, sent, received)
+
+        if seconds * 1000 >= settings.mongo_slow_command_ms:
+            SLOW_COMMANDS.inc((event.command_name,))
+            shape = command_shape(event.command_name, command) if command else event.command_name
+            outcome = "" if reply is not None else " (failed)"
+            print(f"Slow Mongo command{outcome}: {seconds * 1000:.1f}ms {method} {route} {shape}")
+
+
+command_monitor = CommandMonitor()
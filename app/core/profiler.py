@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from typing import List, Optional
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{code.co_name}:{code.co_firstlineno}"
+
+
+def _thread_stack(frame, root_code) -> List[str]:
+    """Outermost-first labels for a thread's stack, starting at the task's own coroutine"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+
+    # Drop the event loop's frames above the task
+    for i, candidate in enumerate(frames):
+        if candidate.f_code is root_code:
+            frames = frames[i:]
+            break
+    return [_label(f) for f in frames]
+
+
+def _await_stack(coro) -> List[str]:
+    """Outermost-first labels for a suspended task: its chain of awaits down to what it waits on"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            # Usually a future (an executor call, a socket read); the iterator type is an implementation detail
+            name = type(coro).__name__
+            labels.append(f"<await {'Future' if name == 'FutureIter' else name}>")
+            break
+        # Skip asyncio's own wrappers (wait_for, gather) so stacks stay comparable
+        if not frame.f_code.co_filename.startswith(_ASYNCIO_DIR):
+            labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None)
+    return labels
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for a single asyncio task.
+
+    A background thread wakes every interval. If the task is running on the
+    loop it records the loop thread's stack (CPU on the loop); otherwise it
+    records the task's await chain, ending in what it is waiting for (a
+    database reply, an executor, a lock). Samples are kept in the folded
+    format ("a;b;c count") read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        self.task = task
+        self.interval = interval
+        self.samples = 0
+        self._counts: Counter = Counter()
+        self._loop = task.get_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._root_code = getattr(task.get_coro(), "cr_code", None)
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop sampling; the sampler thread is joined off the loop so the loop never waits on it"""
+        self._stopping.set()
+        if self._thread is not None:
+            thread, self._thread = self._thread, None
+            await asyncio.to_thread(thread.join)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                # Frames can disappear under us; a lost sample is harmless
+                pass
+
+    def _sample(self) -> None:
+        if asyncio.current_task(self._loop) is self.task:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = _thread_stack(frame, self._root_code)
+        else:
+            stack = _await_stack(self.task.get_coro())
+        if stack:
+            self._counts[";".join(stack)] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self._counts.most_common())
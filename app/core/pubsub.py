@@ -0,0 +1,187 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+from bson import ObjectId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from app.config import settings
+
+# Put on a subscriber's queue when it fell too far behind; the consumer should
+# disconnect and let the client catch up from history.
+OVERFLOW = object()
+
+
+class Subscription:
+    """One subscriber's bounded queue on a topic"""
+
+    def __init__(self, hub: "PubSubHub", topic: str, maxsize: int):
+        self.hub = hub
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, message: dict) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and tell it to go away
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalBroker:
+    """Single-process stand-in: published messages go straight back to this worker's hub"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[str, dict], None]] = None
+
+    async def start(self, deliver: Callable[[str, dict], None]) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, topic: str, message: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(topic, message)
+
+
+class MongoBroker:
+    """
+    Cross-worker broker over a capped collection. Publishing is one insert;
+    every worker tails the collection with a tailable-await cursor and hands
+    new messages to its own hub (including messages it published itself).
+    """
+
+    def __init__(self, get_db: Callable, collection_name: str = "pubsub_messages"):
+        self._get_db = get_db
+        self._collection_name = collection_name
+        self._deliver: Optional[Callable[[str, dict], None]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Callable[[str, dict], None]) -> None:
+        self._deliver = deliver
+        db = self._get_db()
+        try:
+            await db.create_collection(
+                self._collection_name, capped=True, size=settings.pubsub_capped_size_bytes
+            )
+        except CollectionInvalid:
+            pass  # Already created by another worker
+        self._task = asyncio.create_task(self._tail())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, topic: str, message: dict) -> None:
+        await self._get_db()[self._collection_name].insert_one({"topic": topic, "message": message})
+
+    async def _tail(self) -> None:
+        collection = self._get_db()[self._collection_name]
+        # Only messages published after this worker started
+        last_id = ObjectId.from_datetime(datetime.utcnow())
+        while True:
+            cursor = collection.find(
+                {"_id": {"$gt": last_id}},
+                cursor_type=CursorType.TAILABLE_AWAIT
+            )
+            try:
+                while cursor.alive:
+                    async for doc in cursor:
+                        last_id = doc["_id"]
+                        self._deliver(doc["topic"], doc["message"])
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Pub/sub tail interrupted, reconnecting: {str(e)}")
+            await asyncio.sleep(1)
+
+
+class PubSubHub:
+    """
+    In-process topic fan-out. Publishing goes through the configured broker,
+    which delivers back to the hub of every worker; the hub then hands the
+    message to each local subscriber's bounded queue.
+    """
+
+    def __init__(self):
+        self.broker = LocalBroker()
+        self._topics: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._listeners: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+
+    def configure(self, broker) -> None:
+        self.broker = broker
+
+    async def start(self) -> None:
+        await self.broker.start(self._dispatch)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+
+    def subscribe(self, topic: str, maxsize: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, topic, maxsize or settings.pubsub_queue_size)
+        self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+
+    def listen(self, topic: str, callback: Callable[[dict], None]) -> None:
+        """Register a synchronous callback for every message on topic (for in-process consumers)"""
+        self._listeners[topic].append(callback)
+
+    def unlisten(self, topic: str, callback: Callable[[dict], None]) -> None:
+        listeners = self._listeners.get(topic)
+        if listeners and callback in listeners:
+            listeners.remove(callback)
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._topics.get(topic, ()))
+
+    async def publish(self, topic: str, message: dict) -> None:
+        await self.broker.publish(topic, message)
+
+    def _dispatch(self, topic: str, message: dict) -> None:
+        for subscription in list(self._topics.get(topic, ())):
+            subscription.deliver(message)
+        for callback in list(self._listeners.get(topic, ())):
+            callback(message)
+
+
+def create_broker(name: str, get_db: Callable):
+    if name == "mongo":
+        return MongoBroker(get_db)
+    if name == "local":
+        return LocalBroker()
+    raise ValueError(f"Unknown pub/sub broker: {name}")
+
+
+hub = PubSubHub()
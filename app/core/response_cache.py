@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+from app.core.versions import CollectionVersion, get_version, on_version_bump
+
+
+class CachedPayload(NamedTuple):
+    version: int
+    body: Any  # Rendered bytes, or any other immutable value built from the collection
+    last_modified: Optional[object]
+    created_at: float
+
+
+class VersionedPayloadCache:
+    """
+    Rendered response bodies (or other immutable values) for one collection,
+    keyed by query parameters and tagged with the collection version they
+    were built from.
+
+    - The version is re-read from Mongo at most every version_ttl seconds
+      (always after a local bump), so other workers' writes are seen quickly.
+    - A body from an older version is still served for up to max_stale seconds
+      while one background task rebuilds it (stale-while-revalidate).
+    - Concurrent misses for the same key share a single rebuild (single-flight).
+    """
+
+    def __init__(self, name: str, maxsize: int, version_ttl: float, max_stale: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.version_ttl = version_ttl
+        self.max_stale = max_stale
+        self._entries: "OrderedDict[Hashable, CachedPayload]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._version: Optional[CollectionVersion] = None
+        self._version_checked_at = 0.0
+        self._version_task: Optional[asyncio.Task] = None
+        # Moves on every local bump; version reads started before it are not cached
+        self._generation = 0
+        on_version_bump(name, self.mark_stale)
+
+    def mark_stale(self) -> None:
+        """Drop the cached version so the next request reads it back after this worker's write"""
+        self._version = None
+        self._version_task = None
+        self._generation += 1
+
+    async def version(self, db) -> CollectionVersion:
+        """The collection version, cached like get(); lets callers answer a conditional request first"""
+        return await self._current_version(db)
+
+    async def get(self, db, key: Hashable, render: Callable[[], Awaitable[Any]]) -> CachedPayload:
+        version = await self._current_version(db)
+        entry = self._entries.get(key)
+
+        if entry is not None and entry.version >= version.version:
+            self._entries.move_to_end(key)
+            return entry
+
+        refresh = self._refresh(key, version, render)
+        if entry is not None and time.monotonic() - entry.created_at < self.max_stale:
+            return entry
+
+        # Shielded so a client disconnect does not cancel the rebuild others are waiting on
+        return await asyncio.shield(refresh)
+
+    async def _current_version(self, db) -> CollectionVersion:
+        if self._version is not None and time.monotonic() - self._version_checked_at < self.version_ttl:
+            return self._version
+
+        if self._version_task is None:
+            self._version_task = self._spawn(self._load_version(db, self._generation))
+        if self._version is not None:
+            return self._version
+        return await asyncio.shield(self._version_task)
+
+    async def _load_version(self, db, generation: int) -> CollectionVersion:
+        try:
+            version = await get_version(db, self.name)
+            # A read that started before a local bump may predate the write
+            if generation == self._generation:
+                self._version = version
+                self._version_checked_at = time.monotonic()
+            return version
+        finally:
+            if generation == self._generation:
+                self._version_task = None
+
+    def _refresh(self, key: Hashable, version: CollectionVersion, render: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._spawn(self._build(key, version, render))
+            self._inflight[key] = task
+        return task
+
+    async def _build(self, key: Hashable, version: CollectionVersion, render: Callable[[], Awaitable[Any]]) -> CachedPayload:
+        # Tagged with the version read before rendering: a concurrent write makes it stale, never wrongly fresh
+        try:
+            entry = CachedPayload(version.version, await render(), version.updated_at, time.monotonic())
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return entry
+        finally:
+            self._inflight.pop(key, None)
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        task.add_done_callback(self._report_failure)
+        return task
+
+    def _report_failure(self, task: asyncio.Task) -> None:
+        # Background refreshes may have no awaiting request to surface the error
+        if not task.cancelled() and task.exception() is not None:
+            print(f"{self.name} cache refresh failed: {str(task.exception())}")
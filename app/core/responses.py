@@ -0,0 +1,28 @@
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(value):
+    # Response models built with model_construct are trusted: dump their fields as-is
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson response that also accepts response models directly.
+    Returning one from a route skips FastAPI's response_model validation and
+    re-encoding, so only use it for content the services built themselves.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import math
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter; answers "definitely absent" or "maybe present"."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti) and token families (fam).
+
+    The exact set lives in the revoked_tokens collection (TTL-indexed on
+    expires_at). Each worker keeps a Bloom filter of it so the common case,
+    a token that was never revoked, is answered without touching Mongo.
+    Filter hits are confirmed against the collection. Revocations made by
+    other workers are picked up by a periodic rebuild.
+    """
+
+    def __init__(self):
+        self._filter = self._new_filter()
+        self._local_since_rebuild: set = set()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(settings.revocation_bloom_capacity, settings.revocation_bloom_error_rate)
+
+    async def load(self, db) -> None:
+        """Rebuild the filter from the backing collection"""
+        self._local_since_rebuild = set()
+        bloom = self._new_filter()
+
+        async for doc in db.revoked_tokens.find({}, {"_id": 1}):
+            bloom.add(doc["_id"])
+
+        # Keep ids revoked on this worker while the rebuild was reading
+        for token_id in self._local_since_rebuild:
+            bloom.add(token_id)
+
+        self._filter = bloom
+
+    async def is_revoked(self, db, token_ids: Iterable[Optional[str]]) -> bool:
+        candidates = [token_id for token_id in token_ids if token_id and token_id in self._filter]
+        if not candidates:
+            return False
+
+        found = await db.revoked_tokens.find_one({"_id": {"$in": candidates}}, {"_id": 1})
+        return found is not None
+
+    async def revoke(self, db, token_id: str, expires_at: datetime, reason: str) -> bool:
+        """Record a revocation; returns False if token_id was already revoked"""
+        self._filter.add(token_id)
+        self._local_since_rebuild.add(token_id)
+
+        try:
+            await db.revoked_tokens.insert_one({
+                "_id": token_id,
+                "reason": reason,
+                "expires_at": expires_at,
+                "revoked_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            return False
+
+        return True
+
+    def start_sync(self, get_db: Callable) -> None:
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_forever(get_db))
+
+    async def stop_sync(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+    async def _sync_forever(self, get_db: Callable) -> None:
+        while True:
+            await asyncio.sleep(settings.revocation_sync_seconds)
+            try:
+                await self.load(get_db())
+            except Exception as e:
+                print(f"Failed to refresh token revocation filter: {str(e)}")
+
+
+revocation_list = RevocationList()
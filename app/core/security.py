@@ -1,16 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_pwd_context = None
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_pending_hashes = 0
+
+def _get_pwd_context():
+    """passlib is imported on the first hash or verify, not at startup"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        # Hashes with a different cost than bcrypt_rounds are flagged for rehash on login
+        _pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=settings.bcrypt_rounds,
+            bcrypt__min_rounds=settings.bcrypt_rounds,
+            bcrypt__max_rounds=settings.bcrypt_rounds,
+        )
+    return _pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+async def _run_hashing(func, *args):
+    """Run a bcrypt call on the hashing pool, shedding load once the queue is full"""
+    global _pending_hashes
+    if _pending_hashes >= settings.password_hash_max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _pending_hashes -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(_get_pwd_context().hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash when the stored cost is outdated"""
+    return await _run_hashing(_get_pwd_context().verify_and_update, plain_password, hashed_password)
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -18,14 +77,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now() + expires_delta
     else:
         expire = datetime.now() + timedelta(minutes=15)
-    
+
     to_encode.update({"exp": expire}) # So here it updates the expiration section in the data given
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
+    """Long-lived token that can only be exchanged at /api/auth/refresh"""
+    to_encode = data.copy()
+    to_encode["type"] = "refresh"
+    return create_access_token(
+        to_encode,
+        expires_delta or timedelta(days=settings.refresh_token_expire_days)
+    )
+
 def decode_access_token(token: str):
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.algorithm]) # why is this in square brackets
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,39 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Version counter names; each is bumped after any write that changes what its listings return
+ISSUES = "issues"
+REWARDS = "rewards"
+
+
+# In-process caches to poke when this worker bumps a version (other workers poll)
+_bump_listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+
+
+class CollectionVersion(NamedTuple):
+    version: int
+    updated_at: Optional[datetime]
+
+
+async def get_version(db, name: str) -> CollectionVersion:
+    """Current version of a collection's listings (0 until the first bump)"""
+    doc = await db.collection_versions.find_one({"_id": name})
+    if not doc:
+        return CollectionVersion(0, None)
+    return CollectionVersion(doc["version"], doc.get("updated_at"))
+
+
+async def bump_version(db, name: str) -> None:
+    """Invalidate every cached or conditional view of a collection's listings"""
+    await db.collection_versions.update_one(
+        {"_id": name},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    for listener in _bump_listeners[name]:
+        listener()
+
+
+def on_version_bump(name: str, listener: Callable[[], None]) -> None:
+    _bump_listeners[name].append(listener)
@@ -1,17 +1,39 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
+import secrets
 
 from app.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
-from app.api.routes import auth, users, warriors, issues, events, rewards, volunteers, pledges
+from app.core.database import connect_to_mongo, close_mongo_connection, get_database
+from app.core.responses import FastJSONResponse
+from app.core.metrics import registry
+from app.core.loop_monitor import loop_monitor
+from app.api.middleware import RequestMetricsMiddleware, ProfilingMiddleware
+from app.core.revocation import revocation_list
+from app.core.pubsub import hub, create_broker
+from app.services.issue_feed import issue_feed, create_feed_source
+from app.services.notification_dispatcher import notification_dispatcher, create_channel
+from app.core.security import shutdown_hash_executor
+from app.api.routes import auth, users, warriors, issues, events, rewards, volunteers, pledges, exports, notifications, profiles
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
     await connect_to_mongo()
+    await revocation_list.load(get_database())
+    revocation_list.start_sync(get_database)
+    hub.configure(create_broker(settings.pubsub_broker, get_database))
+    await hub.start()
+    issue_feed.configure(create_feed_source(settings.issue_feed_source, get_database))
+    await issue_feed.start()
+    notification_dispatcher.configure(
+        get_database, [create_channel(name, get_database) for name in settings.notification_channels]
+    )
+    notification_dispatcher.start()
     
    # Only create uploads directory if using local storage
     if not settings.use_cloudinary:
@@ -20,13 +42,20 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    await notification_dispatcher.stop()
+    await issue_feed.stop()
+    await hub.stop()
+    await revocation_list.stop_sync()
+    shutdown_hash_executor()
     await close_mongo_connection()
+    await loop_monitor.stop()
 
 app = FastAPI(
     title="Tankas App API",
     description="Backend API for Tankas application",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS
@@ -38,6 +67,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling; added first so it runs inside the metrics middleware
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Route latency, in-flight requests, response sizes and per-request Mongo work, exposed on /metrics
+if settings.metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Mount static files (uploads)
 # app.mount(f"/{settings.upload_dir}", StaticFiles(directory=settings.upload_dir), name="uploads")
 
@@ -50,6 +87,9 @@ app.include_router(events.router)
 app.include_router(rewards.router)
 app.include_router(volunteers.router)
 app.include_router(pledges.router)
+app.include_router(exports.router)
+app.include_router(notifications.router)
+app.include_router(profiles.router)
 
 @app.get("/")
 async def root():
@@ -61,4 +101,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    if settings.metrics_token:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(token, settings.metrics_token):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
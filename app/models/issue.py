@@ -33,6 +33,11 @@ class IssueModel(BaseModel):
     resolution_picture_url: Optional[str] = None
     resolution_location: Optional[dict] = None  # GeoJSON format
     verification_distance_meters: Optional[float] = None
+    # Denormalized counters, kept in step with the volunteers/pledges collections
+    volunteer_count: int = 0
+    pledge_count: int = 0
+    pledged_points: float = 0
+    pledged_money: float = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now())
     updated_at: datetime = Field(default_factory=lambda: datetime.now())
     
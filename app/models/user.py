@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
@@ -11,9 +12,14 @@ class PyObjectId(ObjectId):
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type, handler: GetCoreSchemaHandler):
         # Define how this type is validated
+        # Dumped as-is for Mongo documents, as a string in JSON
         return core_schema.no_info_after_validator_function(
             cls.validate,
             core_schema.str_schema(),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda v, info: str(v) if info.mode == "json" else v,
+                info_arg=True
+            ),
         )
 
     @classmethod
@@ -65,4 +71,12 @@ class UserModel(BaseModel):
     class Config:
         populate_by_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str} # Converts ObjectId to string
\ No newline at end of file
+        json_encoders = {ObjectId: str} # Converts ObjectId to string
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Authenticated principal resolved once per request by get_current_user"""
+    id: ObjectId
+    username: str
+    document: dict = field(repr=False)
+    claims: dict = field(default_factory=dict, repr=False)
@@ -12,4 +12,8 @@ class LoginRequest(BaseModel):
 
 class Token(BaseModel):
     access_token: str
-    token_type: str = "bearer"
\ No newline at end of file
+    refresh_token: str | None = None
+    token_type: str = "bearer"
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
\ No newline at end of file
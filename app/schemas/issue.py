@@ -51,5 +51,19 @@ class IssueResponse(BaseModel):
     resolution_latitude: Optional[float] = None
     resolution_longitude: Optional[float] = None
     verification_distance_meters: Optional[float] = None
+    volunteer_count: int = 0
+    pledge_count: int = 0
+    pledged_points: float = 0
+    pledged_money: float = 0
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class NotificationResponse(BaseModel):
+    id: str
+    issue_id: Optional[str] = None
+    kind: str
+    message: str
+    count: int = 1  # Updates collapsed into this notification
+    read: bool
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    trigger: str  # "header" or "sampled"
+    samples: int
+    db: Optional[Dict[str, float]] = None  # commands, seconds, sent_bytes, received_bytes
+    created_at: datetime
+
+class ProfileResponse(ProfileSummary):
+    interval_ms: float
+    folded: str  # "frame;frame;frame count" lines, for flamegraph.pl or speedscope
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class VolunteerCreate(BaseModel):
@@ -36,4 +36,10 @@ class DiscussionMessageResponse(BaseModel):
     username: str
     avatar: Optional[str] = None
     message: str
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class DiscussionPage(BaseModel):
+    messages: List[DiscussionMessageResponse]  # Oldest first
+    has_more: bool  # More messages exist beyond this page in the direction fetched
+    before: Optional[str] = None  # Cursor for the page of older messages
+    after: Optional[str] = None  # Cursor for messages newer than this page
@@ -1,10 +1,21 @@
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta
+from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    hash_password_async,
+    verify_and_update_password,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token
+)
+from app.core.cache import invalidate_user
+from app.core.revocation import revocation_list
 from app.config import settings
 from app.schemas.auth import SignupRequest, LoginRequest, Token
-from app.models.user import UserModel
+from app.models.user import UserModel, CurrentUser
 
 class AuthService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -30,7 +41,7 @@ class AuthService:
         user_dict = {
             "username": signup_data.username,
             "email": signup_data.email,
-            "hashed_password": get_password_hash(signup_data.password),
+            "hashed_password": await hash_password_async(signup_data.password),
             "display_name": signup_data.display_name or signup_data.username,
             "points": 0,
             "tasks_completed": 0,
@@ -41,30 +52,110 @@ class AuthService:
         user = UserModel(**user_dict)
         result = await self.users_collection.insert_one(user.model_dump(by_alias=True, exclude={"id"}))
         
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-        access_token = create_access_token(
-            data={"sub": signup_data.username},
-            expires_delta=access_token_expires
-        )
-        
-        return Token(access_token=access_token)
+        return self._issue_tokens(signup_data.username, result.inserted_id)
     
     async def login(self, login_data: LoginRequest) -> Token:
         # Find user
         user = await self.users_collection.find_one({"username": login_data.username})
         
-        if not user or not verify_password(login_data.password, user["hashed_password"]):
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
             )
         
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+        verified, new_hash = await verify_and_update_password(login_data.password, user["hashed_password"])
+        if not verified:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password"
+            )
+        
+        # Transparently upgrade hashes made with an outdated bcrypt cost
+        if new_hash:
+            await self.users_collection.update_one(
+                {"_id": user["_id"]},
+                {"$set": {"hashed_password": new_hash}}
+            )
+            invalidate_user(user["_id"])
+        
+        return self._issue_tokens(user["username"], user["_id"])
+    
+    async def refresh(self, refresh_token: str) -> Token:
+        """Rotate a refresh token: the presented one is spent and a new pair is issued"""
+        payload = decode_access_token(refresh_token)
+        if not payload or payload.get("type") != "refresh" or not all(payload.get(k) for k in ("jti", "fam", "uid")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+        
+        if await revocation_list.is_revoked(self.db, (payload["fam"],)):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been revoked"
+            )
+        
+        # Spending the jti is atomic; a second use means the token leaked,
+        # so the whole family (every token from that login) is revoked.
+        if not await self._spend_refresh_token(payload["jti"], datetime.utcfromtimestamp(payload["exp"])):
+            await self._revoke_family(payload["fam"], reason="reuse_detected")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has already been used"
+            )
+        
+        user = await self.users_collection.find_one({"_id": ObjectId(payload["uid"])})
+        if not user or user["username"] != payload.get("sub"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        
+        return self._issue_tokens(user["username"], user["_id"], family=payload["fam"])
+    
+    async def logout(self, current_user: CurrentUser) -> dict:
+        """Revoke the session behind the presented access token"""
+        claims = current_user.claims
+        if claims.get("fam"):
+            await self._revoke_family(claims["fam"], reason="logout")
+        elif claims.get("jti"):
+            await revocation_list.revoke(
+                self.db, claims["jti"], datetime.utcfromtimestamp(claims["exp"]), reason="logout"
+            )
+        
+        return {"message": "Logged out successfully"}
+    
+    async def _spend_refresh_token(self, jti: str, expires_at: datetime) -> bool:
+        """
+        Mark a refresh jti as used; returns False if it already was. Kept out of
+        revoked_tokens (and so out of the Bloom filter) since only /refresh checks it.
+        """
+        try:
+            await self.db.spent_refresh_tokens.insert_one({
+                "_id": jti,
+                "expires_at": expires_at,
+                "spent_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+    
+    async def _revoke_family(self, family: str, reason: str):
+        # A family can live as long as its newest refresh token
+        expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+        await revocation_list.revoke(self.db, family, expires_at, reason=reason)
+    
+    def _issue_tokens(self, username: str, user_id: ObjectId, family: str = None) -> Token:
+        claims = {"sub": username, "uid": str(user_id), "fam": family or uuid.uuid4().hex}
+        
         access_token = create_access_token(
-            data={"sub": login_data.username},
-            expires_delta=access_token_expires
+            data={**claims, "jti": uuid.uuid4().hex},
+            expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+        )
+        refresh_token = create_refresh_token(
+            data={**claims, "jti": uuid.uuid4().hex},
+            expires_delta=timedelta(days=settings.refresh_token_expire_days)
         )
         
-        return Token(access_token=access_token)
\ No newline at end of file
+        return Token(access_token=access_token, refresh_token=refresh_token)
\ No newline at end of file
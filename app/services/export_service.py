@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.services.location_service import LocationService
+
+# Flush the response roughly every this many bytes
+FLUSH_BYTES = 64 * 1024
+# Issue ids per query when volunteers/pledges are filtered by a bbox
+ISSUE_ID_CHUNK = 500
+
+ISSUE_FIELDS = [
+    "id", "user_id", "title", "description", "latitude", "longitude", "status",
+    "priority", "difficulty", "points_assigned", "volunteer_count", "pledge_count",
+    "pledged_points", "pledged_money", "picture_url", "resolved_by", "resolved_at",
+    "created_at", "updated_at",
+]
+VOLUNTEER_FIELDS = [
+    "id", "issue_id", "user_id", "username", "status", "contribution",
+    "volunteered_at", "withdrawn_at",
+]
+PLEDGE_FIELDS = [
+    "id", "issue_id", "pledger_id", "pledger_username", "reward_type", "reward_amount",
+    "reward_description", "status", "created_at", "distributed_at", "distributed_to",
+]
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+class ExportService:
+    """Streams issues, volunteers and pledges as NDJSON or CSV straight from Mongo cursors"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.issues_collection = db.issues
+        self.volunteers_collection = db.volunteers
+        self.pledges_collection = db.pledges
+        self.location_service = LocationService()
+
+    # ------------------------------------------------------------------
+    # ROW SOURCES
+    # ------------------------------------------------------------------
+
+    async def issue_rows(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None
+    ) -> AsyncIterator[Dict]:
+        query = self._base_query(status, "created_at", date_from, date_to)
+        if bbox:
+            query["location"] = self.location_service.bbox_query(bbox)
+
+        # Comments can be large and are not part of the export
+        cursor = self.issues_collection.find(query, {"comments": 0, "resolution_location": 0})
+        async for issue in cursor.sort("_id", 1).batch_size(settings.export_batch_size):
+            lat, lng = self.location_service.extract_coordinates(issue["location"])
+            row = {field: issue.get(field) for field in ISSUE_FIELDS}
+            row.update(id=issue["_id"], latitude=lat, longitude=lng)
+            yield row
+
+    async def volunteer_rows(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None
+    ) -> AsyncIterator[Dict]:
+        query = self._base_query(status, "volunteered_at", date_from, date_to)
+        async for volunteer in self._rows_for_issues(self.volunteers_collection, query, bbox):
+            row = {field: volunteer.get(field) for field in VOLUNTEER_FIELDS}
+            row["id"] = volunteer["_id"]
+            yield row
+
+    async def pledge_rows(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None
+    ) -> AsyncIterator[Dict]:
+        query = self._base_query(status, "created_at", date_from, date_to)
+        async for pledge in self._rows_for_issues(self.pledges_collection, query, bbox):
+            row = {field: pledge.get(field) for field in PLEDGE_FIELDS}
+            row["id"] = pledge["_id"]
+            yield row
+
+    async def _rows_for_issues(self, collection, query: Dict, bbox) -> AsyncIterator[Dict]:
+        """Iterate collection; with a bbox, walk the matching issues a chunk of ids at a time"""
+        if not bbox:
+            async for doc in collection.find(query).sort("_id", 1).batch_size(settings.export_batch_size):
+                yield doc
+            return
+
+        issues = self.issues_collection.find(
+            {"location": self.location_service.bbox_query(bbox)}, {"_id": 1}
+        ).batch_size(settings.export_batch_size)
+
+        issue_ids: List[ObjectId] = []
+        async for issue in issues:
+            issue_ids.append(issue["_id"])
+            if len(issue_ids) >= ISSUE_ID_CHUNK:
+                async for doc in collection.find({**query, "issue_id": {"$in": issue_ids}}).batch_size(settings.export_batch_size):
+                    yield doc
+                issue_ids = []
+
+        if issue_ids:
+            async for doc in collection.find({**query, "issue_id": {"$in": issue_ids}}).batch_size(settings.export_batch_size):
+                yield doc
+
+    @staticmethod
+    def _base_query(status: Optional[str], date_field: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> Dict:
+        query = {}
+        if status:
+            query["status"] = status
+        if date_from or date_to:
+            query[date_field] = {}
+            if date_from:
+                query[date_field]["$gte"] = date_from
+            if date_to:
+                query[date_field]["$lt"] = date_to
+        return query
+
+    # ------------------------------------------------------------------
+    # ENCODERS
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def as_ndjson(rows: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        async for row in rows:
+            buffer.write(json.dumps({key: _plain(value) for key, value in row.items()}))
+            buffer.write("\n")
+            if buffer.tell() >= FLUSH_BYTES:
+                yield buffer.getvalue().encode("utf-8")
+                buffer = io.StringIO()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    async def as_csv(rows: AsyncIterator[Dict], fields: List[str]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        async for row in rows:
+            writer.writerow(["" if row.get(field) is None else _plain(row.get(field)) for field in fields])
+            if buffer.tell() >= FLUSH_BYTES:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
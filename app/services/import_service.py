@@ -0,0 +1,221 @@
+import json
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, UploadFile, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.core.cache import invalidate_user
+from app.core.versions import bump_version, ISSUES
+from app.models.issue import IssueModel
+from app.models.user import CurrentUser
+from app.schemas.issue import IssueCreate, BulkImportResult, ImportRowError
+from app.services.location_service import LocationService
+from app.services import issue_feed as feed
+from app.utils.bulk_import import iter_upload_text, iter_csv_rows, iter_lines, iter_geojson_features, row_from_feature
+from app.utils.points_calculator import calculate_points
+
+VALID_PRIORITIES = {"low", "medium", "high"}
+VALID_DIFFICULTIES = {"easy", "medium", "hard"}
+
+
+def _blank_to_none(value):
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def _text(row: dict, key: str, default: str = "") -> str:
+    value = row.get(key)
+    if value is None:
+        return default
+    return str(value).strip() or default
+
+
+class IssueImportService:
+    """Bulk-loads geotagged issue reports from CSV or GeoJSON uploads"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.issues_collection = db.issues
+        self.users_collection = db.users
+        self.location_service = LocationService()
+        self._reporter_ids: Dict[str, ObjectId] = {}
+
+    async def import_issues(self, upload: UploadFile, file_format: str, importer: CurrentUser) -> BulkImportResult:
+        result = BulkImportResult(inserted=0, failed=0)
+        reported_by: Counter = Counter()
+        batch: List[Tuple[int, dict]] = []
+
+        try:
+            async for row_number, row in self._iter_rows(upload, file_format):
+                batch.append((row_number, row))
+                if len(batch) >= settings.bulk_import_batch_size:
+                    await self._import_batch(batch, importer, result, reported_by)
+                    batch = []
+
+            if batch:
+                await self._import_batch(batch, importer, result, reported_by)
+        except ValueError as e:
+            # The file itself is unreadable past this point; keep what was loaded
+            self._record_error(result, 0, str(e))
+
+        await self._apply_reporter_counters(reported_by)
+        if result.inserted:
+            await bump_version(self.db, ISSUES)
+        return result
+
+    def _iter_rows(self, upload: UploadFile, file_format: str) -> AsyncIterator[Tuple[int, dict]]:
+        chunks = iter_upload_text(upload)
+        if file_format == "csv":
+            return iter_csv_rows(chunks)
+        if file_format == "geojson":
+            return self._iter_feature_rows(iter_geojson_features(chunks))
+        if file_format == "geojsonl":
+            return self._iter_feature_lines(iter_lines(chunks))
+
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported import format: {file_format}")
+
+    async def _iter_feature_rows(self, features):
+        async for feature_number, feature in features:
+            try:
+                yield feature_number, row_from_feature(feature)
+            except (ValueError, KeyError, TypeError) as e:
+                yield feature_number, {"_error": f"Invalid feature: {str(e)}"}
+
+    async def _iter_feature_lines(self, lines):
+        """GeoJSONL: one Feature per line; a malformed line fails only its own row"""
+        async for line_number, line in lines:
+            try:
+                yield line_number, row_from_feature(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                yield line_number, {"_error": f"Invalid feature: {str(e)}"}
+
+    async def _import_batch(
+        self,
+        batch: List[Tuple[int, dict]],
+        importer: CurrentUser,
+        result: BulkImportResult,
+        reported_by: Counter
+    ):
+        await self._resolve_reporters({
+            _text(row, "reporter") for _, row in batch
+            if _text(row, "reporter") and _text(row, "reporter") not in self._reporter_ids
+        })
+
+        documents = []
+        row_numbers = []
+        now = datetime.now()
+        for row_number, row in batch:
+            try:
+                documents.append(self._build_issue(row, importer, now))
+                row_numbers.append(row_number)
+            except ValueError as e:
+                self._record_error(result, row_number, str(e))
+
+        if not documents:
+            return
+
+        failed_indexes = set()
+        try:
+            await self.issues_collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                self._record_error(result, row_numbers[write_error["index"]], write_error.get("errmsg", "Write failed"))
+
+        inserted = [document for index, document in enumerate(documents) if index not in failed_indexes]
+        for document in inserted:
+            result.inserted += 1
+            reported_by[document["user_id"]] += 1
+
+        # insert_many set each document's _id; map clients get the batch as one message
+        await feed.issue_feed.publish_many(feed.CREATED, inserted)
+
+    def _build_issue(self, row: dict, importer: CurrentUser, now: datetime) -> dict:
+        if row.get("_error"):
+            raise ValueError(row["_error"])
+
+        try:
+            issue_data = IssueCreate(
+                title=_text(row, "title"),
+                description=_text(row, "description"),
+                latitude=_blank_to_none(row.get("latitude")),
+                longitude=_blank_to_none(row.get("longitude")),
+                priority=_text(row, "priority", "medium").lower(),
+                difficulty=_text(row, "difficulty", "medium").lower(),
+                reward_listing=_text(row, "reward_listing") or None
+            )
+        except ValidationError as e:
+            raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+
+        if not issue_data.title:
+            raise ValueError("title is required")
+        if issue_data.latitude is None or issue_data.longitude is None:
+            raise ValueError("latitude and longitude are required")
+        if not self.location_service.validate_coordinates(issue_data.latitude, issue_data.longitude):
+            raise ValueError(f"Invalid coordinates: Lat={issue_data.latitude}, Lng={issue_data.longitude}")
+        if issue_data.priority not in VALID_PRIORITIES:
+            raise ValueError(f"Invalid priority: {issue_data.priority}")
+        if issue_data.difficulty not in VALID_DIFFICULTIES:
+            raise ValueError(f"Invalid difficulty: {issue_data.difficulty}")
+
+        user_id = importer.id
+        reporter = _text(row, "reporter")
+        if reporter:
+            user_id = self._reporter_ids.get(reporter)
+            if user_id is None:
+                raise ValueError(f"Unknown reporter: {reporter}")
+
+        issue = IssueModel(
+            user_id=str(user_id),
+            title=issue_data.title,
+            description=issue_data.description,
+            location=self.location_service.create_geojson(issue_data.latitude, issue_data.longitude),
+            picture_url=_text(row, "picture_url") or None,
+            priority=issue_data.priority,
+            difficulty=issue_data.difficulty,
+            status="open",
+            points_assigned=calculate_points(issue_data.difficulty, issue_data.priority),
+            reward_listing=issue_data.reward_listing,
+            comments=[],
+            created_at=now,
+            updated_at=now
+        )
+        return issue.model_dump(by_alias=True, exclude={"id"})
+
+    async def _resolve_reporters(self, usernames: set):
+        if not usernames:
+            return
+
+        users = await self.users_collection.find(
+            {"username": {"$in": list(usernames)}},
+            {"_id": 1, "username": 1}
+        ).to_list(None)
+        for user in users:
+            self._reporter_ids[user["username"]] = user["_id"]
+
+    async def _apply_reporter_counters(self, reported_by: Counter):
+        """One bulk_write for every reporter's tasks_reported"""
+        if not reported_by:
+            return
+
+        await self.users_collection.bulk_write([
+            UpdateOne({"_id": user_id}, {"$inc": {"tasks_reported": count}})
+            for user_id, count in reported_by.items()
+        ], ordered=False)
+
+        for user_id in reported_by:
+            invalidate_user(user_id)
+
+    @staticmethod
+    def _record_error(result: BulkImportResult, row_number: int, error: str):
+        result.failed += 1
+        if len(result.errors) < settings.bulk_import_max_errors:
+            result.errors.append(ImportRowError(row=row_number, error=error))
+        else:
+            result.errors_truncated = True
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from app.core.versions import bump_version, ISSUES
+
+
+class IssueCounterService:
+    """Recomputes the denormalized volunteer/pledge counters stored on issues"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.issues_collection = db.issues
+        self.volunteers_collection = db.volunteers
+        self.pledges_collection = db.pledges
+
+    async def repair(self, issue_ids: Optional[List[ObjectId]] = None, batch_size: int = 500) -> int:
+        """Recount every issue (or just issue_ids); returns how many issues were corrected"""
+        query = {"_id": {"$in": issue_ids}} if issue_ids else {}
+        cursor = self.issues_collection.find(query, {"_id": 1}).batch_size(batch_size)
+
+        repaired = 0
+        batch = []
+        async for issue in cursor:
+            batch.append(issue["_id"])
+            if len(batch) >= batch_size:
+                repaired += await self._repair_batch(batch)
+                batch = []
+
+        if batch:
+            repaired += await self._repair_batch(batch)
+
+        if repaired:
+            await bump_version(self.db, ISSUES)
+        return repaired
+
+    async def _repair_batch(self, issue_ids: List[ObjectId]) -> int:
+        volunteer_rows = await self.volunteers_collection.aggregate([
+            {"$match": {"issue_id": {"$in": issue_ids}, "status": "active"}},
+            {"$group": {"_id": "$issue_id", "count": {"$sum": 1}}}
+        ]).to_list(None)
+
+        pledge_rows = await self.pledges_collection.aggregate([
+            {"$match": {"issue_id": {"$in": issue_ids}, "status": {"$in": ["active", "distributed"]}}},
+            {"$group": {
+                "_id": "$issue_id",
+                "count": {"$sum": 1},
+                "points": {"$sum": {"$cond": [
+                    {"$eq": ["$reward_type", "points"]}, {"$ifNull": ["$reward_amount", 0]}, 0
+                ]}},
+                "money": {"$sum": {"$cond": [
+                    {"$eq": ["$reward_type", "money"]}, {"$ifNull": ["$reward_amount", 0]}, 0
+                ]}}
+            }}
+        ]).to_list(None)
+
+        volunteers = {row["_id"]: row["count"] for row in volunteer_rows}
+        pledges = {row["_id"]: row for row in pledge_rows}
+
+        operations = []
+        for issue_id in issue_ids:
+            pledge = pledges.get(issue_id, {})
+            counters = {
+                "volunteer_count": volunteers.get(issue_id, 0),
+                "pledge_count": pledge.get("count", 0),
+                "pledged_points": pledge.get("points", 0),
+                "pledged_money": pledge.get("money", 0)
+            }
+            # Only touch (and re-date) issues whose counters actually drifted
+            operations.append(UpdateOne(
+                {"_id": issue_id, "$or": [{field: {"$ne": value}} for field, value in counters.items()]},
+                {"$set": {**counters, "updated_at": datetime.now()}}
+            ))
+
+        result = await self.issues_collection.bulk_write(operations, ordered=False)
+        return result.modified_count
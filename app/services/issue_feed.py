@@ -0,0 +1,274 @@
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from app.config import settings
+from app.core.pubsub import OVERFLOW, hub
+from app.services.location_service import LocationService
+
+ISSUE_CHANGES_TOPIC = "issues:changes"
+
+# Change kinds published by the services
+CREATED = "created"
+UPDATED = "updated"
+STATUS_CHANGED = "status_changed"
+RESOLVED = "resolved"
+COMMENTED = "commented"
+VOLUNTEERED = "volunteered"
+PLEDGED = "pledged"
+
+
+def issue_change(kind: str, issue: dict) -> dict:
+    """The compact, JSON-ready payload map clients receive for an issue document"""
+    lat, lng = LocationService.extract_coordinates(issue["location"])
+    updated_at = issue.get("updated_at")
+    return {
+        "type": kind,
+        "issue_id": str(issue["_id"]),
+        "title": issue.get("title"),
+        "status": issue.get("status"),
+        "priority": issue.get("priority"),
+        "latitude": lat,
+        "longitude": lng,
+        "volunteer_count": issue.get("volunteer_count", 0),
+        "pledge_count": issue.get("pledge_count", 0),
+        "updated_at": updated_at.isoformat() if isinstance(updated_at, datetime) else updated_at,
+    }
+
+
+class FeedSubscription:
+    """
+    A client's view of the feed. Changes are held per issue, so a burst of
+    updates to one issue collapses into its latest state; get() waits out the
+    coalescing window and returns everything pending as one batch.
+    """
+
+    def __init__(self, feed: "IssueFeed", bbox: Optional[Tuple[float, float, float, float]], max_pending: int, window: float):
+        self.feed = feed
+        self.bbox = bbox
+        self.max_pending = max_pending
+        self.window = window
+        self.overflowed = False
+        self._pending: Dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def matches(self, change: dict) -> bool:
+        if self.bbox is None:
+            return True
+        return LocationService.in_bbox(change["latitude"], change["longitude"], self.bbox)
+
+    def offer(self, change: dict) -> None:
+        if self.overflowed:
+            return
+
+        issue_id = change["issue_id"]
+        previous = self._pending.get(issue_id)
+        if previous is None and len(self._pending) >= self.max_pending:
+            self.overflowed = True
+            self._pending.clear()
+        else:
+            kinds = previous["types"] if previous else []
+            if change["type"] not in kinds:
+                kinds = kinds + [change["type"]]
+            self._pending[issue_id] = {**change, "types": kinds}
+        self._ready.set()
+
+    async def get(self):
+        while not self._pending and not self.overflowed:
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self.overflowed:
+            return OVERFLOW
+
+        # Let further updates to the same issues fold into this batch
+        await asyncio.sleep(self.window)
+        if self.overflowed:
+            return OVERFLOW
+
+        changes = list(self._pending.values())
+        self._pending.clear()
+        return {"changes": changes}
+
+    def close(self) -> None:
+        self.feed.unsubscribe(self)
+
+
+class BusSource:
+    """Changes published by the services, carried over the pub/sub hub (and its broker across workers)"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[dict], None]] = None
+
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        self._deliver = deliver
+        hub.listen(ISSUE_CHANGES_TOPIC, self._receive)
+
+    async def stop(self) -> None:
+        if self._deliver is not None:
+            hub.unlisten(ISSUE_CHANGES_TOPIC, self._receive)
+            self._deliver = None
+
+    def _receive(self, message: dict) -> None:
+        for change in message["batch"] if "batch" in message else (message,):
+            self._deliver(change)
+
+    async def publish(self, change: dict) -> None:
+        await hub.publish(ISSUE_CHANGES_TOPIC, change)
+
+    async def publish_batch(self, changes: List[dict]) -> None:
+        # One broker message for the whole batch
+        await hub.publish(ISSUE_CHANGES_TOPIC, {"batch": changes})
+
+
+class LocalSource:
+    """Stand-in for tests and scripts: publish() hands the change straight to this process's feed"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[dict], None]] = None
+
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, change: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(change)
+
+    async def publish_batch(self, changes: List[dict]) -> None:
+        for change in changes:
+            await self.publish(change)
+
+
+class ChangeStreamSource:
+    """
+    Derives changes from a change stream on the issues collection (replica set
+    required), so writes made outside this API show up too. Service-side
+    publishes are ignored because the stream already sees those writes.
+    """
+
+    def __init__(self, get_db: Callable):
+        self._get_db = get_db
+        self._deliver: Optional[Callable[[dict], None]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        self._deliver = deliver
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, change: dict) -> None:
+        pass
+
+    async def publish_batch(self, changes: List[dict]) -> None:
+        pass
+
+    async def _watch(self) -> None:
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        resume_token = None
+        while True:
+            try:
+                async with self._get_db().issues.watch(
+                    pipeline, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    async for event in stream:
+                        resume_token = stream.resume_token
+                        issue = event.get("fullDocument")
+                        if issue:
+                            self._deliver(issue_change(self._classify(event, issue), issue))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Issue change stream interrupted, resuming: {str(e)}")
+                await asyncio.sleep(1)
+
+    @staticmethod
+    def _classify(event: dict, issue: dict) -> str:
+        if event["operationType"] == "insert":
+            return CREATED
+
+        fields: Set[str] = {
+            key.split(".")[0] for key in event.get("updateDescription", {}).get("updatedFields", {})
+        }
+        if "status" in fields:
+            return RESOLVED if issue.get("status") == "resolved" else STATUS_CHANGED
+        if "comments" in fields:
+            return COMMENTED
+        if "volunteer_count" in fields:
+            return VOLUNTEERED
+        if "pledge_count" in fields:
+            return PLEDGED
+        return UPDATED
+
+
+class IssueFeed:
+    """Fans issue changes out to map clients, each filtered by its bounding box"""
+
+    def __init__(self):
+        self.source = BusSource()
+        self._subscriptions: Set[FeedSubscription] = set()
+
+    def configure(self, source) -> None:
+        self.source = source
+
+    async def start(self) -> None:
+        await self.source.start(self._dispatch)
+
+    async def stop(self) -> None:
+        await self.source.stop()
+
+    def subscribe(self, bbox: Optional[Tuple[float, float, float, float]] = None) -> FeedSubscription:
+        subscription = FeedSubscription(
+            self, bbox, settings.issue_feed_max_pending, settings.issue_feed_coalesce_seconds
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FeedSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    async def publish(self, kind: str, issue: dict) -> None:
+        """Called by the services after a write; never fails the request"""
+        try:
+            await self.source.publish(issue_change(kind, issue))
+        except Exception as e:
+            print(f"Failed to publish issue change: {str(e)}")
+
+    async def publish_many(self, kind: str, issues: List[dict]) -> None:
+        """Like publish, for a batch of writes (bulk import) sent as a single message"""
+        if not issues:
+            return
+        try:
+            await self.source.publish_batch([issue_change(kind, issue) for issue in issues])
+        except Exception as e:
+            print(f"Failed to publish issue changes: {str(e)}")
+
+    def _dispatch(self, change: dict) -> None:
+        for subscription in list(self._subscriptions):
+            if subscription.matches(change):
+                subscription.offer(change)
+
+
+def create_feed_source(name: str, get_db: Callable):
+    if name == "bus":
+        return BusSource()
+    if name == "change_stream":
+        return ChangeStreamSource(get_db)
+    if name == "local":
+        return LocalSource()
+    raise ValueError(f"Unknown issue feed source: {name}")
+
+
+issue_feed = IssueFeed()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from fastapi import HTTPException, status, UploadFile
@@ -8,9 +8,25 @@ from app.services.location_service import LocationService
 from app.services.storage_service import StorageService
 from app.utils.points_calculator import calculate_points
 from app.models.issue import IssueModel
+from app.models.user import CurrentUser
+from app.core.cache import invalidate_user
+from app.core.database import run_in_transaction, insert_and_return, update_and_return
+from app.core.versions import bump_version, ISSUES
+from app.core.fieldsets import Fieldset
+from app.services.pledge_service import PledgeService
+from app.services.issue_state_machine import IssueStateMachine
+from app.services import issue_feed as feed
+from app.services.notification_service import NotificationService, ISSUE_RESOLVED, ISSUE_COMMENTED
 from app.utils.exif_helper import extract_gps_from_image
 from math import radians, sin, cos, sqrt, atan2
 
+ISSUE_FIELDSET = Fieldset(IssueResponse, {
+    "latitude": ("location",),
+    "longitude": ("location",),
+    "resolution_latitude": ("resolution_location",),
+    "resolution_longitude": ("resolution_location",),
+})
+
 class IssueService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -18,6 +34,8 @@ class IssueService:
         self.users_collection = db.users
         self.location_service = LocationService()
         self.storage_service = StorageService()
+        self.state_machine = IssueStateMachine(self.issues_collection)
+        self.notification_service = NotificationService(db)
         # Maximum distance in meters for GPS verification
         self.MAX_VERIFICATION_DISTANCE = 100
     
@@ -39,14 +57,9 @@ class IssueService:
     async def create_issue(
         self, 
         issue_data: IssueCreate, 
-        username: str,
+        current_user: CurrentUser,
         picture: Optional[UploadFile] = None
     ) -> IssueResponse:
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Variables for location
         latitude = issue_data.latitude
         longitude = issue_data.longitude
@@ -93,7 +106,7 @@ class IssueService:
         
         # Create issue
         issue_dict = {
-            "user_id": str(user["_id"]),
+            "user_id": str(current_user.id),
             "title": issue_data.title,
             "description": issue_data.description,
             "location": self.location_service.create_geojson(latitude, longitude),
@@ -108,65 +121,113 @@ class IssueService:
         }
         
         issue = IssueModel(**issue_dict)
-        result = await self.issues_collection.insert_one(issue.model_dump(by_alias=True, exclude={"id"}))
+        created_issue = await insert_and_return(
+            self.issues_collection,
+            issue.model_dump(by_alias=True, exclude={"id"})
+        )
         
         # Update user's tasks_reported
         await self.users_collection.update_one(
-            {"_id": user["_id"]},
+            {"_id": current_user.id},
             {"$inc": {"tasks_reported": 1}}
         )
+        invalidate_user(current_user.id)
+        await bump_version(self.db, ISSUES)
+        await feed.issue_feed.publish(feed.CREATED, created_issue)
         
-        # Fetch and return created issue
-        return await self.get_issue_by_id(str(result.inserted_id))
+        return self._format_issue_response(created_issue)
     
     async def get_all_issues(
         self, 
         status: Optional[str] = None,
         limit: int = 100,
-        skip: int = 0
+        skip: int = 0,
+        fields: Optional[Tuple[str, ...]] = None
     ) -> List[IssueResponse]:
+        """fields: a sparse fieldset parsed by ISSUE_FIELDSET; None returns full issues"""
         query = {}
         if status:
             query["status"] = status
         
-        issues = await self.issues_collection.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        issues = await self.issues_collection.find(
+            query, ISSUE_FIELDSET.projection(fields)
+        ).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
         
-        return [self._format_issue_response(issue) for issue in issues]
+        return ISSUE_FIELDSET.apply((self._format_issue_response(issue) for issue in issues), fields)
     
     async def get_issue_by_id(self, issue_id: str) -> IssueResponse:
+        return self._format_issue_response(await self.get_issue_document(issue_id))
+    
+    async def get_issue_document(self, issue_id: str) -> dict:
+        """The raw issue, for callers that check validators before formatting"""
         issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
         if not issue:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-        
+        return issue
+    
+    def to_response(self, issue: dict) -> IssueResponse:
         return self._format_issue_response(issue)
     
-    async def update_issue(self, issue_id: str, update_data: IssueUpdate, username: str) -> IssueResponse:
-        # Get issue
-        issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
-        if not issue:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-        
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        
-        # Check ownership
-        if issue["user_id"] != user["_id"]:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this issue")
-        
+    async def update_issue(self, issue_id: str, update_data: IssueUpdate, current_user: CurrentUser) -> IssueResponse:
         update_dict = update_data.model_dump(exclude_unset=True)
-        update_dict["updated_at"] = datetime.now()
         
-        await self.issues_collection.update_one(
-            {"_id": ObjectId(issue_id)},
-            {"$set": update_dict}
-        )
+        # Only the reporter may update; ownership is part of the write filter
+        owner_filter = {"user_id": current_user.id}
+        
+        # Status changes go through the state machine; resolving needs GPS verification
+        new_status = update_dict.pop("status", None)
+        if new_status is not None:
+            if new_status == "resolved":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Use the resolve endpoint to resolve an issue"
+                )
+            if not self.state_machine.is_valid_state(new_status):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid status: {new_status}")
+            
+            updated_issue = await self.state_machine.transition(
+                issue_id, new_status, extra_fields=update_dict, extra_filter=owner_filter
+            )
+        else:
+            updated_issue = await update_and_return(
+                self.issues_collection,
+                {"_id": ObjectId(issue_id), **owner_filter},
+                {"$set": {**update_dict, "updated_at": datetime.now()}}
+            )
         
-        return await self.get_issue_by_id(issue_id)
+        if updated_issue is None:
+            # Find out why nothing matched; this read only happens on the failure path
+            issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
+            if not issue:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
+            
+            if issue["user_id"] != current_user.id:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this issue")
+            
+            if new_status != issue["status"]:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Cannot change status from {issue['status']} to {new_status}"
+                )
+            
+            # Status unchanged; apply the remaining fields
+            updated_issue = await update_and_return(
+                self.issues_collection,
+                {"_id": ObjectId(issue_id), **owner_filter},
+                {"$set": {**update_dict, "updated_at": datetime.now()}}
+            )
+            if updated_issue is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
+            new_status = None
+        
+        await bump_version(self.db, ISSUES)
+        await feed.issue_feed.publish(feed.STATUS_CHANGED if new_status else feed.UPDATED, updated_issue)
+        return self._format_issue_response(updated_issue)
     
     async def resolve_issue(
         self, 
         issue_id: str, 
-        username: str,
+        current_user: CurrentUser,
         resolution_picture: Optional[UploadFile] = None
     ) -> IssueResponse:
         """
@@ -182,11 +243,6 @@ class IssueService:
         if issue["status"] == "resolved":
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Issue already resolved")
         
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Require resolution picture
         if not resolution_picture:
             raise HTTPException(
@@ -242,77 +298,93 @@ class IssueService:
             folder="resolutions"
         )
         
-        # Update issue with resolution data
-        await self.issues_collection.update_one(
-            {"_id": ObjectId(issue_id)},
-            {
-                "$set": {
-                    "status": "resolved",
-                    "resolved_by": user["_id"],
+        pledge_service = PledgeService(self.db)
+        
+        async def apply_resolution(session):
+            # Conditional on status so a concurrent resolve cannot pay out twice
+            resolved_issue = await self.state_machine.transition(
+                issue_id,
+                "resolved",
+                extra_fields={
+                    "resolved_by": current_user.id,
                     "resolved_at": datetime.now(),
                     "resolution_picture_url": resolution_picture_url,
                     "resolution_location": self.location_service.create_geojson(resolution_lat, resolution_lng),
-                    "verification_distance_meters": round(distance, 2),
-                    "updated_at": datetime.now()
-                }
-            }
-        )
-        
-        # Award points to resolver
-        await self.users_collection.update_one(
-            {"_id": user["_id"]},
-            {
-                "$inc": {
-                    "points": issue["points_assigned"],
-                    "tasks_completed": 1,
-                    "areas_cleaned": 1
-                }
-            }
-        )
+                    "verification_distance_meters": round(distance, 2)
+                },
+                session=session
+            )
+            if resolved_issue is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Issue already resolved")
+            
+            # Distribute pledges to resolver
+            pledge_distribution = await pledge_service.distribute_pledges(resolved_issue, current_user.id, session=session)
+            
+            # Award issue points and pledged points to resolver in one write
+            await self.users_collection.update_one(
+                {"_id": current_user.id},
+                {
+                    "$inc": {
+                        "points": resolved_issue["points_assigned"] + int(pledge_distribution["total_points"]),
+                        "tasks_completed": 1,
+                        "areas_cleaned": 1
+                    }
+                },
+                session=session
+            )
+            
+            # Volunteers and pledgers are told by the notification dispatcher, off the request path
+            await self.notification_service.enqueue(ISSUE_RESOLVED, resolved_issue, current_user, session=session)
+            return resolved_issue, pledge_distribution
         
-        # Distribute pledges to resolver
-        from app.services.pledge_service import PledgeService
-        pledge_service = PledgeService(self.db)
-        pledge_distribution = await pledge_service.distribute_pledges(issue_id, user["_id"])
+        resolved_issue, pledge_distribution = await run_in_transaction(apply_resolution)
+        invalidate_user(current_user.id)
         
         print(f"✅ Distributed pledges: {pledge_distribution}")
         print(f"✅ Issue resolved with GPS verification (distance: {distance:.2f}m)")
+        await bump_version(self.db, ISSUES)
+        await feed.issue_feed.publish(feed.RESOLVED, resolved_issue)
             
-        return await self.get_issue_by_id(issue_id)
+        return self._format_issue_response(resolved_issue)
     
-    async def add_comment(self, issue_id: str, comment_data: CommentCreate, username: str) -> IssueResponse:
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
-        # Check if issue exists
-        issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
-        if not issue:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-        
+    async def add_comment(self, issue_id: str, comment_data: CommentCreate, current_user: CurrentUser) -> IssueResponse:
         # Create comment
         comment = {
-            "user_id": user["_id"],
-            "username": user["username"],
-            "avatar": user["avatar"],
+            "user_id": current_user.id,
+            "username": current_user.username,
+            "avatar": current_user.document.get("avatar"),
             "comment": comment_data.comment,
             "created_at": datetime.now()
         }
         
-        # Add comment to issue
-        await self.issues_collection.update_one(
-            {"_id": ObjectId(issue_id)},
-            {
-                "$push": {"comments": comment},
-                "$set": {"updated_at": datetime.now()}
-            }
-        )
+        async def record_comment(session):
+            # Add comment to issue
+            issue = await update_and_return(
+                self.issues_collection,
+                {"_id": ObjectId(issue_id)},
+                {
+                    "$push": {"comments": comment},
+                    "$set": {"updated_at": datetime.now()}
+                },
+                session=session
+            )
+            if not issue:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
+            
+            await self.notification_service.enqueue(ISSUE_COMMENTED, issue, current_user, session=session)
+            return issue
+        
+        issue = await run_in_transaction(record_comment)
         
-        return await self.get_issue_by_id(issue_id)
+        await bump_version(self.db, ISSUES)
+        await feed.issue_feed.publish(feed.COMMENTED, issue)
+        return self._format_issue_response(issue)
     
     def _format_issue_response(self, issue: dict) -> IssueResponse:
-        lat, lng = self.location_service.extract_coordinates(issue["location"])
+        # Sparse listings load projected documents, so any field but _id may be absent
+        lat, lng = None, None
+        if issue.get("location"):
+            lat, lng = self.location_service.extract_coordinates(issue["location"])
         
         # Handle resolution location if exists
         resolution_lat, resolution_lng = None, None
@@ -320,7 +392,7 @@ class IssueService:
             resolution_lat, resolution_lng = self.location_service.extract_coordinates(issue["resolution_location"])
         
         comments = [
-            CommentResponse(
+            CommentResponse.model_construct(
                 user_id=str(comment["user_id"]),
                 username=comment["username"],
                 comment=comment["comment"],
@@ -329,18 +401,19 @@ class IssueService:
             for comment in issue.get("comments", [])
         ]
         
-        return IssueResponse(
+        # Fields are built from trusted documents, so skip validation
+        return IssueResponse.model_construct(
             id=str(issue["_id"]),
-            user_id=str(issue["user_id"]),
-            title=issue["title"],
-            description=issue["description"],
+            user_id=str(issue["user_id"]) if issue.get("user_id") else None,
+            title=issue.get("title"),
+            description=issue.get("description"),
             latitude=lat,
             longitude=lng,
             picture_url=issue.get("picture_url"),
-            priority=issue["priority"],
-            difficulty=issue["difficulty"],
-            status=issue["status"],
-            points_assigned=issue["points_assigned"],
+            priority=issue.get("priority"),
+            difficulty=issue.get("difficulty"),
+            status=issue.get("status"),
+            points_assigned=issue.get("points_assigned"),
             reward_listing=issue.get("reward_listing"),
             comments=comments,
             resolved_by=str(issue["resolved_by"]) if issue.get("resolved_by") else None,
@@ -349,8 +422,12 @@ class IssueService:
             resolution_latitude=resolution_lat,
             resolution_longitude=resolution_lng,
             verification_distance_meters=issue.get("verification_distance_meters"),
-            created_at=issue["created_at"],
-            updated_at=issue["updated_at"]
+            volunteer_count=issue.get("volunteer_count", 0),
+            pledge_count=issue.get("pledge_count", 0),
+            pledged_points=issue.get("pledged_points", 0),
+            pledged_money=issue.get("pledged_money", 0),
+            created_at=issue.get("created_at"),
+            updated_at=issue.get("updated_at")
         )
     
     async def get_comments(self, issue_id: str):
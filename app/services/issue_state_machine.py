@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from bson import ObjectId
+from app.core.database import update_and_return
+
+
+class IssueStateMachine:
+    """
+    Issue lifecycle: open -> in_progress -> resolved (open may also resolve directly).
+
+    Every transition is a single find_one_and_update whose filter requires the
+    issue to still be in one of the allowed source states, so concurrent callers
+    cannot both apply the same transition. The updated document is returned from
+    that same round trip.
+    """
+
+    TRANSITIONS: Dict[str, Set[str]] = {
+        "open": {"in_progress", "resolved"},
+        "in_progress": {"resolved"},
+        "resolved": set(),
+    }
+
+    def __init__(self, issues_collection):
+        self.issues_collection = issues_collection
+
+    @classmethod
+    def is_valid_state(cls, state: str) -> bool:
+        return state in cls.TRANSITIONS
+
+    @classmethod
+    def sources_for(cls, target: str) -> List[str]:
+        """States from which an issue may move to target"""
+        return [state for state, targets in cls.TRANSITIONS.items() if target in targets]
+
+    async def transition(
+        self,
+        issue_id: str,
+        target: str,
+        extra_fields: Optional[dict] = None,
+        extra_filter: Optional[dict] = None,
+        session=None
+    ) -> Optional[dict]:
+        """
+        Move the issue to target and return the updated document.
+        Returns None when the issue does not exist, is not in a source state,
+        or does not match extra_filter.
+        """
+        update = {"status": target, "updated_at": datetime.now()}
+        if extra_fields:
+            update.update(extra_fields)
+
+        query = {"_id": ObjectId(issue_id), "status": {"$in": self.sources_for(target)}}
+        if extra_filter:
+            query.update(extra_filter)
+
+        return await update_and_return(self.issues_collection, query, {"$set": update}, session=session)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 class LocationService:
     @staticmethod
@@ -18,4 +18,35 @@ class LocationService:
     def extract_coordinates(geojson: Dict) -> tuple:
         """Extract lat/lng from GeoJSON"""
         lng, lat = geojson["coordinates"]
-        return lat, lng
\ No newline at end of file
+        return lat, lng
+    
+    @staticmethod
+    def parse_bbox(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+        """Parse "minLng,minLat,maxLng,maxLat"; raises ValueError when malformed"""
+        if not bbox:
+            return None
+        
+        parts = [float(part) for part in bbox.split(",")]
+        if len(parts) != 4:
+            raise ValueError("bbox must be minLng,minLat,maxLng,maxLat")
+        
+        min_lng, min_lat, max_lng, max_lat = parts
+        if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+            raise ValueError("bbox is out of range or inverted")
+        return min_lng, min_lat, max_lng, max_lat
+    
+    @staticmethod
+    def bbox_query(bbox: Tuple[float, float, float, float]) -> Dict:
+        """
+        $geoWithin filter for a GeoJSON location field. $box is planar, like
+        in_bbox, so exports and live feeds agree at the edges, and it accepts
+        boxes of any width (a GeoJSON polygon has geodesic edges and is
+        rejected past a hemisphere).
+        """
+        min_lng, min_lat, max_lng, max_lat = bbox
+        return {"$geoWithin": {"$box": [[min_lng, min_lat], [max_lng, max_lat]]}}
+    
+    @staticmethod
+    def in_bbox(latitude: float, longitude: float, bbox: Tuple[float, float, float, float]) -> bool:
+        min_lng, min_lat, max_lng, max_lat = bbox
+        return min_lng <= longitude <= max_lng and min_lat <= latitude <= max_lat
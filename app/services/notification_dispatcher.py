@@ -0,0 +1,202 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.config import settings
+from app.services.notification_service import ISSUE_RESOLVED, ISSUE_COMMENTED
+
+
+def _message(entry: dict) -> str:
+    title = entry.get("issue_title") or "an issue"
+    actor = entry.get("actor_username") or "Someone"
+    if entry["kind"] == ISSUE_RESOLVED:
+        return f'"{title}" was resolved by {actor}'
+    if entry["kind"] == ISSUE_COMMENTED:
+        return f'{actor} commented on "{title}"'
+    return f'New activity on "{title}"'
+
+
+class InAppChannel:
+    """Writes to the notifications collection; unread notifications for the same issue within the window are merged"""
+
+    def __init__(self, get_db: Callable):
+        self._get_db = get_db
+
+    async def deliver(self, notifications: List[dict]) -> None:
+        now = datetime.now()
+        window_start = now - timedelta(seconds=settings.notification_collapse_seconds)
+        await self._get_db().notifications.bulk_write([
+            UpdateOne(
+                {
+                    "user_id": n["user_id"],
+                    "issue_id": n["issue_id"],
+                    "read": False,
+                    "updated_at": {"$gte": window_start}
+                },
+                {
+                    "$set": {"kind": n["kind"], "message": n["message"], "updated_at": now},
+                    "$inc": {"count": n["count"]},
+                    "$setOnInsert": {"created_at": now}
+                },
+                upsert=True
+            )
+            for n in notifications
+        ], ordered=False)
+
+
+class LocalSinkChannel:
+    """Keeps delivered notifications in memory; for tests and scripts"""
+
+    def __init__(self):
+        self.delivered: List[dict] = []
+
+    async def deliver(self, notifications: List[dict]) -> None:
+        self.delivered.extend(notifications)
+
+
+def create_channel(name: str, get_db: Callable):
+    if name == "in_app":
+        return InAppChannel(get_db)
+    if name == "local":
+        return LocalSinkChannel()
+    raise ValueError(f"Unknown notification channel: {name}")
+
+
+class NotificationDispatcher:
+    """
+    Background worker that drains notification_outbox. Each pass claims a batch
+    of pending entries, resolves all their recipients (active volunteers and
+    pledgers) with one query per collection, collapses them to one notification
+    per user and issue, and hands the result to every channel.
+    Entries claimed by a worker that died are reclaimed after the lease expires.
+    """
+
+    def __init__(self):
+        self.channels: List = []
+        self._get_db: Optional[Callable] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, get_db: Callable, channels: List) -> None:
+        self._get_db = get_db
+        self.channels = channels
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Notification dispatch failed: {str(e)}")
+                processed = 0
+            # Keep draining while there is a backlog
+            if processed < settings.notification_batch_size:
+                await asyncio.sleep(settings.notification_poll_seconds)
+
+    async def dispatch_once(self) -> int:
+        """Claim and deliver one batch; returns the number of outbox entries handled"""
+        db = self._get_db()
+        outbox = db.notification_outbox
+        entries = await self._claim(outbox)
+        if not entries:
+            return 0
+
+        claim = entries[0]["claimed_by"]
+        try:
+            notifications = await self._build_notifications(db, entries)
+            for channel in self.channels:
+                if notifications:
+                    await channel.deliver(notifications)
+        except Exception:
+            await self._release(outbox, claim)
+            raise
+
+        await outbox.update_many(
+            {"claimed_by": claim},
+            {"$set": {"status": "done", "processed_at": datetime.now()}, "$unset": {"claimed_by": ""}}
+        )
+        return len(entries)
+
+    async def _claim(self, outbox) -> List[dict]:
+        now = datetime.now()
+
+        # Return entries whose worker stopped before finishing
+        await outbox.update_many(
+            {"status": "processing", "claimed_at": {"$lt": now - timedelta(seconds=settings.notification_lease_seconds)}},
+            {"$set": {"status": "pending"}, "$unset": {"claimed_by": ""}}
+        )
+
+        pending = await outbox.find(
+            {"status": "pending", "available_at": {"$lte": now}}, {"_id": 1}
+        ).sort("available_at", 1).limit(settings.notification_batch_size).to_list(settings.notification_batch_size)
+        if not pending:
+            return []
+
+        claim = uuid.uuid4().hex
+        await outbox.update_many(
+            {"_id": {"$in": [p["_id"] for p in pending]}, "status": "pending"},
+            {"$set": {"status": "processing", "claimed_by": claim, "claimed_at": now}}
+        )
+        # Another worker may have claimed some of them first
+        return await outbox.find({"claimed_by": claim}).to_list(None)
+
+    async def _release(self, outbox, claim: str) -> None:
+        """Put a failed batch back with backoff, giving up after notification_max_attempts"""
+        retry_at = datetime.now() + timedelta(seconds=settings.notification_poll_seconds * 10)
+        await outbox.update_many(
+            {"claimed_by": claim},
+            {"$set": {"status": "pending", "available_at": retry_at}, "$inc": {"attempts": 1}, "$unset": {"claimed_by": ""}}
+        )
+        await outbox.update_many(
+            {"status": "pending", "attempts": {"$gte": settings.notification_max_attempts}},
+            {"$set": {"status": "failed", "processed_at": datetime.now()}}
+        )
+
+    async def _build_notifications(self, db, entries: List[dict]) -> List[dict]:
+        issue_ids = list({entry["issue_id"] for entry in entries})
+
+        recipients: Dict[ObjectId, set] = {issue_id: set() for issue_id in issue_ids}
+        async for volunteer in db.volunteers.find(
+            {"issue_id": {"$in": issue_ids}, "status": "active"}, {"issue_id": 1, "user_id": 1}
+        ):
+            recipients[volunteer["issue_id"]].add(volunteer["user_id"])
+        async for pledge in db.pledges.find(
+            {"issue_id": {"$in": issue_ids}}, {"issue_id": 1, "pledger_id": 1}
+        ):
+            recipients[pledge["issue_id"]].add(pledge["pledger_id"])
+
+        # One notification per (user, issue): the latest entry wins, earlier ones add to its count
+        collapsed: Dict[Tuple[ObjectId, ObjectId], dict] = {}
+        for entry in sorted(entries, key=lambda e: e["created_at"]):
+            for user_id in recipients[entry["issue_id"]]:
+                if user_id == entry.get("actor_id"):
+                    continue
+                key = (user_id, entry["issue_id"])
+                count = collapsed[key]["count"] + 1 if key in collapsed else 1
+                collapsed[key] = {
+                    "user_id": user_id,
+                    "issue_id": entry["issue_id"],
+                    "kind": entry["kind"],
+                    "message": _message(entry),
+                    "count": count
+                }
+
+        return list(collapsed.values())
+
+
+notification_dispatcher = NotificationDispatcher()
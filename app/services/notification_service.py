@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from fastapi import HTTPException
+from app.models.user import CurrentUser
+from app.schemas.notification import NotificationResponse
+
+# Outbox entry kinds
+ISSUE_RESOLVED = "issue_resolved"
+ISSUE_COMMENTED = "issue_commented"
+
+
+class NotificationService:
+    """Writes outbox entries on the request path and serves each user's in-app inbox"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.outbox_collection = db.notification_outbox
+        self.notifications_collection = db.notifications
+
+    async def enqueue(self, kind: str, issue: dict, actor: CurrentUser, session=None):
+        """
+        Record that volunteers and pledgers of issue should hear about kind.
+        Pass the session of the write that caused it so both commit together;
+        recipients are resolved later by the dispatcher.
+        """
+        now = datetime.now()
+        await self.outbox_collection.insert_one({
+            "kind": kind,
+            "issue_id": issue["_id"],
+            "issue_title": issue.get("title"),
+            "actor_id": actor.id,
+            "actor_username": actor.username,
+            "status": "pending",
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now
+        }, session=session)
+
+    async def get_inbox(self, current_user: CurrentUser, unread_only: bool = False, limit: int = 50) -> List[NotificationResponse]:
+        query = {"user_id": current_user.id}
+        if unread_only:
+            query["read"] = False
+
+        notifications = await self.notifications_collection.find(query).sort(
+            "updated_at", -1
+        ).limit(limit).to_list(limit)
+        return [self._format_notification(n) for n in notifications]
+
+    async def mark_read(self, notification_id: str, current_user: CurrentUser):
+        result = await self.notifications_collection.update_one(
+            {"_id": ObjectId(notification_id), "user_id": current_user.id},
+            {"$set": {"read": True}}
+        )
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        return {"message": "Notification marked as read"}
+
+    async def mark_all_read(self, current_user: CurrentUser):
+        result = await self.notifications_collection.update_many(
+            {"user_id": current_user.id, "read": False},
+            {"$set": {"read": True}}
+        )
+        return {"message": f"{result.modified_count} notifications marked as read"}
+
+    @staticmethod
+    def _format_notification(notification: dict) -> NotificationResponse:
+        issue_id = notification.get("issue_id")
+        return NotificationResponse.model_construct(
+            id=str(notification["_id"]),
+            issue_id=str(issue_id) if issue_id else None,
+            kind=notification["kind"],
+            message=notification["message"],
+            count=notification.get("count", 1),
+            read=notification.get("read", False),
+            created_at=notification["created_at"],
+            updated_at=notification.get("updated_at", notification["created_at"])
+        )
@@ -1,9 +1,18 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ReturnDocument
 from fastapi import HTTPException
 from app.schemas.pledge import PledgeCreate, PledgeResponse
+from app.models.user import CurrentUser
+from app.core.cache import invalidate_user
+from app.core.database import run_in_transaction, insert_and_return
+from app.core.versions import bump_version, ISSUES
+from app.core.fieldsets import Fieldset
+from app.services import issue_feed as feed
+
+PLEDGE_FIELDSET = Fieldset(PledgeResponse)
 
 class PledgeService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -15,7 +24,7 @@ class PledgeService:
     async def create_pledge(
         self, 
         issue_id: str, 
-        username: str, 
+        current_user: CurrentUser, 
         pledge_data: PledgeCreate
     ) -> PledgeResponse:
         # Validate
@@ -25,24 +34,11 @@ class PledgeService:
         if pledge_data.reward_type == "item" and not pledge_data.reward_description:
             raise HTTPException(status_code=400, detail="reward_description required for items")
         
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Check issue exists
-        issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
-        if not issue:
-            raise HTTPException(status_code=404, detail="Issue not found")
-        
-        if issue["status"] == "resolved":
-            raise HTTPException(status_code=400, detail="Cannot pledge for resolved issue")
-        
         # Create pledge
         pledge_dict = {
             "issue_id": ObjectId(issue_id),
-            "pledger_id": user["_id"],
-            "pledger_username": user["username"],
+            "pledger_id": current_user.id,
+            "pledger_username": current_user.username,
             "reward_type": pledge_data.reward_type,
             "reward_amount": pledge_data.reward_amount,
             "reward_description": pledge_data.reward_description,
@@ -50,88 +46,122 @@ class PledgeService:
             "created_at": datetime.utcnow()
         }
         
-        result = await self.pledges_collection.insert_one(pledge_dict)
+        counters = {"pledge_count": 1}
+        if pledge_data.reward_type == "points":
+            counters["pledged_points"] = pledge_data.reward_amount
+        elif pledge_data.reward_type == "money":
+            counters["pledged_money"] = pledge_data.reward_amount
         
-        # Award pledger points for generosity
-        await self.users_collection.update_one(
-            {"_id": user["_id"]},
-            {"$inc": {"points": 20}}  # +20 points for pledging
-        )
-        
-        # Update issue priority (more pledges = higher priority)
-        pledge_count = await self.pledges_collection.count_documents({
-            "issue_id": ObjectId(issue_id),
-            "status": "active"
-        })
-        
-        if pledge_count >= 3:
-            await self.issues_collection.update_one(
-                {"_id": ObjectId(issue_id)},
-                {"$set": {"priority": "high"}}
+        async def record_pledge(session):
+            # Bump the issue's pledge totals only while it is not resolved
+            issue = await self.issues_collection.find_one_and_update(
+                {"_id": ObjectId(issue_id), "status": {"$ne": "resolved"}},
+                {"$inc": counters, "$set": {"updated_at": datetime.now()}},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+            if issue is None:
+                existing = await self.issues_collection.find_one({"_id": ObjectId(issue_id)}, {"_id": 1}, session=session)
+                if not existing:
+                    raise HTTPException(status_code=404, detail="Issue not found")
+                raise HTTPException(status_code=400, detail="Cannot pledge for resolved issue")
+            
+            pledge = await insert_and_return(self.pledges_collection, pledge_dict, session=session)
+            
+            # Award pledger points for generosity
+            await self.users_collection.update_one(
+                {"_id": current_user.id},
+                {"$inc": {"points": 20}},  # +20 points for pledging
+                session=session
             )
+            
+            # Update issue priority (more pledges = higher priority)
+            if issue["pledge_count"] >= 3 and issue["priority"] != "high":
+                # A new updated_at so conditional GETs of the issue see the change
+                raised = {"priority": "high", "updated_at": datetime.now()}
+                await self.issues_collection.update_one(
+                    {"_id": ObjectId(issue_id)},
+                    {"$set": raised},
+                    session=session
+                )
+                issue.update(raised)
+            
+            return pledge, issue
+        
+        pledge, issue = await run_in_transaction(record_pledge)
+        invalidate_user(current_user.id)
+        await bump_version(self.db, ISSUES)
+        await feed.issue_feed.publish(feed.PLEDGED, issue)
         
-        pledge = await self.pledges_collection.find_one({"_id": result.inserted_id})
         return self._format_pledge_response(pledge)
     
-    async def get_pledges_for_issue(self, issue_id: str) -> List[PledgeResponse]:
+    async def get_pledges_for_issue(self, issue_id: str, fields: Optional[Tuple[str, ...]] = None) -> List[PledgeResponse]:
         pledges = await self.pledges_collection.find({
             "issue_id": ObjectId(issue_id),
             "status": "active"
-        }).to_list(100)
+        }, PLEDGE_FIELDSET.projection(fields)).to_list(100)
         
-        return [self._format_pledge_response(p) for p in pledges]
+        return PLEDGE_FIELDSET.apply((self._format_pledge_response(p) for p in pledges), fields)
     
-    async def distribute_pledges(self, issue_id: str, resolver_id: ObjectId):
-        """Distribute all pledges to the resolver when issue is completed"""
-        pledges = await self.pledges_collection.find({
-            "issue_id": ObjectId(issue_id),
-            "status": "active"
-        }).to_list(100)
+    async def distribute_pledges(self, issue: dict, resolver_id: ObjectId, session=None):
+        """
+        Mark all active pledges of a completed issue as distributed to the resolver.
+        Returns the totals; crediting the resolver's points is left to the caller
+        so it can be merged with the issue's own award.
+        """
+        distributed_at = datetime.utcnow()
+        await self.pledges_collection.update_many(
+            {"issue_id": issue["_id"], "status": "active"},
+            {
+                "$set": {
+                    "status": "distributed",
+                    "distributed_at": distributed_at,
+                    "distributed_to": resolver_id
+                }
+            },
+            session=session
+        )
         
-        total_points = 0
-        total_money = 0
+        # Totals come from the issue's counters; issues that predate them are summed once
+        if "pledge_count" in issue:
+            return {
+                "total_points": issue.get("pledged_points", 0),
+                "total_money": issue.get("pledged_money", 0),
+                "pledge_count": issue["pledge_count"]
+            }
         
-        for pledge in pledges:
-            if pledge["reward_type"] == "points":
-                total_points += pledge["reward_amount"]
-            elif pledge["reward_type"] == "money":
-                total_money += pledge["reward_amount"]
-            
-            # Mark as distributed
-            await self.pledges_collection.update_one(
-                {"_id": pledge["_id"]},
-                {
-                    "$set": {
-                        "status": "distributed",
-                        "distributed_at": datetime.utcnow(),
-                        "distributed_to": resolver_id
-                    }
-                }
-            )
+        totals = await self.pledges_collection.aggregate([
+            {"$match": {
+                "issue_id": issue["_id"],
+                "status": "distributed",
+                "distributed_to": resolver_id,
+                "distributed_at": distributed_at
+            }},
+            {"$group": {
+                "_id": "$reward_type",
+                "amount": {"$sum": {"$ifNull": ["$reward_amount", 0]}},
+                "count": {"$sum": 1}
+            }}
+        ], session=session).to_list(None)
         
-        # Award points to resolver
-        if total_points > 0:
-            await self.users_collection.update_one(
-                {"_id": resolver_id},
-                {"$inc": {"points": int(total_points)}}
-            )
+        by_type = {row["_id"]: row for row in totals}
         
         return {
-            "total_points": total_points,
-            "total_money": total_money,
-            "pledge_count": len(pledges)
+            "total_points": by_type.get("points", {}).get("amount", 0),
+            "total_money": by_type.get("money", {}).get("amount", 0),
+            "pledge_count": sum(row["count"] for row in totals)
         }
     
     def _format_pledge_response(self, pledge: dict) -> PledgeResponse:
-        return PledgeResponse(
+        return PledgeResponse.model_construct(
             id=str(pledge["_id"]),
-            issue_id=str(pledge["issue_id"]),
-            pledger_id=str(pledge["pledger_id"]),
-            pledger_username=pledge["pledger_username"],
-            reward_type=pledge["reward_type"],
+            issue_id=str(pledge["issue_id"]) if pledge.get("issue_id") else None,
+            pledger_id=str(pledge["pledger_id"]) if pledge.get("pledger_id") else None,
+            pledger_username=pledge.get("pledger_username"),
+            reward_type=pledge.get("reward_type"),
             reward_amount=pledge.get("reward_amount"),
             reward_description=pledge.get("reward_description"),
-            status=pledge["status"],
-            created_at=pledge["created_at"],
+            status=pledge.get("status"),
+            created_at=pledge.get("created_at"),
             distributed_at=pledge.get("distributed_at")
         )
\ No newline at end of file
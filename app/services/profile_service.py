@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from fastapi import HTTPException
+from app.config import settings
+from app.schemas.profile import ProfileSummary, ProfileResponse
+
+# Stored with every profile but left out of listings
+_SUMMARY_PROJECTION = {"folded": 0}
+
+
+class ProfileService:
+    """Stores request profiles taken by ProfilingMiddleware and serves them to admins"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.profiles_collection = db.request_profiles
+
+    async def save(self, profile: dict) -> None:
+        profile["created_at"] = datetime.now()
+        # Per-document expiry, so changing the retention needs no index change
+        profile["expires_at"] = datetime.utcnow() + timedelta(days=settings.profile_retention_days)
+        await self.profiles_collection.insert_one(profile)
+
+    async def list_profiles(self, route: Optional[str] = None, limit: int = 50) -> List[ProfileSummary]:
+        query = {"route": route} if route else {}
+        profiles = await self.profiles_collection.find(query, _SUMMARY_PROJECTION).sort(
+            "created_at", -1
+        ).limit(limit).to_list(limit)
+        return [self._format_summary(p) for p in profiles]
+
+    async def get_profile(self, profile_id: str) -> ProfileResponse:
+        profile = None
+        if ObjectId.is_valid(profile_id):
+            profile = await self.profiles_collection.find_one({"_id": ObjectId(profile_id)})
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+
+        return ProfileResponse.model_construct(
+            **self._format_summary(profile).__dict__,
+            interval_ms=profile["interval_ms"],
+            folded=profile["folded"]
+        )
+
+    @staticmethod
+    def _format_summary(profile: dict) -> ProfileSummary:
+        return ProfileSummary.model_construct(
+            id=str(profile["_id"]),
+            method=profile["method"],
+            path=profile["path"],
+            route=profile["route"],
+            status=profile["status"],
+            duration_ms=profile["duration_ms"],
+            trigger=profile["trigger"],
+            samples=profile["samples"],
+            db=profile.get("db"),
+            created_at=profile["created_at"]
+        )
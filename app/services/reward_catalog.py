@@ -0,0 +1,72 @@
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+from bson import ObjectId
+from app.config import settings
+from app.core.response_cache import CachedPayload, VersionedPayloadCache
+from app.core.versions import REWARDS
+from app.schemas.reward import RewardResponse
+
+
+class CatalogSnapshot:
+    """Immutable view of the available rewards, sorted by points_required"""
+
+    def __init__(self, documents: List[dict]):
+        documents = sorted(documents, key=lambda r: (r["points_required"], str(r["_id"])))
+        self.rewards: Tuple[RewardResponse, ...] = tuple(self._format_reward(r) for r in documents)
+        self.documents: Mapping[str, dict] = MappingProxyType({str(r["_id"]): r for r in documents})
+        self._points: Tuple[int, ...] = tuple(r["points_required"] for r in documents)
+
+    def get(self, reward_id: str) -> Optional[dict]:
+        return self.documents.get(reward_id)
+
+    def affordable(self, balance: float) -> Tuple[RewardResponse, ...]:
+        """Rewards costing at most balance, cheapest first"""
+        return self.rewards[:bisect_right(self._points, balance)]
+
+    @staticmethod
+    def _format_reward(reward: dict) -> RewardResponse:
+        return RewardResponse.model_construct(
+            id=str(reward["_id"]),
+            name=reward["name"],
+            description=reward["description"],
+            points_required=reward["points_required"],
+            image_url=reward.get("image_url"),
+            available=reward.get("available", True)
+        )
+
+
+class RewardCatalog:
+    """
+    Per-worker copy of the rewards catalog. It is rebuilt only when the
+    rewards version in collection_versions moves (create_reward bumps it),
+    which every worker notices within rewards_catalog_version_ttl_seconds.
+    """
+
+    def __init__(self):
+        self._cache = VersionedPayloadCache(
+            REWARDS,
+            maxsize=1,
+            version_ttl=settings.rewards_catalog_version_ttl_seconds,
+            max_stale=settings.rewards_catalog_max_stale_seconds
+        )
+
+    async def snapshot(self, db) -> CachedPayload:
+        """The current CatalogSnapshot (as .body) with the rewards version it was built from"""
+        async def build() -> CatalogSnapshot:
+            return CatalogSnapshot(await db.rewards.find({"available": True}).to_list(None))
+
+        return await self._cache.get(db, "catalog", build)
+
+    async def find_available(self, db, reward_id: str) -> Optional[dict]:
+        """
+        Look up an available reward. Falls back to Mongo for ids the snapshot
+        has not seen yet (created on another worker moments ago).
+        """
+        reward = (await self.snapshot(db)).body.get(reward_id)
+        if reward is None:
+            reward = await db.rewards.find_one({"_id": ObjectId(reward_id), "available": True})
+        return reward
+
+
+reward_catalog = RewardCatalog()
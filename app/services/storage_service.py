@@ -1,8 +1,6 @@
 import os
 import io
 import uuid
-import cloudinary
-import cloudinary.uploader
 from datetime import datetime
 from pathlib import Path
 from fastapi import UploadFile, HTTPException, status
@@ -11,12 +9,23 @@ from app.utils.image_processing import validate_image, compress_image
 from typing import Optional
 
 
-cloudinary.config(
-    cloud_name=settings.cloudinary_cloud_name,
-    api_key=settings.cloudinary_api_key,
-    api_secret=settings.cloudinary_api_secret,
-    secure=True
-)
+_cloudinary_uploader = None
+
+def _uploader():
+    """Import and configure the Cloudinary SDK on the first upload or delete, keeping it off startup"""
+    global _cloudinary_uploader
+    if _cloudinary_uploader is None:
+        import cloudinary
+        import cloudinary.uploader
+
+        cloudinary.config(
+            cloud_name=settings.cloudinary_cloud_name,
+            api_key=settings.cloudinary_api_key,
+            api_secret=settings.cloudinary_api_secret,
+            secure=True
+        )
+        _cloudinary_uploader = cloudinary.uploader
+    return _cloudinary_uploader
 
 class StorageService:
     async def save_upload_file(
@@ -79,9 +88,12 @@ class StorageService:
         # Determine which folder to use
         upload_folder = folder if folder else settings.cloudinary_folder
         
+        if not settings.use_cloudinary:
+            return StorageService._save_local(compressed_bytes, upload_folder, f"{unique_id}.jpg")
+        
         try:
             # Upload to Cloudinary
-            upload_result = cloudinary.uploader.upload(
+            upload_result = _uploader().upload(
                 io.BytesIO(compressed_bytes),
                 folder=upload_folder,  # Use the determined folder
                 public_id=unique_id,
@@ -142,10 +154,31 @@ class StorageService:
         #         detail=f"Failed to upload image: {str(e)}"
         #     )
     
+    @staticmethod
+    def _save_local(file_bytes: bytes, folder: str, filename: str) -> str:
+        """Write to upload_dir/<folder>/<year>/<month>/ (USE_CLOUDINARY=false) and return its URL path"""
+        now = datetime.now()
+        relative_dir = Path(folder) / f"{now.year}" / f"{now.month:02d}"
+        upload_path = Path(settings.upload_dir) / relative_dir
+        upload_path.mkdir(parents=True, exist_ok=True)
+        
+        with open(upload_path / filename, 'wb') as f:
+            f.write(file_bytes)
+        
+        return f"/{Path(settings.upload_dir).name}/{relative_dir.as_posix()}/{filename}"
+    
     @staticmethod
     def delete_file(file_url: str):
-        """Delete file from Cloudinary"""
+        """Delete file from Cloudinary, or from upload_dir when stored locally"""
         try:
+            if not settings.use_cloudinary:
+                prefix = f"/{Path(settings.upload_dir).name}/"
+                if file_url.startswith(prefix):
+                    file_path = Path(settings.upload_dir) / file_url[len(prefix):]
+                    if file_path.exists():
+                        os.remove(file_path)
+                return
+            
             # Extract public_id from URL
             if 'cloudinary.com' in file_url:
                 parts = file_url.split('/')
@@ -156,15 +189,24 @@ class StorageService:
                 full_public_id = f"{settings.cloudinary_folder}/{public_id}"
                 
                 # Delete from Cloudinary
-                cloudinary.uploader.destroy(full_public_id, resource_type="image")
+                _uploader().destroy(full_public_id, resource_type="image")
         except Exception as e:
             print(f"Failed to delete image from Cloudinary: {str(e)}")
             pass
 
     async def upload_avatar(self, file) -> str:
         """Upload avatar to Cloudinary and return the secure URL"""
+        if not settings.use_cloudinary:
+            file_ext = (file.filename or "").rsplit('.', 1)[-1].lower()
+            if file_ext not in settings.allowed_extensions:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File type not allowed. Allowed: {settings.allowed_extensions}"
+                )
+            return self._save_local(await file.read(), "tankas_avatars", f"{uuid.uuid4()}.{file_ext}")
+        
         try:
-            result = cloudinary.uploader.upload(
+            result = _uploader().upload(
                 file.file,
                 folder="tankas_avatars",
                 resource_type="auto",
@@ -4,6 +4,9 @@ from bson import ObjectId
 from fastapi import HTTPException, status
 from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.dashboard import DashboardStats
+from app.models.user import CurrentUser
+from app.core.cache import invalidate_user
+from app.core.database import update_and_return
 
 class UserService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -29,28 +32,31 @@ class UserService:
             created_at=user["created_at"]
         )
     
-    async def update_user(self, username: str, update_data: UserUpdate) -> UserResponse:
+    async def update_user(self, current_user: CurrentUser, update_data: UserUpdate) -> UserResponse:
         """Update username and other user fields"""
         update_dict = update_data.model_dump(exclude_unset=True)
         update_dict["updated_at"] = datetime.now()
         
-        result = await self.users_collection.update_one(
-            {"username": username},
+        user = await update_and_return(
+            self.users_collection,
+            {"_id": current_user.id},
             {"$set": update_dict}
         )
         
-        if result.matched_count == 0:
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+        invalidate_user(current_user.id)
         
-        return await self.get_user_by_username(username)
+        return self._format_user_response(user)
     
-    async def update_avatar(self, username: str, avatar_url: str) -> UserResponse:
+    async def update_avatar(self, current_user: CurrentUser, avatar_url: str) -> UserResponse:
         """Update only the avatar URL"""
-        result = await self.users_collection.update_one(
-            {"username": username},
+        user = await update_and_return(
+            self.users_collection,
+            {"_id": current_user.id},
             {
                 "$set": {
                     "avatar": avatar_url,
@@ -59,13 +65,14 @@ class UserService:
             }
         )
         
-        if result.matched_count == 0:
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+        invalidate_user(current_user.id)
         
-        return await self.get_user_by_username(username)
+        return self._format_user_response(user)
     
     async def get_user_by_username(self, username: str) -> UserResponse:
         user = await self.users_collection.find_one({"username": username})
@@ -80,10 +87,19 @@ class UserService:
             
         return UserResponse(**user)
     
-    async def get_dashboard(self, username: str) -> DashboardStats:
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    def get_profile(self, current_user: CurrentUser) -> UserResponse:
+        """Build the profile from the user document already loaded for this request"""
+        return self._format_user_response(current_user.document)
+    
+    @staticmethod
+    def _format_user_response(user: dict) -> UserResponse:
+        user = dict(user)
+        user["id"] = user.pop("_id")
+        
+        return UserResponse(**user)
+    
+    async def get_dashboard(self, current_user: CurrentUser) -> DashboardStats:
+        user = current_user.document
         
         # Get recent issues
         recent_issues = await self.issues_collection.find(
@@ -1,9 +1,31 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
 from fastapi import HTTPException, status
-from app.schemas.volunteer import VolunteerCreate, VolunteerResponse, DiscussionMessageCreate, DiscussionMessageResponse 
+from app.schemas.volunteer import VolunteerCreate, VolunteerResponse, DiscussionMessageCreate, DiscussionMessageResponse, DiscussionPage
+from app.models.user import CurrentUser
+from app.config import settings
+from app.core.cache import invalidate_user, membership_cache, invalidate_membership
+from app.core.database import run_in_transaction, insert_and_return
+from app.core.pubsub import hub
+from app.core.versions import bump_version, ISSUES
+from app.services.issue_state_machine import IssueStateMachine
+from app.services import issue_feed as feed
+from app.utils.pagination import encode_cursor, keyset_filter
+
+# Withdrawals are announced here so every worker drops its cached membership
+MEMBERSHIP_TOPIC = "volunteers:membership"
+
+def discussion_topic(issue_id: str) -> str:
+    return f"discussion:{issue_id}"
+
+def _drop_membership(message: dict) -> None:
+    invalidate_membership(message["issue_id"], message["user_id"])
+
+hub.listen(MEMBERSHIP_TOPIC, _drop_membership)
 
 class VolunteerService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -13,6 +35,7 @@ class VolunteerService:
         self.users_collection = db.users
         # New collection for discussions
         self.discussions_collection = db.volunteer_discussions
+        self.state_machine = IssueStateMachine(self.issues_collection)
 
     # ------------------------------------------------------------------
     # CORE VOLUNTEER METHODS (from original code)
@@ -21,88 +44,108 @@ class VolunteerService:
     async def volunteer_for_issue(
         self, 
         issue_id: str, 
-        username: str, 
+        current_user: CurrentUser, 
         volunteer_data: VolunteerCreate
     ) -> VolunteerResponse:
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Check if issue exists and is open
-        issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
-        if not issue:
-            raise HTTPException(status_code=404, detail="Issue not found")
-        
-        if issue["status"] == "resolved":
-            raise HTTPException(status_code=400, detail="Issue already resolved")
-        
-        # Check if already volunteered
-        existing = await self.volunteers_collection.find_one({
-            "issue_id": ObjectId(issue_id),
-            "user_id": user["_id"],
-            "status": "active"
-        })
-        
-        if existing:
-            raise HTTPException(status_code=400, detail="Already volunteered for this issue")
-        
         # Create volunteer record
         volunteer_dict = {
             "issue_id": ObjectId(issue_id),
-            "user_id": user["_id"],
-            "username": user["username"],
+            "user_id": current_user.id,
+            "username": current_user.username,
             "volunteered_at": datetime.utcnow(),
             "status": "active",
             "contribution": volunteer_data.contribution
         }
         
-        result = await self.volunteers_collection.insert_one(volunteer_dict)
-        
-        # Award points for volunteering
-        await self.users_collection.update_one(
-            {"_id": user["_id"]},
-            {"$inc": {"points": 5}}  # +5 points for volunteering
-        )
-        
-        # Update issue status to "in_progress" if first volunteer
-        volunteer_count = await self.volunteers_collection.count_documents({
-            "issue_id": ObjectId(issue_id),
-            "status": "active"
-        })
-        
-        if volunteer_count == 1 and issue["status"] == "open":
-            await self.issues_collection.update_one(
-                {"_id": ObjectId(issue_id)},
-                {"$set": {"status": "in_progress", "updated_at": datetime.utcnow()}}
+        async def record_volunteer(session):
+            # Bump the counter only while the issue is not resolved
+            issue = await self.issues_collection.find_one_and_update(
+                {"_id": ObjectId(issue_id), "status": {"$ne": "resolved"}},
+                {"$inc": {"volunteer_count": 1}, "$set": {"updated_at": datetime.now()}},
+                return_document=ReturnDocument.AFTER,
+                session=session
             )
+            if issue is None:
+                await self._raise_issue_unavailable(issue_id, session)
+            
+            # The unique partial index on active (issue_id, user_id) rejects duplicates
+            try:
+                volunteer = await insert_and_return(self.volunteers_collection, volunteer_dict, session=session)
+            except DuplicateKeyError:
+                if session is None:
+                    await self.issues_collection.update_one(
+                        {"_id": ObjectId(issue_id)},
+                        {"$inc": {"volunteer_count": -1}, "$set": {"updated_at": datetime.now()}}
+                    )
+                raise HTTPException(status_code=400, detail="Already volunteered for this issue")
+            
+            # Award points for volunteering
+            await self.users_collection.update_one(
+                {"_id": current_user.id},
+                {"$inc": {"points": 5}},  # +5 points for volunteering
+                session=session
+            )
+            
+            # First volunteer moves an open issue to "in_progress"; a no-op otherwise
+            if issue["status"] == "open":
+                issue = await self.state_machine.transition(issue_id, "in_progress", session=session) or issue
+            
+            return volunteer, issue
+        
+        volunteer, issue = await run_in_transaction(record_volunteer)
+        invalidate_user(current_user.id)
+        invalidate_membership(issue_id, current_user.id)
+        await bump_version(self.db, ISSUES)
+        await feed.issue_feed.publish(feed.VOLUNTEERED, issue)
         
-        # Return volunteer record
-        volunteer = await self.volunteers_collection.find_one({"_id": result.inserted_id})
         return self._format_volunteer_response(volunteer)
     
-    async def withdraw_volunteer(self, issue_id: str, username: str):
-        user = await self.users_collection.find_one({"username": username})
-        
-        result = await self.volunteers_collection.update_one(
-            {
-                "issue_id": ObjectId(issue_id),
-                "user_id": user["_id"],
-                "status": "active"
-            },
-            {
-                "$set": {
-                    "status": "withdrawn",
-                    "withdrawn_at": datetime.utcnow()
-                }
-            }
-        )
+    async def withdraw_volunteer(self, issue_id: str, current_user: CurrentUser):
+        async def record_withdrawal(session):
+            result = await self.volunteers_collection.update_one(
+                {
+                    "issue_id": ObjectId(issue_id),
+                    "user_id": current_user.id,
+                    "status": "active"
+                },
+                {
+                    "$set": {
+                        "status": "withdrawn",
+                        "withdrawn_at": datetime.utcnow()
+                    }
+                },
+                session=session
+            )
+            
+            if result.matched_count == 0:
+                raise HTTPException(status_code=404, detail="Volunteer record not found")
+            
+            return await self.issues_collection.find_one_and_update(
+                {"_id": ObjectId(issue_id)},
+                {"$inc": {"volunteer_count": -1}, "$set": {"updated_at": datetime.now()}},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
         
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Volunteer record not found")
+        issue = await run_in_transaction(record_withdrawal)
+        invalidate_membership(issue_id, current_user.id)
+        try:
+            await hub.publish(MEMBERSHIP_TOPIC, {"issue_id": str(issue_id), "user_id": str(current_user.id)})
+        except Exception as e:
+            print(f"Failed to publish membership change: {str(e)}")
+        await bump_version(self.db, ISSUES)
+        if issue is not None:
+            await feed.issue_feed.publish(feed.UPDATED, issue)
         
         return {"message": "Volunteer withdrawn successfully"}
     
+    async def _raise_issue_unavailable(self, issue_id: str, session=None):
+        """Explain why a conditional issue update matched nothing"""
+        issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)}, {"status": 1}, session=session)
+        if not issue:
+            raise HTTPException(status_code=404, detail="Issue not found")
+        raise HTTPException(status_code=400, detail="Issue already resolved")
+    
     async def get_volunteers_for_issue(self, issue_id: str) -> List[VolunteerResponse]:
         volunteers = await self.volunteers_collection.find({
             "issue_id": ObjectId(issue_id),
@@ -112,7 +155,7 @@ class VolunteerService:
         return [self._format_volunteer_response(v) for v in volunteers]
     
     def _format_volunteer_response(self, volunteer: dict) -> VolunteerResponse:
-        return VolunteerResponse(
+        return VolunteerResponse.model_construct(
             id=str(volunteer["_id"]),
             issue_id=str(volunteer["issue_id"]),
             user_id=str(volunteer["user_id"]),
@@ -129,84 +172,113 @@ class VolunteerService:
     async def post_discussion_message(
         self,
         issue_id: str,
-        username: str,
+        current_user: CurrentUser,
         message_data: DiscussionMessageCreate
     ) -> DiscussionMessageResponse:
         """Post a message in the volunteer discussion"""
         
-        # Get user
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # Check if issue exists
         issue = await self.issues_collection.find_one({"_id": ObjectId(issue_id)})
         if not issue:
             raise HTTPException(status_code=404, detail="Issue not found")
         
-        # Check if user is a volunteer for this issue (Authorization)
-        is_volunteer = await self.volunteers_collection.find_one({
-            "issue_id": ObjectId(issue_id),
-            "user_id": user["_id"],
-            "status": "active"
-        })
-        
-        if not is_volunteer:
-            raise HTTPException(
-                status_code=403, 
-                detail="Only active volunteers can post in discussion"
-            )
+        # Check if user is a volunteer for this issue (Authorization); writes always ask Mongo
+        await self.ensure_active_volunteer(
+            issue_id, current_user, "Only active volunteers can post in discussion", use_cache=False
+        )
         
         # Create discussion message
         message_dict = {
             "issue_id": ObjectId(issue_id),
-            "user_id": user["_id"],
-            "username": user["username"],
-            "avatar": user.get("avatar"),
+            "user_id": current_user.id,
+            "username": current_user.username,
+            "avatar": current_user.document.get("avatar"),
             "message": message_data.message,
             "created_at": datetime.utcnow()
         }
         
-        result = await self.discussions_collection.insert_one(message_dict)
+        message = await insert_and_return(self.discussions_collection, message_dict)
+        response = self._format_discussion_message(message)
+        
+        # Push to live subscribers; the message is already stored, so a failed publish is not fatal
+        try:
+            await hub.publish(discussion_topic(issue_id), response.model_dump(mode="json"))
+        except Exception as e:
+            print(f"Failed to publish discussion message: {str(e)}")
         
-        # Return the message
-        message = await self.discussions_collection.find_one({"_id": result.inserted_id})
-        return self._format_discussion_message(message)
+        return response
 
     async def get_discussion_messages(
         self,
         issue_id: str,
-        username: str
-    ) -> List[DiscussionMessageResponse]:
-        """Get all discussion messages for an issue"""
+        current_user: CurrentUser,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> DiscussionPage:
+        """
+        One page of discussion messages, oldest first.
+        With no cursor this is the latest page; `before` pages back through
+        older messages and `after` fetches messages newer than a cursor.
+        """
         
         # Check if user is a volunteer (Authorization)
-        user = await self.users_collection.find_one({"username": username})
-        if not user:
-             # User check is performed implicitly by the check below, but explicit is better
-             raise HTTPException(status_code=404, detail="User not found")
+        await self.ensure_active_volunteer(issue_id, current_user, "Only volunteers can view discussion")
+        
+        limit = min(limit or settings.discussion_page_size, settings.discussion_page_max)
+        query = {"issue_id": ObjectId(issue_id)}
+        try:
+            bounds = []
+            if before:
+                bounds.append(keyset_filter(before, "$lt"))
+            if after:
+                bounds.append(keyset_filter(after, "$gt"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if bounds:
+            query["$and"] = bounds
+        
+        # Walk forward from an `after` cursor, otherwise backward from the newest/`before`;
+        # both follow the (issue_id, created_at, _id) index
+        direction = ASCENDING if after else DESCENDING
+        messages = await self.discussions_collection.find(query).sort(
+            [("created_at", direction), ("_id", direction)]
+        ).limit(limit + 1).to_list(limit + 1)
+        
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if direction == DESCENDING:
+            messages.reverse()
+        
+        return DiscussionPage.model_construct(
+            messages=[self._format_discussion_message(m) for m in messages],
+            has_more=has_more,
+            before=encode_cursor(messages[0]["created_at"], messages[0]["_id"]) if messages else before,
+            after=encode_cursor(messages[-1]["created_at"], messages[-1]["_id"]) if messages else after
+        )
 
+    async def ensure_active_volunteer(self, issue_id: str, current_user: CurrentUser, detail: str, use_cache: bool = True):
+        """
+        Raise 403 unless current_user is an active volunteer on the issue.
+        Reads may use the per-worker cache (cleared on every worker by a
+        withdrawal); pass use_cache=False to check Mongo directly.
+        """
+        cache_key = (str(issue_id), str(current_user.id))
+        if use_cache and membership_cache.get(cache_key):
+            return
+        
         is_volunteer = await self.volunteers_collection.find_one({
             "issue_id": ObjectId(issue_id),
-            "user_id": user["_id"],
+            "user_id": current_user.id,
             "status": "active"
-        })
+        }, {"_id": 1})
         
         if not is_volunteer:
-            raise HTTPException(
-                status_code=403,
-                detail="Only volunteers can view discussion"
-            )
-        
-        # Get messages
-        messages = await self.discussions_collection.find({
-            "issue_id": ObjectId(issue_id)
-        }).sort("created_at", 1).to_list(1000)
-        
-        return [self._format_discussion_message(m) for m in messages]
+            raise HTTPException(status_code=403, detail=detail)
+        membership_cache.set(cache_key, True)
 
     def _format_discussion_message(self, message: dict) -> DiscussionMessageResponse:
-        return DiscussionMessageResponse(
+        return DiscussionMessageResponse.model_construct(
             id=str(message["_id"]),
             issue_id=str(message["issue_id"]),
             user_id=str(message["user_id"]),
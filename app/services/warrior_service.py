@@ -1,27 +1,22 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
+from typing import List, Optional, Tuple
 from app.schemas.user import WarriorResponse
+from app.core.fieldsets import Fieldset
+
+WARRIOR_FIELDSET = Fieldset(WarriorResponse)
 
 class WarriorService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.users_collection = db.users
     
-    async def get_all_warriors(self, limit: int = 100, skip: int = 0) -> List[WarriorResponse]:
+    async def get_all_warriors(self, limit: int = 100, skip: int = 0, fields: Optional[Tuple[str, ...]] = None) -> List[WarriorResponse]:
         """Get all cleanup warriors sorted by points"""
-        warriors = await self.users_collection.find().sort("points", -1).skip(skip).limit(limit).to_list(limit)
+        warriors = await self.users_collection.find(
+            {}, WARRIOR_FIELDSET.projection(fields)
+        ).sort("points", -1).skip(skip).limit(limit).to_list(limit)
         
-        return [
-            WarriorResponse(
-                id=str(warrior["_id"]),
-                username=warrior["username"],
-                display_name=warrior.get("display_name"),
-                avatar=warrior.get("avatar"),
-                points=warrior["points"],
-                tasks_completed=warrior["tasks_completed"]
-            )
-            for warrior in warriors
-        ]
+        return WARRIOR_FIELDSET.apply((self._format_warrior_response(warrior) for warrior in warriors), fields)
     
     async def get_warrior_by_id(self, user_id: str) -> WarriorResponse:
         """Get specific warrior details"""
@@ -32,11 +27,15 @@ class WarriorService:
             from fastapi import HTTPException, status
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Warrior not found")
         
-        return WarriorResponse(
+        return self._format_warrior_response(warrior)
+    
+    @staticmethod
+    def _format_warrior_response(warrior: dict) -> WarriorResponse:
+        return WarriorResponse.model_construct(
             id=str(warrior["_id"]),
-            username=warrior["username"],
+            username=warrior.get("username"),
             display_name=warrior.get("display_name"),
             avatar=warrior.get("avatar"),
-            points=warrior["points"],
-            tasks_completed=warrior["tasks_completed"]
+            points=warrior.get("points"),
+            tasks_completed=warrior.get("tasks_completed")
         )
\ No newline at end of file
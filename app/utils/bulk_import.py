@@ -0,0 +1,152 @@
+import codecs
+import csv
+import json
+import re
+from typing import AsyncIterator, Dict, Optional, Tuple
+from fastapi import UploadFile
+
+CHUNK_SIZE = 64 * 1024
+# A single CSV record or GeoJSON feature larger than this is treated as malformed
+MAX_RECORD_CHARS = 1024 * 1024
+
+_FEATURES_KEY = re.compile(r'"features"\s*:\s*\[')
+
+
+async def iter_upload_text(upload: UploadFile, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[str]:
+    """Read an upload in chunks and decode it incrementally (UTF-8, optional BOM)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def iter_csv_rows(chunks: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Dict[str, str]]]:
+    """
+    Yield (row_number, row) for each CSV record, keyed by the lower-cased header.
+    Row numbers count the header as row 1, like a spreadsheet.
+    """
+    header = None
+    row_number = 0
+    pending = ""
+    remainder = ""
+
+    def parse(record: str):
+        nonlocal header, row_number
+        row_number += 1
+        values = next(csv.reader([record]), [])
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            return None
+        if not any(value.strip() for value in values):
+            return None
+        return row_number, dict(zip(header, values))
+
+    async for chunk in chunks:
+        remainder += chunk
+        *lines, remainder = remainder.split("\n")
+        for line in lines:
+            pending += line + "\n"
+            # An odd number of quotes means a quoted field continues on the next line
+            if pending.count('"') % 2:
+                if len(pending) > MAX_RECORD_CHARS:
+                    raise ValueError(f"Unterminated quoted field starting at row {row_number + 1}")
+                continue
+            parsed = parse(pending)
+            pending = ""
+            if parsed:
+                yield parsed
+
+    pending += remainder
+    if pending.strip():
+        parsed = parse(pending)
+        if parsed:
+            yield parsed
+
+
+async def iter_lines(chunks: AsyncIterator[str]) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (line_number, line) for each non-blank line, numbered from 1"""
+    line_number = 0
+    remainder = ""
+
+    async for chunk in chunks:
+        remainder += chunk
+        *lines, remainder = remainder.split("\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if len(remainder) > MAX_RECORD_CHARS:
+            raise ValueError(f"Line {line_number + 1} is longer than {MAX_RECORD_CHARS} characters")
+
+    if remainder.strip():
+        yield line_number + 1, remainder
+
+
+async def iter_geojson_features(chunks: AsyncIterator[str]) -> AsyncIterator[Tuple[int, dict]]:
+    """Yield (feature_number, feature) from a FeatureCollection without loading it whole"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    in_features = False
+    finished = False
+    feature_number = 0
+
+    async for chunk in chunks:
+        if finished:
+            continue
+        buffer += chunk
+
+        if not in_features:
+            match = _FEATURES_KEY.search(buffer)
+            if not match:
+                # Keep enough of the tail to catch a key split across chunks
+                buffer = buffer[-64:]
+                continue
+            buffer = buffer[match.end():]
+            in_features = True
+
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == "]":
+                finished = True
+                break
+            try:
+                feature, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Most likely a feature split across chunks; wait for more input
+                break
+            feature_number += 1
+            yield feature_number, feature
+
+        buffer = buffer[position:]
+        if len(buffer) > MAX_RECORD_CHARS:
+            raise ValueError(f"Malformed GeoJSON after feature {feature_number}")
+
+    if not in_features:
+        raise ValueError("No \"features\" array found in GeoJSON upload")
+    if not finished and buffer.strip() and buffer.strip() != "]":
+        raise ValueError(f"Malformed GeoJSON after feature {feature_number}")
+
+
+def row_from_feature(feature: dict) -> Dict[str, Optional[str]]:
+    """Flatten a GeoJSON Point feature into the same shape as a CSV row"""
+    if not isinstance(feature, dict):
+        raise ValueError("Not a GeoJSON Feature")
+    geometry = feature.get("geometry") or {}
+    if geometry.get("type") != "Point":
+        raise ValueError("Only Point geometries are supported")
+
+    longitude, latitude = geometry["coordinates"][:2]
+    properties = {key.lower(): value for key, value in (feature.get("properties") or {}).items()}
+    properties["latitude"] = latitude
+    properties["longitude"] = longitude
+    return properties
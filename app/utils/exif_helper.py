@@ -1,8 +1,8 @@
-from PIL import Image
-import piexif
 from typing import Optional, Tuple
 import io
 
+# PIL and piexif are imported inside the functions so they load on first use, not at startup
+
 def convert_to_degrees(value):
     """
     Helper function to convert GPS coordinates stored in EXIF to degrees in float format
@@ -29,6 +29,9 @@ def extract_gps_from_image(image_bytes: bytes) -> Optional[Tuple[float, float]]:
     Returns:
         Tuple of (latitude, longitude) or None if no GPS data found
     """
+    import piexif
+    from PIL import Image
+    
     try:
         # Open image
         image = Image.open(io.BytesIO(image_bytes))
@@ -68,6 +71,9 @@ def get_exif_info(image_bytes: bytes) -> dict:
     Returns:
         Dictionary with EXIF information including GPS, datetime, camera info
     """
+    import piexif
+    from PIL import Image
+    
     try:
         image = Image.open(io.BytesIO(image_bytes))
         exif_dict = piexif.load(image.info.get('exif', b''))
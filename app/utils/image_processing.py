@@ -1,9 +1,12 @@
-from PIL import Image
 import io
 from typing import Tuple
 
+# PIL is imported inside the functions so it loads on the first upload, not at startup
+
 def compress_image(image_bytes: bytes, max_size: Tuple[int, int] = (1920, 1080), quality: int = 85) -> bytes:
     """Compress and resize image"""
+    from PIL import Image
+    
     image = Image.open(io.BytesIO(image_bytes))
     
     # Convert RGBA to RGB if necessary
@@ -22,6 +25,8 @@ def compress_image(image_bytes: bytes, max_size: Tuple[int, int] = (1920, 1080),
 
 def validate_image(file_bytes: bytes) -> bool:
     """Validate if file is a valid image"""
+    from PIL import Image
+    
     try:
         image = Image.open(io.BytesIO(file_bytes))
         image.verify()
@@ -0,0 +1,30 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def encode_cursor(created_at: datetime, document_id: ObjectId) -> str:
+    """Opaque keyset cursor for a (created_at, _id) ordered listing"""
+    raw = f"{created_at.isoformat()}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, document_id = base64.urlsafe_b64decode(padded).decode("ascii").split("|")
+        return datetime.fromisoformat(created_at), ObjectId(document_id)
+    except (ValueError, InvalidId, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_filter(cursor: str, operator: str) -> dict:
+    """Match documents strictly after ($gt) or before ($lt) the cursor in (created_at, _id) order"""
+    created_at, document_id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {operator: created_at}},
+        {"created_at": created_at, "_id": {operator: document_id}},
+    ]}
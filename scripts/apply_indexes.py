@@ -0,0 +1,46 @@
+"""
+Build the indexes declared in app/core/indexes.py ahead of a deploy.
+
+Workers then find the registry version already applied and start without
+touching indexes (or run with INDEX_BUILD_ON_STARTUP=false).
+
+    python -m scripts.apply_indexes [--check] [--force]
+"""
+import argparse
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.core.indexes import index_registry, applied_version, ensure_indexes, registry_version
+
+
+async def main(check: bool, force: bool) -> int:
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    try:
+        database = client[settings.database_name]
+        version = registry_version()
+        current = await applied_version(database)
+        print(f"Registry version: {version} ({sum(len(m) for m in index_registry().values())} indexes)")
+        print(f"Applied version:  {current or 'none'}")
+
+        if check:
+            return 0 if current == version else 1
+
+        if current == version and not force:
+            print("Indexes are up to date")
+            return 0
+
+        if not await ensure_indexes(database, force=True):
+            print("Another process is building indexes; try again when it finishes")
+            return 1
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the applied version differs, without building")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the version matches")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check, args.force)))
@@ -0,0 +1,324 @@
+"""
+Query-plan audit for the services' query shapes.
+
+Seeds a throwaway database with synthetic data, builds the indexes from
+app/core/indexes.py, then explains every query shape the services issue
+and reports:
+
+  - COLLSCAN stages (no usable index)
+  - SORT stages (the sort is done in memory instead of by an index)
+  - docs examined / docs returned above --max-ratio
+
+Shapes that are expected to scan (full exports, loading the whole
+revocation list) are allow-listed with a reason. Exits 1 on any other
+finding, so it can gate index changes in CI.
+
+    python -m scripts.audit_query_plans [--scale 1] [--max-ratio 10] [--json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.core.indexes import ensure_indexes
+from app.services.location_service import LocationService
+
+
+# ------------------------------------------------------------------
+# SEED DATA
+# ------------------------------------------------------------------
+
+async def seed(db, scale: int) -> Dict:
+    """Insert enough documents that a missing index shows up in the plan; returns sample ids"""
+    now = datetime.now()
+    rng = random.Random(42)
+
+    users = [
+        {
+            "_id": ObjectId(), "username": f"user{i}", "email": f"user{i}@example.com",
+            "points": rng.randint(0, 5000), "tasks_completed": rng.randint(0, 50),
+            "tasks_reported": rng.randint(0, 50), "areas_cleaned": 0, "created_at": now,
+        }
+        for i in range(500 * scale)
+    ]
+    await db.users.insert_many(users)
+
+    issues = []
+    for i in range(3000 * scale):
+        issues.append({
+            "_id": ObjectId(),
+            "user_id": rng.choice(users)["_id"],
+            "title": f"Issue {i}",
+            "description": "Synthetic issue",
+            "location": LocationService.create_geojson(rng.uniform(4.5, 6.5), rng.uniform(-2.0, 1.0)),
+            "priority": rng.choice(["low", "medium", "high"]),
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "status": rng.choice(["open", "open", "in_progress", "resolved"]),
+            "points_assigned": 10,
+            "comments": [],
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        })
+    await db.issues.insert_many(issues)
+
+    volunteers, pledges, messages, notifications = [], [], [], []
+    for issue in issues[:1000 * scale]:
+        for user in rng.sample(users, 3):
+            volunteers.append({
+                "issue_id": issue["_id"], "user_id": user["_id"], "username": user["username"],
+                "status": rng.choice(["active", "active", "withdrawn"]), "volunteered_at": now,
+            })
+        pledger = rng.choice(users)
+        pledges.append({
+            "issue_id": issue["_id"], "pledger_id": pledger["_id"], "pledger_username": pledger["username"],
+            "reward_type": "points", "reward_amount": 50, "status": rng.choice(["active", "distributed"]),
+            "created_at": now,
+        })
+    for issue in issues[:50]:
+        for n in range(100 * scale):
+            author = rng.choice(users)
+            messages.append({
+                "issue_id": issue["_id"], "user_id": author["_id"], "username": author["username"],
+                "message": "On my way", "created_at": now - timedelta(seconds=n),
+            })
+    for user in users:
+        for n in range(10):
+            notifications.append({
+                "user_id": user["_id"], "issue_id": rng.choice(issues)["_id"], "kind": "issue_commented",
+                "message": "New comment", "count": 1, "read": rng.random() < 0.7,
+                "created_at": now - timedelta(hours=n), "updated_at": now - timedelta(hours=n),
+            })
+
+    await db.volunteers.insert_many([v for v in volunteers if v["status"] == "withdrawn"] + _dedupe_active(volunteers))
+    await db.pledges.insert_many(pledges)
+    await db.volunteer_discussions.insert_many(messages)
+    await db.notifications.insert_many(notifications)
+    await db.notification_outbox.insert_many([
+        {
+            "kind": "issue_resolved", "issue_id": rng.choice(issues)["_id"], "actor_id": rng.choice(users)["_id"],
+            "status": rng.choice(["done", "done", "done", "pending"]), "attempts": 0,
+            "available_at": now - timedelta(minutes=n), "created_at": now - timedelta(minutes=n),
+        }
+        for n in range(2000 * scale)
+    ])
+    await db.rewards.insert_many([
+        {"name": f"Reward {n}", "description": "Synthetic", "points_required": 100 * (n + 1),
+         "available": n % 5 != 0, "created_at": now}
+        for n in range(100)
+    ])
+    await db.request_profiles.insert_many([
+        {"route": rng.choice(["/api/issues", "/api/events", "/api/issues/{issue_id}"]), "method": "GET",
+         "duration_ms": rng.uniform(5, 500), "folded": "", "created_at": now - timedelta(minutes=n),
+         "expires_at": now + timedelta(days=7)}
+        for n in range(500)
+    ])
+    await db.revoked_tokens.insert_many([
+        {"_id": ObjectId().binary.hex(), "expires_at": now + timedelta(days=1)} for _ in range(200)
+    ])
+
+    return {
+        "user": users[0],
+        "issue": issues[0],
+        "issue_ids": [issue["_id"] for issue in issues[:100]],
+        "usernames": [user["username"] for user in users[:50]],
+        "now": now,
+    }
+
+
+def _dedupe_active(volunteers: List[dict]) -> List[dict]:
+    # The unique partial index allows one active record per (issue, user)
+    seen, active = set(), []
+    for volunteer in volunteers:
+        key = (volunteer["issue_id"], volunteer["user_id"])
+        if volunteer["status"] == "active" and key not in seen:
+            seen.add(key)
+            active.append(volunteer)
+    return active
+
+
+# ------------------------------------------------------------------
+# QUERY SHAPES
+# ------------------------------------------------------------------
+
+def query_shapes(sample: Dict) -> List[Dict]:
+    """One entry per distinct query the services run; keep in step with app/services"""
+    issue_id = sample["issue"]["_id"]
+    user_id = sample["user"]["_id"]
+    now = sample["now"]
+    bbox = LocationService.bbox_query((-1.0, 5.0, 0.0, 6.0))
+
+    return [
+        # Issues
+        {"name": "issues: newest first", "collection": "issues", "filter": {}, "sort": {"created_at": -1}, "limit": 100},
+        {"name": "issues: by status, newest first", "collection": "issues", "filter": {"status": "open"}, "sort": {"created_at": -1}, "limit": 100},
+        {"name": "issues: by id", "collection": "issues", "filter": {"_id": issue_id}},
+        {"name": "issues: in bbox", "collection": "issues", "filter": {"location": bbox},
+         "allow": {"COLLSCAN"}, "reason": "planar $box (matches in_bbox) is not served by 2dsphere; export-only"},
+        {"name": "dashboard: reporter's recent issues", "collection": "issues", "filter": {"user_id": user_id}, "sort": {"created_at": -1}, "limit": 5},
+        {"name": "exports: all issues", "collection": "issues", "filter": {"status": "resolved"}, "sort": {"_id": 1},
+         "allow": {"SORT", "ratio"}, "reason": "full export of every matching issue in _id order"},
+
+        # Users
+        {"name": "warriors / leaderboard", "collection": "users", "filter": {}, "sort": {"points": -1}, "limit": 100},
+        {"name": "users: by username", "collection": "users", "filter": {"username": "user1"}},
+        {"name": "signup: username or email taken", "collection": "users",
+         "filter": {"$or": [{"username": "user1"}, {"email": "user2@example.com"}]}},
+        {"name": "import: reporters by username", "collection": "users", "filter": {"username": {"$in": sample["usernames"]}}},
+
+        # Volunteers and discussion
+        {"name": "volunteers: active for issue", "collection": "volunteers", "filter": {"issue_id": issue_id, "status": "active"}, "limit": 100},
+        {"name": "volunteers: membership check", "collection": "volunteers",
+         "filter": {"issue_id": issue_id, "user_id": user_id, "status": "active"}},
+        {"name": "discussion: latest page", "collection": "volunteer_discussions",
+         "filter": {"issue_id": issue_id}, "sort": {"created_at": -1, "_id": -1}, "limit": 51},
+        {"name": "discussion: page before cursor", "collection": "volunteer_discussions",
+         "filter": {"issue_id": issue_id, "$and": [{"$or": [
+             {"created_at": {"$lt": now}}, {"created_at": now, "_id": {"$lt": ObjectId()}}
+         ]}]},
+         "sort": {"created_at": -1, "_id": -1}, "limit": 51},
+
+        # Pledges
+        {"name": "pledges: active for issue", "collection": "pledges", "filter": {"issue_id": issue_id, "status": "active"}, "limit": 100},
+        {"name": "pledges: distribute on resolve", "collection": "pledges", "filter": {"issue_id": issue_id, "status": "active"}},
+
+        # Notifications
+        {"name": "dispatcher: pending outbox", "collection": "notification_outbox",
+         "filter": {"status": "pending", "available_at": {"$lte": now}}, "sort": {"available_at": 1}, "limit": 100},
+        {"name": "dispatcher: claimed batch", "collection": "notification_outbox", "filter": {"claimed_by": "claim"}},
+        {"name": "dispatcher: volunteers of issues", "collection": "volunteers",
+         "filter": {"issue_id": {"$in": sample["issue_ids"]}, "status": "active"}},
+        {"name": "dispatcher: pledgers of issues", "collection": "pledges", "filter": {"issue_id": {"$in": sample["issue_ids"]}}},
+        {"name": "inbox: all", "collection": "notifications", "filter": {"user_id": user_id}, "sort": {"updated_at": -1}, "limit": 50},
+        {"name": "inbox: unread", "collection": "notifications", "filter": {"user_id": user_id, "read": False}, "sort": {"updated_at": -1}, "limit": 50},
+
+        # Request profiles (admin)
+        {"name": "profiles: newest first", "collection": "request_profiles", "filter": {}, "sort": {"created_at": -1}, "limit": 50},
+        {"name": "profiles: by route", "collection": "request_profiles", "filter": {"route": "/api/issues"}, "sort": {"created_at": -1}, "limit": 50},
+
+        # Rewards and tokens
+        {"name": "rewards: catalog", "collection": "rewards", "filter": {"available": True}},
+        {"name": "revocation: candidate lookup", "collection": "revoked_tokens", "filter": {"_id": {"$in": ["a", "b"]}}},
+        {"name": "revocation: load all", "collection": "revoked_tokens", "filter": {},
+         "allow": {"COLLSCAN"}, "reason": "rebuilds the Bloom filter from every revoked id"},
+
+        # Aggregations
+        {"name": "counter repair: volunteers", "collection": "volunteers", "pipeline": [
+            {"$match": {"issue_id": {"$in": sample["issue_ids"]}, "status": "active"}},
+            {"$group": {"_id": "$issue_id", "count": {"$sum": 1}}},
+        ]},
+        {"name": "counter repair: pledges", "collection": "pledges", "pipeline": [
+            {"$match": {"issue_id": {"$in": sample["issue_ids"]}, "status": {"$in": ["active", "distributed"]}}},
+            {"$group": {"_id": "$issue_id", "count": {"$sum": 1}}},
+        ]},
+    ]
+
+
+# ------------------------------------------------------------------
+# EXPLAIN
+# ------------------------------------------------------------------
+
+async def explain(db, shape: Dict) -> Dict:
+    if "pipeline" in shape:
+        command = {"aggregate": shape["collection"], "pipeline": shape["pipeline"], "cursor": {}}
+    else:
+        command = {"find": shape["collection"], "filter": shape["filter"]}
+        if shape.get("sort"):
+            command["sort"] = shape["sort"]
+        if shape.get("limit"):
+            command["limit"] = shape["limit"]
+    return await db.command({"explain": command, "verbosity": "executionStats"})
+
+
+def _walk(node, key: str):
+    """Yield every value stored under key anywhere in an explain document"""
+    if isinstance(node, dict):
+        for name, value in node.items():
+            if name == key:
+                yield value
+            yield from _walk(value, key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item, key)
+
+
+def analyse(result: Dict, shape: Dict, max_ratio: float) -> Dict:
+    stages = set()
+    for plan in _walk(result, "winningPlan"):
+        stages.update(_walk(plan, "stage"))
+
+    stats: Optional[Dict] = next(_walk(result, "executionStats"), None) or {}
+    examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    ratio = examined / max(returned, 1)
+
+    findings = []
+    if "COLLSCAN" in stages:
+        findings.append("COLLSCAN")
+    if "SORT" in stages:
+        findings.append("SORT")
+    if ratio > max_ratio:
+        findings.append("ratio")
+
+    allowed = shape.get("allow", set())
+    return {
+        "name": shape["name"],
+        "collection": shape["collection"],
+        "stages": sorted(stages),
+        "docs_examined": examined,
+        "returned": returned,
+        "ratio": round(ratio, 2),
+        "findings": findings,
+        "failures": [finding for finding in findings if finding not in allowed],
+        "allowed_because": shape.get("reason") if set(findings) & allowed else None,
+    }
+
+
+async def main(scale: int, max_ratio: float, as_json: bool, keep: bool) -> int:
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db_name = f"{settings.database_name}_plan_audit"
+    await client.drop_database(db_name)
+    db = client[db_name]
+
+    try:
+        await ensure_indexes(db, force=True)
+        sample = await seed(db, scale)
+        reports = [analyse(await explain(db, shape), shape, max_ratio) for shape in query_shapes(sample)]
+    finally:
+        if not keep:
+            await client.drop_database(db_name)
+        client.close()
+
+    failed = [report for report in reports if report["failures"]]
+    if as_json:
+        print(json.dumps({"max_ratio": max_ratio, "failed": len(failed), "queries": reports}, indent=2))
+    else:
+        print(f"{'query':<42}{'stages':<40}{'examined':>10}{'returned':>10}{'ratio':>8}  result")
+        for report in reports:
+            if report["failures"]:
+                result = "FAIL " + ", ".join(report["failures"])
+            elif report["allowed_because"]:
+                result = f"allowed ({report['allowed_because']})"
+            else:
+                result = "ok"
+            print(
+                f"{report['name']:<42}{','.join(report['stages'])[:38]:<40}"
+                f"{report['docs_examined']:>10}{report['returned']:>10}{report['ratio']:>8}  {result}"
+            )
+        print(f"\n{len(reports)} query shapes, {len(failed)} failing")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the seeded data volume")
+    parser.add_argument("--max-ratio", type=float, default=10.0, help="Fail above this docs examined / returned ratio")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database for inspection")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.scale, args.max_ratio, args.json, args.keep)))
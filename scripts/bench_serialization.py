@@ -0,0 +1,165 @@
+"""
+Compare list-endpoint serialization before and after the fast JSON path.
+
+"validated" reproduces the previous behaviour: the service builds each
+response model with full validation, then FastAPI validates the list against
+response_model again and renders it with the stdlib JSON encoder.
+"fast" is the current path: model_construct in the service formatters and a
+FastJSONResponse (orjson) returned straight from the route.
+
+No database is needed; documents are synthetic.
+
+    python -m scripts.bench_serialization [--items 500] [--rounds 50] [--json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core.responses import FastJSONResponse
+from app.schemas.issue import IssueResponse
+from app.schemas.pledge import PledgeResponse
+from app.schemas.user import WarriorResponse
+from app.schemas.volunteer import VolunteerResponse
+from app.services.issue_service import IssueService
+from app.services.pledge_service import PledgeService
+from app.services.volunteer_service import VolunteerService
+from app.services.warrior_service import WarriorService
+
+
+class _NoDatabase:
+    """Lets the services be constructed for their formatters; any query would fail"""
+
+    def __getattr__(self, name):
+        return None
+
+
+def _issue(now: datetime) -> dict:
+    return {
+        "_id": ObjectId(),
+        "user_id": ObjectId(),
+        "title": "Overflowing bins by the market",
+        "description": "Plastic waste spreading onto the road after the weekend market.",
+        "location": {"type": "Point", "coordinates": [random.uniform(-1, 1), random.uniform(5, 6)]},
+        "picture_url": "https://example.com/picture.jpg",
+        "priority": "medium",
+        "difficulty": "easy",
+        "status": "open",
+        "points_assigned": 15,
+        "comments": [
+            {"user_id": ObjectId(), "username": f"user{i}", "comment": "On my way", "created_at": now}
+            for i in range(3)
+        ],
+        "volunteer_count": 2,
+        "pledge_count": 1,
+        "pledged_points": 50,
+        "pledged_money": 0,
+        "created_at": now - timedelta(days=1),
+        "updated_at": now,
+    }
+
+
+def _volunteer(now: datetime) -> dict:
+    return {
+        "_id": ObjectId(), "issue_id": ObjectId(), "user_id": ObjectId(), "username": "volunteer",
+        "volunteered_at": now, "status": "active", "contribution": "Bringing gloves",
+    }
+
+
+def _pledge(now: datetime) -> dict:
+    return {
+        "_id": ObjectId(), "issue_id": ObjectId(), "pledger_id": ObjectId(), "pledger_username": "pledger",
+        "reward_type": "points", "reward_amount": 50.0, "reward_description": None,
+        "status": "active", "created_at": now,
+    }
+
+
+def _warrior(now: datetime) -> dict:
+    return {
+        "_id": ObjectId(), "username": "warrior", "display_name": "Warrior",
+        "avatar": None, "points": 1200, "tasks_completed": 14,
+    }
+
+
+def _validated(models: List) -> List:
+    """What the formatters used to do: construct every model with validation"""
+    return [type(model)(**model.__dict__) for model in models]
+
+
+async def _old_path(field, models: List) -> bytes:
+    content = await serialize_response(field=field, response_content=_validated(models))
+    return JSONResponse(content).body
+
+
+def _fast_path(models: List) -> bytes:
+    return FastJSONResponse(models).body
+
+
+async def bench(items: int, rounds: int) -> List[dict]:
+    now = datetime.utcnow()
+    db = _NoDatabase()
+    issue_service = IssueService(db)
+    volunteer_service = VolunteerService(db)
+    pledge_service = PledgeService(db)
+
+    endpoints = [
+        ("GET /api/issues", IssueResponse, _issue, lambda docs: [issue_service._format_issue_response(d) for d in docs]),
+        ("GET /api/issues/{id}/volunteers", VolunteerResponse, _volunteer, lambda docs: [volunteer_service._format_volunteer_response(d) for d in docs]),
+        ("GET /api/issues/{id}/pledges", PledgeResponse, _pledge, lambda docs: [pledge_service._format_pledge_response(d) for d in docs]),
+        ("GET /api/warriors", WarriorResponse, _warrior, lambda docs: [WarriorService._format_warrior_response(d) for d in docs]),
+    ]
+
+    results = []
+    for name, model, make_doc, format_docs in endpoints:
+        docs = [make_doc(now) for _ in range(items)]
+        field = create_model_field(name="Response_" + model.__name__, type_=List[model], mode="serialization")
+
+        # Both paths must produce the same JSON document
+        models = format_docs(docs)
+        assert json.loads(await _old_path(field, models)) == json.loads(_fast_path(models)), name
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await _old_path(field, format_docs(docs))
+        old_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            _fast_path(format_docs(docs))
+        fast_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        results.append({
+            "endpoint": name,
+            "items": items,
+            "validated_ms": round(old_ms, 3),
+            "fast_ms": round(fast_ms, 3),
+            "speedup": round(old_ms / fast_ms, 2) if fast_ms else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500, help="Items per list response")
+    parser.add_argument("--rounds", type=int, default=50, help="Timed repetitions per endpoint")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.items, args.rounds))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'endpoint':<36}{'validated ms':>14}{'fast ms':>10}{'speedup':>9}")
+    for row in results:
+        print(f"{row['endpoint']:<36}{row['validated_ms']:>14.3f}{row['fast_ms']:>10.3f}{row['speedup']:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
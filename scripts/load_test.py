@@ -0,0 +1,486 @@
+"""
+End-to-end load test of app.main:app.
+
+Boots the app in-process (lifespan included) against the in-memory Mongo
+stand-in (MONGODB_URI=memory://, needs mongomock-motor) and local file
+storage, seeds it with synthetic users, geo-distributed issues, volunteers,
+pledges and comments, then drives a weighted mix of traffic through httpx's
+ASGI transport with --concurrency virtual users:
+
+  map polling (/api/events, open issues in the map's fields), issue detail
+  with ETag revalidation, warriors, leaderboard, dashboard, notifications,
+  rewards, comments, volunteering, pledges, issue creation with a photo and
+  GPS-verified resolves.
+
+Writes throughput and latency percentiles per route to --output as JSON;
+--compare prints the change against a report from an earlier commit.
+The client shares the event loop with the app, and the stand-in runs its
+queries synchronously on that loop, so numbers are for comparing commits
+on the same machine and settings; point --mongodb-uri at a real server for
+absolute figures.
+
+    pip install mongomock-motor httpx
+    python -m scripts.load_test [--scale 1] [--concurrency 20] [--duration 30] [--output loadtest.json]
+    python -m scripts.load_test --mongodb-uri mongodb://localhost:27017 --database tankas_load
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+
+# City centres the synthetic issues cluster around (lat, lng, spread in degrees)
+CITIES = [
+    (5.6037, -0.1870, 0.08),   # Accra
+    (6.6885, -1.6244, 0.06),   # Kumasi
+    (9.4008, -0.8393, 0.05),   # Tamale
+    (4.8845, -1.7554, 0.04),   # Takoradi
+]
+
+# (name, weight); names double as report keys
+TRAFFIC_MIX = [
+    ("map: GET /api/events", 25),
+    ("map: GET /api/issues?status=open", 12),
+    ("GET /api/issues/{id}", 12),
+    ("GET /api/issues/{id} (If-None-Match)", 6),
+    ("GET /api/warriors", 5),
+    ("GET /api/rewards/leaderboard", 3),
+    ("GET /api/users/dashboard", 5),
+    ("GET /api/notifications", 5),
+    ("GET /api/rewards", 3),
+    ("GET /api/issues/{id}/volunteers", 3),
+    ("POST /api/issues/{id}/comments", 6),
+    ("POST /api/issues/{id}/volunteer", 4),
+    ("POST /api/issues/{id}/pledge", 3),
+    ("POST /api/issues (photo)", 5),
+    ("POST /api/issues/{id}/resolve", 3),
+]
+
+MAP_FIELDS = "title,status,priority,latitude,longitude,volunteer_count"
+
+
+def _configure_environment(args) -> str:
+    """Settings are read when app.config is imported, so this runs before any app import"""
+    upload_dir = tempfile.mkdtemp(prefix="tankas_load_uploads_")
+    os.environ["MONGODB_URI"] = args.mongodb_uri
+    os.environ["DATABASE_NAME"] = args.database
+    os.environ.setdefault("JWT_SECRET_KEY", uuid.uuid4().hex)
+    os.environ["USE_CLOUDINARY"] = "false"
+    os.environ["UPLOAD_DIR"] = upload_dir
+    os.environ["PUBSUB_BROKER"] = "local"
+    os.environ["ISSUE_FEED_SOURCE"] = "bus"
+    os.environ.setdefault("PROFILING_SAMPLE_RATE", "0")
+    if args.mongodb_uri.startswith("memory://"):
+        os.environ["MONGODB_TRANSACTIONS"] = "false"
+        # The stand-in answers synchronously on the loop, so every query would be reported as a stall
+        os.environ.setdefault("LOOP_MONITOR_ENABLED", "false")
+    return upload_dir
+
+
+# ------------------------------------------------------------------
+# SYNTHETIC DATA
+# ------------------------------------------------------------------
+
+def _point(rng: random.Random) -> Tuple[float, float]:
+    lat, lng, spread = rng.choice(CITIES)
+    return lat + rng.gauss(0, spread), lng + rng.gauss(0, spread)
+
+
+def _to_rational(value: float):
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round(((value - degrees) * 60 - minutes) * 60 * 10000)
+    return ((degrees, 1), (minutes, 1), (seconds, 10000))
+
+
+def make_photo(lat: Optional[float] = None, lng: Optional[float] = None, size=(640, 480)) -> bytes:
+    """A JPEG, with GPS EXIF when lat/lng are given (what resolve verification reads)"""
+    import piexif
+    from PIL import Image
+
+    image = Image.new("RGB", size, (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
+    output = io.BytesIO()
+    if lat is None:
+        image.save(output, format="JPEG", quality=85)
+    else:
+        gps = {
+            piexif.GPSIFD.GPSLatitudeRef: b"N" if lat >= 0 else b"S",
+            piexif.GPSIFD.GPSLatitude: _to_rational(lat),
+            piexif.GPSIFD.GPSLongitudeRef: b"E" if lng >= 0 else b"W",
+            piexif.GPSIFD.GPSLongitude: _to_rational(lng),
+        }
+        image.save(output, format="JPEG", quality=85, exif=piexif.dump({"GPS": gps}))
+    return output.getvalue()
+
+
+async def seed(db, scale: int, rng: random.Random) -> Dict:
+    """Users, issues around CITIES, volunteers, pledges, comments and rewards; returns what the traffic needs"""
+    from app.core.security import hash_password_async
+    from app.services.location_service import LocationService
+
+    now = datetime.now()
+    # One bcrypt hash shared by every seeded user keeps seeding fast
+    hashed_password = await hash_password_async("load-test-password")
+
+    users = [
+        {
+            "_id": ObjectId(), "username": f"load{i}", "email": f"load{i}@example.com",
+            "hashed_password": hashed_password, "display_name": f"Load {i}",
+            "points": rng.randint(0, 5000), "tasks_completed": rng.randint(0, 40),
+            "tasks_reported": rng.randint(0, 40), "areas_cleaned": rng.randint(0, 20),
+            "created_at": now - timedelta(days=rng.randint(0, 365)),
+        }
+        for i in range(200 * scale)
+    ]
+    await db.users.insert_many(users)
+
+    issues, volunteers, pledges = [], [], []
+    for i in range(2000 * scale):
+        lat, lng = _point(rng)
+        reporter = rng.choice(users)
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        issue_id = ObjectId()
+        status = rng.choices(["open", "in_progress", "resolved"], weights=[6, 3, 1])[0]
+
+        issue_volunteers = rng.sample(users, rng.randint(0, 4)) if status != "open" else []
+        for user in issue_volunteers:
+            volunteers.append({
+                "issue_id": issue_id, "user_id": user["_id"], "username": user["username"],
+                "volunteered_at": created_at, "status": "active", "contribution": None,
+            })
+        issue_pledges = rng.sample(users, rng.randint(0, 2))
+        for user in issue_pledges:
+            pledges.append({
+                "issue_id": issue_id, "pledger_id": user["_id"], "pledger_username": user["username"],
+                "reward_type": "points", "reward_amount": 25.0, "reward_description": None,
+                "status": "distributed" if status == "resolved" else "active", "created_at": created_at,
+            })
+        commenters = rng.sample(users, rng.randint(0, 5))
+
+        issues.append({
+            "_id": issue_id,
+            "user_id": reporter["_id"],
+            "title": f"Waste pile {i}",
+            "description": "Synthetic issue for load testing",
+            "location": LocationService.create_geojson(lat, lng),
+            "picture_url": None,
+            "priority": rng.choice(["low", "medium", "high"]),
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "status": status,
+            "points_assigned": 15,
+            "comments": [
+                {"user_id": user["_id"], "username": user["username"], "comment": "Still there", "created_at": created_at}
+                for user in commenters
+            ],
+            "volunteer_count": len(issue_volunteers),
+            "pledge_count": len(issue_pledges),
+            "pledged_points": 25 * len(issue_pledges),
+            "pledged_money": 0,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+    await db.issues.insert_many(issues)
+    if volunteers:
+        await db.volunteers.insert_many(volunteers)
+    if pledges:
+        await db.pledges.insert_many(pledges)
+    await db.rewards.insert_many([
+        {"name": f"Reward {n}", "description": "Synthetic", "points_required": 250 * (n + 1),
+         "available": True, "created_at": now}
+        for n in range(30)
+    ])
+
+    unresolved = [issue for issue in issues if issue["status"] != "resolved"]
+    return {
+        "users": users,
+        "issue_ids": [str(issue["_id"]) for issue in issues],
+        "unresolved": [(str(issue["_id"]), *reversed(issue["location"]["coordinates"])) for issue in unresolved],
+    }
+
+
+# ------------------------------------------------------------------
+# TRAFFIC
+# ------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, status: int) -> None:
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+        if status >= 500:
+            self.errors[name] += 1
+
+
+class VirtualUser:
+    """One client looping over the traffic mix as fast as the app answers"""
+
+    def __init__(self, client, state: Dict, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.state = state
+        self.recorder = recorder
+        self.rng = rng
+        self.user = rng.choice(state["users"])
+        self.headers = {"Authorization": f"Bearer {state['tokens'][self.user['username']]}"}
+        self.etags: Dict[str, str] = {}
+
+    async def run(self, deadline: float, names: List[str], weights: List[int]) -> None:
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                status = await self.request(name)
+            except Exception as e:
+                print(f"{name} raised {type(e).__name__}: {e}")
+                status = 599
+            self.recorder.record(name, time.perf_counter() - started, status)
+
+    def _issue_id(self) -> str:
+        return self.rng.choice(self.state["issue_ids"])
+
+    async def request(self, name: str) -> int:
+        client, headers = self.client, self.headers
+
+        if name == "map: GET /api/events":
+            response = await client.get("/api/events", params={"limit": 200, "fields": MAP_FIELDS})
+        elif name == "map: GET /api/issues?status=open":
+            response = await client.get("/api/issues", params={"status": "open", "limit": 100, "fields": MAP_FIELDS})
+        elif name == "GET /api/issues/{id}":
+            issue_id = self._issue_id()
+            response = await client.get(f"/api/issues/{issue_id}")
+            if "etag" in response.headers:
+                self.etags[issue_id] = response.headers["etag"]
+        elif name == "GET /api/issues/{id} (If-None-Match)":
+            if not self.etags:
+                return await self.request("GET /api/issues/{id}")
+            issue_id, etag = self.rng.choice(list(self.etags.items()))
+            response = await client.get(f"/api/issues/{issue_id}", headers={"If-None-Match": etag})
+        elif name == "GET /api/warriors":
+            response = await client.get("/api/warriors", params={"limit": 50})
+        elif name == "GET /api/rewards/leaderboard":
+            response = await client.get("/api/rewards/leaderboard")
+        elif name == "GET /api/users/dashboard":
+            response = await client.get("/api/users/dashboard", headers=headers)
+        elif name == "GET /api/notifications":
+            response = await client.get("/api/notifications", headers=headers)
+        elif name == "GET /api/rewards":
+            response = await client.get("/api/rewards", headers=headers)
+        elif name == "GET /api/issues/{id}/volunteers":
+            response = await client.get(f"/api/issues/{self._issue_id()}/volunteers")
+        elif name == "POST /api/issues/{id}/comments":
+            response = await client.post(
+                f"/api/issues/{self._issue_id()}/comments", json={"comment": "Passed by today"}, headers=headers
+            )
+        elif name == "POST /api/issues/{id}/volunteer":
+            response = await client.post(
+                f"/api/issues/{self._issue_id()}/volunteer", json={"contribution": "Gloves and bags"}, headers=headers
+            )
+        elif name == "POST /api/issues/{id}/pledge":
+            response = await client.post(
+                f"/api/issues/{self._issue_id()}/pledge", json={"reward_type": "points", "reward_amount": 10}, headers=headers
+            )
+        elif name == "POST /api/issues (photo)":
+            lat, lng = _point(self.rng)
+            response = await client.post(
+                "/api/issues",
+                data={"title": "Dumped rubbish", "description": "Reported by load test",
+                      "latitude": str(lat), "longitude": str(lng), "priority": "medium", "difficulty": "easy"},
+                files={"picture": ("photo.jpg", self.state["photo"], "image/jpeg")},
+                headers=headers
+            )
+            if response.status_code == 200:
+                self.state["issue_ids"].append(response.json()["id"])
+        elif name == "POST /api/issues/{id}/resolve":
+            if not self.state["resolvable"]:
+                return await self.request("GET /api/issues/{id}")
+            issue_id, photo = self.state["resolvable"].pop()
+            response = await client.post(
+                f"/api/issues/{issue_id}/resolve",
+                files={"resolution_picture": ("resolved.jpg", photo, "image/jpeg")},
+                headers=headers
+            )
+        else:
+            raise ValueError(f"Unknown request: {name}")
+
+        return response.status_code
+
+
+# ------------------------------------------------------------------
+# REPORT
+# ------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_report(recorder: Recorder, elapsed: float, args) -> Dict:
+    routes = {}
+    all_latencies = []
+    for name, latencies in sorted(recorder.latencies.items()):
+        values = sorted(latencies)
+        all_latencies.extend(values)
+        routes[name] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "errors": recorder.errors.get(name, 0),
+            "statuses": {str(code): count for code, count in sorted(recorder.statuses[name].items())},
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+
+    all_latencies.sort()
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "meta": {
+            "commit": commit,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "mongodb": "memory" if args.mongodb_uri.startswith("memory://") else "server",
+            "scale": args.scale,
+            "concurrency": args.concurrency,
+            "duration_seconds": round(elapsed, 3),
+            "seed": args.seed,
+        },
+        "totals": {
+            "requests": len(all_latencies),
+            "rps": round(len(all_latencies) / elapsed, 2),
+            "errors": sum(recorder.errors.values()),
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(all_latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 3),
+        },
+        "routes": routes,
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict]) -> None:
+    def delta(name: str, key: str, value: float) -> str:
+        if not baseline:
+            return ""
+        previous = (baseline["totals"] if name == "TOTAL" else baseline["routes"].get(name, {})).get(key)
+        if not previous:
+            return f"{'':>9}"
+        return f"{(value - previous) / previous * 100:>+8.1f}%"
+
+    print(f"{'route':<42}{'req':>7}{'rps':>9}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          + (f"{'Δ rps':>9}{'Δ p95':>9}" if baseline else ""))
+    rows = list(report["routes"].items()) + [("TOTAL", report["totals"])]
+    for name, row in rows:
+        print(f"{name:<42}{row['requests']:>7}{row['rps']:>9.1f}{row['errors']:>5}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+              f"{delta(name, 'rps', row['rps'])}{delta(name, 'p95_ms', row['p95_ms'])}")
+
+
+# ------------------------------------------------------------------
+# MAIN
+# ------------------------------------------------------------------
+
+async def run(args) -> Dict:
+    import httpx
+    from app.main import app
+    from app.core.database import db as database, get_database
+    from app.services.auth_service import AuthService
+
+    rng = random.Random(args.seed)
+    async with app.router.lifespan_context(app):
+        mongo = get_database()
+        if not args.mongodb_uri.startswith("memory://"):
+            # A server database may hold a previous run; start from the same state every time
+            await database.client.drop_database(args.database)
+        print(f"Seeding (scale {args.scale})...")
+        state = await seed(mongo, args.scale, rng)
+
+        auth = AuthService(mongo)
+        state["tokens"] = {
+            user["username"]: auth._issue_tokens(user["username"], user["_id"]).access_token for user in state["users"]
+        }
+        state["photo"] = make_photo()
+        # Photos taken at the issue's location, so GPS verification passes
+        targets = rng.sample(state["unresolved"], min(len(state["unresolved"]), 50 * args.concurrency))
+        state["resolvable"] = [(issue_id, make_photo(lat, lng, size=(320, 240))) for issue_id, lat, lng in targets]
+
+        names = [name for name, _ in TRAFFIC_MIX]
+        weights = [weight for _, weight in TRAFFIC_MIX]
+        recorder = Recorder()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            if args.warmup > 0:
+                warmup = [VirtualUser(client, state, Recorder(), random.Random(rng.random())) for _ in range(args.concurrency)]
+                await asyncio.gather(*(user.run(time.perf_counter() + args.warmup, names, weights) for user in warmup))
+
+            print(f"Running {args.concurrency} virtual users for {args.duration}s...")
+            users = [VirtualUser(client, state, recorder, random.Random(rng.random())) for _ in range(args.concurrency)]
+            started = time.perf_counter()
+            await asyncio.gather(*(user.run(started + args.duration, names, weights) for user in users))
+            elapsed = time.perf_counter() - started
+
+        if not args.mongodb_uri.startswith("memory://") and not args.keep:
+            await database.client.drop_database(args.database)
+
+    return build_report(recorder, elapsed, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier for the synthetic data (200 users, 2000 issues per unit)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured traffic")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of unmeasured traffic first")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and traffic")
+    parser.add_argument("--mongodb-uri", default="memory://", help="memory:// (default) or a real server to compare against")
+    parser.add_argument("--database", default="tankas_load_test", help="Database name; dropped before and after on a real server")
+    parser.add_argument("--keep", action="store_true", help="Keep the database on a real server")
+    parser.add_argument("--output", default="loadtest.json", help="Where to write the JSON report")
+    parser.add_argument("--compare", help="Earlier JSON report to show the change against")
+    args = parser.parse_args()
+
+    upload_dir = _configure_environment(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report, baseline)
+    print(f"\nReport written to {args.output}")
+
+    if report["totals"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
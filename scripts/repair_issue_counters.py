@@ -0,0 +1,31 @@
+"""
+Recompute volunteer_count, pledge_count, pledged_points and pledged_money on issues.
+
+Run once after deploying the counters, and whenever they may have drifted
+(e.g. after running with MONGODB_TRANSACTIONS=false).
+
+    python -m scripts.repair_issue_counters [--issue <id> ...]
+"""
+import argparse
+import asyncio
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.services.issue_counter_service import IssueCounterService
+
+
+async def main(issue_ids):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    try:
+        service = IssueCounterService(client[settings.database_name])
+        repaired = await service.repair([ObjectId(issue_id) for issue_id in issue_ids] or None)
+        print(f"Corrected counters on {repaired} issue(s)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issue", action="append", default=[], help="Only repair this issue id (repeatable)")
+    args = parser.parse_args()
+    asyncio.run(main(args.issue))
@@ -0,0 +1,158 @@
+"""
+Concurrency harness for issue state transitions.
+
+Fires many simultaneous resolves (and volunteer flips) at the same issues and
+checks that exactly one caller wins each transition. Resolves go through
+IssueService.resolve_issue, the same path as POST /api/issues/{id}/resolve,
+with only GPS extraction and the picture upload stubbed. The harness then
+checks that the resolver was paid the issue's points and its pledges exactly
+once, and that each pledge was distributed once. Runs against MONGODB_URI in
+a throwaway database.
+
+    python -m scripts.resolve_race --issues 20 --concurrency 300
+"""
+import argparse
+import asyncio
+import io
+import sys
+from datetime import datetime
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from app.config import settings
+from app.core.database import connect_to_mongo, close_mongo_connection, get_database, db as database
+from app.models.user import CurrentUser
+from app.services import issue_service as issue_service_module
+from app.services.issue_feed import issue_feed, LocalSource
+from app.services.issue_service import IssueService
+from app.services.issue_state_machine import IssueStateMachine
+
+ISSUE_POINTS = 100
+PLEDGES_PER_ISSUE = 3
+PLEDGE_POINTS = 25
+# Every resolution photo is taken at the issue's own location
+LOCATION = (5.6037, -0.1870)
+
+
+async def _stub_upload(picture_bytes, filename, folder=None):
+    return f"https://example.invalid/{folder}/{filename}"
+
+
+def _resolution_picture() -> UploadFile:
+    return UploadFile(io.BytesIO(b"photo"), filename="resolution.jpg", headers=Headers({"content-type": "image/jpeg"}))
+
+
+async def race_resolves(issue_id, users) -> int:
+    async def attempt(user):
+        service = IssueService(get_database())
+        service.storage_service.save_upload_file_bytes = _stub_upload
+        try:
+            await service.resolve_issue(str(issue_id), user, _resolution_picture())
+        except HTTPException as e:
+            if e.detail != "Issue already resolved":
+                raise
+            return False
+        return True
+
+    results = await asyncio.gather(*(attempt(user) for user in users))
+    return sum(results)
+
+
+async def race_volunteer_flips(issue_id, concurrency, state_machine) -> int:
+    results = await asyncio.gather(*(
+        state_machine.transition(str(issue_id), "in_progress") for _ in range(concurrency)
+    ))
+    return sum(1 for result in results if result is not None)
+
+
+async def check_payouts(db, issue_count: int) -> int:
+    failures = 0
+    expected = ISSUE_POINTS + PLEDGES_PER_ISSUE * PLEDGE_POINTS
+
+    async for issue in db.issues.find({}, {"resolved_by": 1, "title": 1}):
+        pledges = await db.pledges.find({"issue_id": issue["_id"]}).to_list(None)
+        recipients = {pledge.get("distributed_to") for pledge in pledges}
+        if any(pledge["status"] != "distributed" for pledge in pledges) or recipients != {issue.get("resolved_by")}:
+            failures += 1
+            print(f"{issue['title']}: pledges not distributed exactly once to the resolver")
+
+    users = await db.users.find({}, {"points": 1, "tasks_completed": 1}).to_list(None)
+    for user in users:
+        if user["points"] != user["tasks_completed"] * expected:
+            failures += 1
+            print(f"user {user['_id']}: {user['points']} points for {user['tasks_completed']} resolves (expected {expected} each)")
+
+    total_points = sum(user["points"] for user in users)
+    completed = sum(user["tasks_completed"] for user in users)
+    if total_points != issue_count * expected or completed != issue_count:
+        failures += 1
+        print(f"resolvers were paid {total_points} points for {completed} resolves, expected {issue_count * expected} for {issue_count}")
+    return failures
+
+
+async def main(issue_count: int, concurrency: int) -> int:
+    settings.database_name = f"{settings.database_name}_resolve_race"
+    await connect_to_mongo()
+    db = get_database()
+
+    # Stubs for the parts of a resolve that need a real photo
+    issue_service_module.extract_gps_from_image = lambda picture_bytes: LOCATION
+    issue_feed.configure(LocalSource())
+
+    state_machine = IssueStateMachine(db.issues)
+    failures = 0
+    print(f"Transactions {'on' if database.transactions else 'off'}")
+
+    try:
+        users = [
+            {"username": f"racer{i}", "email": f"racer{i}@example.com", "points": 0, "tasks_completed": 0, "areas_cleaned": 0}
+            for i in range(concurrency)
+        ]
+        await db.users.insert_many(users)
+        current_users = [CurrentUser(id=user["_id"], username=user["username"], document=user) for user in users]
+
+        for n in range(issue_count):
+            now = datetime.now()
+            issue = {
+                "user_id": str(users[0]["_id"]),
+                "title": f"race {n}",
+                "description": "Concurrency harness",
+                "status": "open",
+                "priority": "medium",
+                "difficulty": "medium",
+                "location": {"type": "Point", "coordinates": [LOCATION[1], LOCATION[0]]},
+                "points_assigned": ISSUE_POINTS,
+                "comments": [],
+                "pledge_count": PLEDGES_PER_ISSUE,
+                "pledged_points": PLEDGES_PER_ISSUE * PLEDGE_POINTS,
+                "pledged_money": 0,
+                "created_at": now,
+                "updated_at": now
+            }
+            await db.issues.insert_one(issue)
+            await db.pledges.insert_many([
+                {"issue_id": issue["_id"], "pledger_id": users[0]["_id"], "reward_type": "points",
+                 "reward_amount": PLEDGE_POINTS, "status": "active", "created_at": now}
+                for _ in range(PLEDGES_PER_ISSUE)
+            ])
+
+            flips = await race_volunteer_flips(issue["_id"], concurrency, state_machine)
+            winners = await race_resolves(issue["_id"], current_users)
+            if flips != 1 or winners != 1:
+                failures += 1
+                print(f"issue {n}: {flips} in_progress flips, {winners} resolvers (expected 1 and 1)")
+
+        failures += await check_payouts(db, issue_count)
+    finally:
+        await database.client.drop_database(settings.database_name)
+        await close_mongo_connection()
+
+    print(f"{issue_count} issues x {concurrency} concurrent callers: {'OK' if not failures else f'{failures} failures'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.issues, args.concurrency)))
@@ -0,0 +1,182 @@
+"""
+Startup-time budget for app.main.
+
+Imports app.main in fresh interpreters under `python -X importtime` and
+reports the median import time per module: the total, the slowest
+third-party packages and every app module. Fails (exit 1) when:
+
+  - the total import time exceeds --budget-ms
+  - a dependency that should load on first use (PIL, piexif, cloudinary,
+    passlib) is imported at startup
+
+With --lifespan it also times the lifespan startup (connect, index check,
+background workers) against the in-memory Mongo stand-in.
+
+    python -m scripts.startup_budget [--budget-ms 1500] [--runs 5] [--top 15] [--lifespan] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+# Loaded lazily by the code that needs them; importing any of these at startup is a regression
+DEFERRED = ("PIL", "piexif", "cloudinary", "passlib")
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LIFESPAN_SNIPPET = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({"import_ms": (imported - started) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+"""
+
+
+def _environment(memory: bool = False) -> Dict[str, str]:
+    env = dict(os.environ)
+    # Required settings; app.main reads them while it assembles the app
+    env.setdefault("MONGODB_URI", "memory://")
+    env.setdefault("DATABASE_NAME", "startup_budget")
+    env.setdefault("JWT_SECRET_KEY", "startup-budget")
+    if memory:
+        env["MONGODB_URI"] = "memory://"
+        env["MONGODB_TRANSACTIONS"] = "false"
+    return env
+
+
+def _run_importtime() -> List[Dict]:
+    """One fresh `import app.main`; returns (name, self_us, cumulative_us, depth) rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=_REPO_ROOT, env=_environment(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"import app.main failed with exit code {result.returncode}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "name": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return rows
+
+
+def measure(runs: int) -> Dict:
+    # The first run may compile bytecode; it is not counted
+    _run_importtime()
+
+    cumulative: Dict[str, List[int]] = defaultdict(list)
+    package_self: Dict[str, List[int]] = defaultdict(list)
+    totals = []
+    imported = set()
+    for _ in range(runs):
+        rows = _run_importtime()
+        per_package: Dict[str, int] = defaultdict(int)
+        for row in rows:
+            cumulative[row["name"]].append(row["cumulative_us"])
+            per_package[row["name"].split(".")[0]] += row["self_us"]
+            imported.add(row["name"])
+        for package, self_us in per_package.items():
+            package_self[package].append(self_us)
+        totals.append(next(row["cumulative_us"] for row in rows if row["name"] == "app.main"))
+
+    def median_ms(values: List[int]) -> float:
+        return round(statistics.median(values) / 1000, 2)
+
+    return {
+        "total_ms": median_ms(totals),
+        "packages": sorted(
+            ({"package": name, "self_ms": median_ms(values)} for name, values in package_self.items() if name != "app"),
+            key=lambda row: row["self_ms"], reverse=True
+        ),
+        "app_modules": sorted(
+            ({"module": name, "cumulative_ms": median_ms(values)} for name, values in cumulative.items()
+             if name == "app" or name.startswith("app.")),
+            key=lambda row: row["cumulative_ms"], reverse=True
+        ),
+        "deferred_imported": sorted(
+            name for name in DEFERRED if any(m == name or m.startswith(name + ".") for m in imported)
+        ),
+    }
+
+
+def measure_lifespan(runs: int) -> Dict:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _LIFESPAN_SNIPPET],
+            cwd=_REPO_ROOT, env=_environment(memory=True), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            sys.stderr.write(result.stderr)
+            raise SystemExit("lifespan startup failed (the in-memory stand-in needs mongomock-motor)")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "lifespan_ms": round(statistics.median(s["lifespan_ms"] for s in samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Fail when importing app.main takes longer (median)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to take the median over")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--lifespan", action="store_true", help="Also time lifespan startup against memory://")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    if args.lifespan:
+        report["lifespan"] = measure_lifespan(args.runs)
+
+    failures = []
+    if report["total_ms"] > args.budget_ms:
+        failures.append(f"import app.main took {report['total_ms']:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    for name in report["deferred_imported"]:
+        failures.append(f"{name} is imported at startup; it should load on first use")
+    report["budget_ms"] = args.budget_ms
+    report["failures"] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import app.main: {report['total_ms']:.1f}ms (budget {args.budget_ms:.0f}ms, median of {args.runs})")
+        if args.lifespan:
+            print(f"lifespan startup: {report['lifespan']['lifespan_ms']:.1f}ms")
+
+        print(f"\n{'third-party package':<40}{'self ms':>10}")
+        for row in report["packages"][:args.top]:
+            print(f"{row['package']:<40}{row['self_ms']:>10.1f}")
+
+        print(f"\n{'app module':<40}{'cumulative ms':>14}")
+        for row in report["app_modules"][:args.top]:
+            print(f"{row['module']:<40}{row['cumulative_ms']:>14.1f}")
+
+        for failure in failures:
+            print(f"\nFAIL: {failure}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import asyncio
+import itertools
+from app.core.response_cache import VersionedPayloadCache
+from app.core.versions import bump_version
+
+_names = itertools.count()
+
+
+class FakeVersions:
+    """collection_versions stand-in; a read returns the document as it was when the read began"""
+
+    def __init__(self):
+        self.doc = None
+        self.reads = 0
+        self.gate = None
+
+    async def find_one(self, query):
+        self.reads += 1
+        doc = dict(self.doc) if self.doc else None
+        if self.gate is not None:
+            await self.gate.wait()
+        return doc
+
+    async def update_one(self, query, update, upsert=False):
+        version = (self.doc or {}).get("version", 0) + update["$inc"]["version"]
+        self.doc = {"_id": query["_id"], "version": version, "updated_at": update["$set"]["updated_at"]}
+
+
+class FakeDb:
+    def __init__(self):
+        self.collection_versions = FakeVersions()
+
+
+def make_cache(version_ttl=60.0, max_stale=30.0):
+    # A fresh version name per cache: bump listeners are registered process-wide
+    return VersionedPayloadCache(f"test{next(_names)}", maxsize=8, version_ttl=version_ttl, max_stale=max_stale)
+
+
+def make_render(renders, delay=0.01):
+    async def render():
+        renders.append(None)
+        await asyncio.sleep(delay)
+        return f"body{len(renders)}"
+    return render
+
+
+def test_concurrent_misses_share_one_render():
+    async def scenario():
+        db, cache, renders = FakeDb(), make_cache(), []
+        render = make_render(renders)
+        payloads = await asyncio.gather(*(cache.get(db, "key", render) for _ in range(10)))
+        return renders, payloads
+
+    renders, payloads = asyncio.run(scenario())
+    assert len(renders) == 1
+    assert {payload.body for payload in payloads} == {"body1"}
+
+
+def test_stale_body_served_while_one_rebuild_runs():
+    async def scenario():
+        db, cache, renders = FakeDb(), make_cache(), []
+        render = make_render(renders, delay=0.05)
+        first = await cache.get(db, "key", render)
+
+        await bump_version(db, cache.name)
+        stale = await asyncio.gather(*(cache.get(db, "key", render) for _ in range(5)))
+        rendered_while_stale = len(renders)
+
+        await asyncio.sleep(0.1)
+        fresh = await cache.get(db, "key", render)
+        return first, stale, rendered_while_stale, fresh, renders
+
+    first, stale, rendered_while_stale, fresh, renders = asyncio.run(scenario())
+    assert all(payload.body == "body1" and payload.version == 0 for payload in stale)
+    assert rendered_while_stale == 2
+    assert (fresh.body, fresh.version) == ("body2", 1)
+    assert len(renders) == 2
+
+
+def test_stale_body_not_served_past_max_stale():
+    async def scenario():
+        db, cache, renders = FakeDb(), make_cache(max_stale=0.0), []
+        render = make_render(renders)
+        await cache.get(db, "key", render)
+        await bump_version(db, cache.name)
+        return await cache.get(db, "key", render)
+
+    payload = asyncio.run(scenario())
+    assert (payload.body, payload.version) == ("body2", 1)
+
+
+def test_mark_stale_drops_cached_version():
+    async def scenario():
+        db, cache = FakeDb(), make_cache(version_ttl=60.0)
+        before = await cache.version(db)
+
+        # Another worker's write: within version_ttl the cached version is kept
+        await db.collection_versions.update_one({"_id": cache.name}, {"$inc": {"version": 1}, "$set": {"updated_at": None}})
+        cached = await cache.version(db)
+
+        cache.mark_stale()
+        after = await cache.version(db)
+        return before, cached, after
+
+    before, cached, after = asyncio.run(scenario())
+    assert (before.version, cached.version, after.version) == (0, 0, 1)
+
+
+def test_version_read_started_before_a_bump_is_not_cached():
+    async def scenario():
+        db, cache = FakeDb(), make_cache(version_ttl=60.0)
+        versions = db.collection_versions
+        versions.gate = asyncio.Event()
+
+        early = asyncio.create_task(cache.version(db))
+        while versions.reads == 0:
+            await asyncio.sleep(0)
+        await bump_version(db, cache.name)
+        versions.gate.set()
+        early_version = await early
+
+        reads_before = versions.reads
+        current = await cache.version(db)
+        return early_version, current, versions.reads - reads_before
+
+    early_version, current, new_reads = asyncio.run(scenario())
+    assert early_version.version == 0
+    assert current.version == 1
+    assert new_reads == 1